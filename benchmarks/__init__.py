@@ -0,0 +1,6 @@
+# lis_project/benchmarks
+"""Синтетические данные и замеры производительности database.crud, отчётов и страниц.
+
+    python -m benchmarks.seed --scale 100k --sqlite /tmp/lis_bench.db --reset
+    python -m benchmarks.run --scale 100k --sqlite /tmp/lis_bench.db --out bench.json
+"""
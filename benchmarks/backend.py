@@ -0,0 +1,19 @@
+# lis_project/benchmarks/backend.py
+"""Выбор базы для seed/run: MySQL из настроек (.env) или файл SQLite"""
+import os
+import sys
+
+
+def configure(sqlite_path=None):
+    """База для бенчмарка: SQLite-файл sqlite_path, иначе backend из DB_BACKEND/.env.
+
+    Вызывать до первого импорта database.*: backend выбирается при импорте
+    database.connection.
+    """
+    if sqlite_path:
+        if 'database.connection' in sys.modules:
+            raise RuntimeError("database.connection уже импортирован: backend не переключить")
+        os.environ['DB_BACKEND'] = 'sqlite'
+        os.environ['DB_PATH'] = sqlite_path
+    from database.connection import database, DB_BACKEND
+    return DB_BACKEND, database
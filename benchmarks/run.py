@@ -0,0 +1,323 @@
+# lis_project/benchmarks/run.py
+"""Замеры времени: функции database.crud, три отчёта, загрузка страниц.
+
+Каждый замер повторяется --repeat раз (кэш запросов очищается перед каждым
+повтором), в JSON пишутся медиана, минимум и максимум в миллисекундах.
+С --baseline результаты сравниваются с сохранённым прогоном того же
+backend/масштаба: замер медленнее в --threshold раз (и больше чем на
+MIN_REGRESSION_MS) считается регрессией, код выхода — 1.
+
+    python -m benchmarks.run --scale 100k --sqlite /tmp/lis_bench.db --seed-first
+    python -m benchmarks.run --scale 100k --update-baseline
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from . import backend
+from .seed import SCALES, DEFAULT_SEED, seed
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.25
+# Разница меньше этой считается шумом, как бы ни было велико отношение
+MIN_REGRESSION_MS = 2.0
+PAGE_LOAD_TIMEOUT_MS = 600000
+
+
+def _measure(func, repeat, setup=None):
+    from database.crud import query_cache
+    times = []
+    for _ in range(repeat):
+        query_cache.clear()
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': round(statistics.median(times), 3), 'min_ms': round(min(times), 3),
+            'max_ms': round(max(times), 3), 'runs': len(times)}
+
+
+def _sample_ids():
+    """id для точечных запросов: эксперимент и исследователь с наибольшим числом связей"""
+    from peewee import fn
+    from database.models import ConductingAnExperiment, SampleInExperiment
+    busiest = lambda column: (column.model.select(column, fn.COUNT(column.model.id).alias('n'))
+                              .group_by(column).order_by(fn.COUNT(column.model.id).desc())
+                              .limit(1).tuples().first() or (1, 0))[0]
+    return {'experiment': busiest(SampleInExperiment.experiment),
+            'researcher': busiest(ConductingAnExperiment.researcher),
+            'sample': busiest(SampleInExperiment.sample)}
+
+def read_cases(ids):
+    from database import crud, search, analytics
+    watermark = crud.get_change_watermark()
+    return {
+        'crud.get_all_researchers': crud.get_all_researchers,
+        'crud.get_all_samples': crud.get_all_samples,
+        'crud.get_all_equipment': crud.get_all_equipment,
+        'crud.get_all_experiments_with_researchers': crud.get_all_experiments_with_researchers,
+        'crud.get_all_experiments_with_researchers(list_only)':
+            lambda: crud.get_all_experiments_with_researchers(list_only=True),
+        'crud.get_all_measurements': crud.get_all_measurements,
+        'crud.get_all_methods': crud.get_all_methods,
+        'crud.get_all_results': crud.get_all_results,
+        'crud.get_all_conditions': crud.get_all_conditions,
+        'crud.get_my_experiments': lambda: crud.get_my_experiments(ids['researcher'], list_only=True),
+        'crud.get_my_samples': lambda: crud.get_my_samples(ids['researcher']),
+        'crud.get_experiment_with_relations': lambda: crud.get_experiment_with_relations(ids['experiment']),
+        'crud.get_experiments_by_sample_id': lambda: crud.get_experiments_by_sample_id(ids['sample']),
+        'crud.get_researcher_stats': crud.get_researcher_stats,
+        'crud.get_monthly_experiment_counts': crud.get_monthly_experiment_counts,
+        'crud.get_daily_experiment_counts': lambda: crud.get_daily_experiment_counts(30),
+        'crud.get_dashboard_stats': crud.get_dashboard_stats,
+        'crud.get_samples_delta': lambda: crud.get_samples_delta(watermark),
+        'crud.get_experiments_delta': lambda: crud.get_experiments_delta(watermark, list_only=True),
+        'search.search_samples': lambda: search.search_samples('натрия'),
+        'search.search_experiments': lambda: search.search_experiments('эксперимент'),
+        'analytics.get_measurement_stats': analytics.get_measurement_stats,
+        'analytics.get_measurement_stats(experiment)':
+            lambda: analytics.get_measurement_stats(experiment_id=ids['experiment']),
+    }
+
+
+def write_cases(ids):
+    """Запись: (имя, функция); создающие операции сохраняют id для последующих update/delete"""
+    from database import crud
+    from database.models import Measurement
+    created = {}
+    now = datetime.datetime(2024, 6, 1, 12, 0)
+
+    def keep(name, obj):
+        created[name] = obj.id if obj is not None else None
+
+    def bulk():
+        records = [{'sample_id': ids['sample'], 'method': 'Потенциометрия', 'property_name': 'Потенциал',
+                    'value': 200.0 + i / 1000, 'unit': 'мВ', 'accuracy': 0.01, 'time_of_event': now}
+                   for i in range(1000)]
+        created['bulk_from'] = Measurement.select(Measurement.id).order_by(Measurement.id.desc()).scalar() or 0
+        result = crud.bulk_create_measurements(records)
+        # Иначе замер показал бы время отбраковки, а не вставки
+        assert result and result['inserted'] == len(records), result
+
+    return created, [
+        ('crud.create_experiment', lambda: keep('experiment', crud.create_experiment(
+            'Бенчмарк', 'Замер записи', researcher_id=ids['researcher'], date_of_event=now.date()))),
+        ('crud.update_experiment', lambda: crud.update_experiment(created['experiment'], status='completed')),
+        ('crud.add_sample_to_experiment', lambda: crud.add_sample_to_experiment(created['experiment'], ids['sample'])),
+        ('crud.create_method', lambda: keep('method', crud.create_method(created['experiment'], 'Бенчмарк', ''))),
+        ('crud.update_method', lambda: crud.update_method(created['method'], 'Бенчмарк 2', 'обновлено')),
+        ('crud.delete_method', lambda: crud.delete_method(created['method'])),
+        ('crud.create_result', lambda: keep('result', crud.create_result(created['experiment'], 'Итоговый', ''))),
+        ('crud.update_result', lambda: crud.update_result(created['result'], conclusions='обновлено')),
+        ('crud.delete_result', lambda: crud.delete_result(created['result'])),
+        ('crud.create_condition', lambda: keep('condition', crud.create_condition(
+            created['experiment'], 25, 101.3, 40, 7, 'Темнота', now))),
+        ('crud.update_condition', lambda: crud.update_condition(created['condition'], humidity=45)),
+        ('crud.delete_condition', lambda: crud.delete_condition(created['condition'])),
+        ('crud.create_measurement', lambda: keep('measurement', crud.create_measurement(
+            ids['sample'], 'Термометрия', 'Температура', 25.0, '°C', 0.1, now))),
+        ('crud.update_measurement', lambda: crud.update_measurement(created['measurement'], value=26.0)),
+        ('crud.delete_measurement', lambda: crud.delete_measurement(created['measurement'])),
+        ('crud.bulk_create_measurements(1000)', bulk),
+        ('crud.delete_experiment_completely', lambda: crud.delete_experiment_completely(created['experiment'])),
+        ('crud.create_sample_with_researcher', lambda: keep('sample', crud.create_sample_with_researcher(
+            'Бенчмарк', '', 'NaCl', 'твёрдое', 1.0, 1.0, ids['researcher']))),
+        ('crud.update_sample', lambda: crud.update_sample(created['sample'], mass=2.0)),
+        ('crud.delete_sample_completely', lambda: crud.delete_sample_completely(created['sample'])),
+        ('crud.update_researcher', lambda: crud.update_researcher(ids['researcher'], organization='Бенчмарк')),
+    ]
+
+def run_writes(ids, repeat):
+    """Цикл записи повторяется целиком: каждая операция работает с только что созданными строками"""
+    from database.crud import query_cache
+    from database.models import Measurement
+    times = {}
+    for _ in range(repeat):
+        created, cases = write_cases(ids)
+        for name, func in cases:
+            query_cache.clear()
+            started = time.perf_counter()
+            func()
+            times.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+        # Вставленные пакетом измерения удаляем, чтобы объём не рос от повтора к повтору
+        Measurement.delete().where(Measurement.id > created['bulk_from']).execute()
+    query_cache.clear()
+    return {name: {'median_ms': round(statistics.median(t), 3), 'min_ms': round(min(t), 3),
+                   'max_ms': round(max(t), 3), 'runs': len(t)} for name, t in times.items()}
+
+
+def report_cases(output_dir):
+    from reports.excel_report import ExcelReportGenerator
+    from reports.statistical_pdf_report import StatisticalPDFReport
+    from reports.detailed_pdf_report import DetailedPDFReport
+
+    def generate(report_class):
+        report = report_class()
+        report.reports_dir = output_dir
+        return report.generate()
+
+    return {
+        'reports.ExcelReportGenerator': lambda: generate(ExcelReportGenerator),
+        'reports.StatisticalPDFReport': lambda: generate(StatisticalPDFReport),
+        'reports.DetailedPDFReport': lambda: generate(DetailedPDFReport),
+    }
+
+
+def _wait_idle(app, page):
+    """Крутит цикл событий, пока фоновые запросы страницы не завершатся"""
+    from PySide6.QtCore import QEventLoop, QDeadlineTimer
+    deadline = QDeadlineTimer(PAGE_LOAD_TIMEOUT_MS)
+    while page.loader.is_busy():
+        if deadline.hasExpired():
+            raise TimeoutError(f"{type(page).__name__}: загрузка не завершилась")
+        app.processEvents(QEventLoop.AllEvents, 10)
+        time.sleep(0.0005)
+
+def run_pages(repeat):
+    """Загрузка списочных страниц: полная (запрос + заполнение таблицы) и повторная без изменений;
+    старт главного окна"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+    from gui.pages.main_page import MainPage
+    from gui.pages.samples_page import SamplesPage
+    from gui.pages.researchers_page import ResearchersPage
+    from gui.pages.experiments_page import ExperimentsPage
+    from gui.pages.my_samples_page import MySamplesPage
+    from gui.pages.my_experiments_page import MyExperimentsPage
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    results = {}
+    for page_class in (MainPage, SamplesPage, ResearchersPage, ExperimentsPage, MySamplesPage, MyExperimentsPage):
+        page = page_class()
+        _wait_idle(app, page)
+        name = f'pages.{page_class.__name__}'
+
+        def load(page=page):
+            page.load_data()
+            _wait_idle(app, page)
+
+        def forget(page=page):
+            if hasattr(page, 'watermark'):
+                page.watermark = None  # следующий load_data — полная загрузка
+
+        results[f'{name}.load_data'] = _measure(load, repeat, setup=forget)
+        if hasattr(page, 'watermark'):
+            results[f'{name}.reload_unchanged'] = _measure(load, repeat)
+        page.deleteLater()
+
+    # Холодный старт окна: до первой отрисовки и данных главной (остальные страницы не создаются)
+    from PySide6.QtCore import QEventLoop, QDeadlineTimer
+    from gui.main_window import MainWindow
+
+    def start():
+        window = MainWindow()
+        window.show()
+        deadline = QDeadlineTimer(PAGE_LOAD_TIMEOUT_MS)
+        while not window.startup_timing.reported:
+            if deadline.hasExpired():
+                raise TimeoutError("MainWindow: старт не завершился")
+            app.processEvents(QEventLoop.AllEvents, 10)
+        window.close()
+        window.deleteLater()
+
+    results['pages.MainWindow.startup'] = _measure(start, repeat)
+    app.processEvents()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Регрессии относительно baseline: [(имя, было мс, стало мс)]"""
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        before, after = previous['median_ms'], current['median_ms']
+        if after > before * threshold and after - before > MIN_REGRESSION_MS:
+            regressions.append((name, before, after))
+    return regressions
+
+def _baseline_key(backend_name, scale):
+    return f'{backend_name}/{scale}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк LIS")
+    parser.add_argument('--scale', default='1k', choices=sorted(SCALES))
+    parser.add_argument('--sqlite', metavar='ФАЙЛ', help="файл SQLite вместо базы из настроек (.env)")
+    parser.add_argument('--seed-first', action='store_true', help="пересоздать базу и заполнить её перед замерами")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--out', metavar='ФАЙЛ', help="куда записать результаты (JSON)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, metavar='ФАЙЛ')
+    parser.add_argument('--update-baseline', action='store_true', help="сохранить результаты как baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--no-gui', action='store_true', help="без замеров страниц")
+    parser.add_argument('--no-writes', action='store_true', help="без замеров записи")
+    parser.add_argument('--no-reports', action='store_true', help="без замеров отчётов")
+    args = parser.parse_args(argv)
+
+    backend_name, _ = backend.configure(args.sqlite)
+    if args.seed_first:
+        seed(args.scale, args.seed, reset=True)
+
+    from database.connection import connection_scope
+    from database.models import Measurement
+    results = {}
+    # Одна область соединения на прогон: замеряем запросы, а не подключение
+    with connection_scope():
+        rows = Measurement.select().count()
+        ids = _sample_ids()
+        for name, func in read_cases(ids).items():
+            results[name] = _measure(func, args.repeat)
+        if not args.no_writes:
+            results.update(run_writes(ids, args.repeat))
+        if not args.no_reports:
+            with tempfile.TemporaryDirectory() as output_dir:
+                for name, func in report_cases(output_dir).items():
+                    results[name] = _measure(func, max(1, args.repeat // 2))
+    if not args.no_gui:
+        results.update(run_pages(args.repeat))
+
+    run = {'backend': backend_name, 'scale': args.scale, 'measurements': rows,
+           'python': platform.python_version(), 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+           'results': results}
+    width = max(map(len, results))
+    for name, r in results.items():
+        print(f"{name:<{width}}  {r['median_ms']:>10.2f} мс  (min {r['min_ms']:.2f}, max {r['max_ms']:.2f})")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(run, f, ensure_ascii=False, indent=2)
+
+    key = _baseline_key(backend_name, args.scale)
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baselines = json.load(f)
+    if args.update_baseline:
+        baselines[key] = run
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"✅ Baseline {key} сохранён в {args.baseline}")
+        return 0
+    if key not in baselines:
+        print(f"⚠️ Нет baseline для {key} — сравнение пропущено")
+        return 0
+    regressions = compare(results, baselines[key]['results'], args.threshold)
+    for name, before, after in regressions:
+        print(f"❌ {name}: {before:.2f} → {after:.2f} мс (x{after / before:.2f})")
+    if regressions:
+        return 1
+    print(f"✅ Регрессий относительно {key} нет (порог x{args.threshold})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# lis_project/benchmarks/seed.py
+"""Детерминированное заполнение базы синтетическими данными.
+
+Объём задаётся масштабом — числом измерений (1k / 100k / 1m); остальные
+таблицы получают пропорциональные объёмы (VOLUME_RATIOS), любой из них
+можно переопределить. Один и тот же seed даёт одни и те же данные.
+
+    python -m benchmarks.seed --scale 100k --sqlite /tmp/lis_bench.db --reset
+    python -m benchmarks.seed --scale 1k --volume samples=5000
+"""
+import argparse
+import datetime
+import random
+import time
+from peewee import chunked
+from . import backend
+
+SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+DEFAULT_SEED = 20240501
+INSERT_CHUNK_SIZE = 1000
+
+# Доля от числа измерений (и минимум) для каждой таблицы
+VOLUME_RATIOS = {
+    'researchers': (0.002, 5),
+    'experiments': (0.05, 20),
+    'samples': (0.05, 20),
+    'equipment': (0.002, 5),
+    'methods': (0.1, 20),
+    'results': (0.05, 10),
+    'conditions': (0.05, 10),
+}
+
+SURNAMES = ['Иванов', 'Петров', 'Смирнов', 'Кузнецов', 'Попов', 'Соколов', 'Лебедев', 'Козлов',
+            'Новиков', 'Морозов', 'Волков', 'Алексеев', 'Фёдоров', 'Михайлов', 'Беляев']
+NAMES = ['Александр', 'Мария', 'Дмитрий', 'Анна', 'Сергей', 'Елена', 'Андрей', 'Ольга',
+         'Павел', 'Наталья', 'Игорь', 'Татьяна']
+ORGANIZATIONS = ['Институт органической химии', 'Лаборатория физической химии', 'Кафедра аналитической химии',
+                 'Центр коллективного пользования', 'Отдел неорганического синтеза']
+DEGREES = [None, None, 'Кандидат химических наук', 'Доктор химических наук']
+# (название, формула, агрегатное состояние)
+SUBSTANCES = [('Хлорид натрия', 'NaCl', 'твёрдое'), ('Вода', 'H2O', 'жидкое'), ('Этанол', 'C2H5OH', 'жидкое'),
+              ('Серная кислота', 'H2SO4', 'жидкое'), ('Сульфат меди', 'CuSO4', 'твёрдое'),
+              ('Гидроксид натрия', 'NaOH', 'твёрдое'), ('Ацетон', 'C3H6O', 'жидкое'),
+              ('Глюкоза', 'C6H12O6', 'твёрдое'), ('Аммиак', 'NH3', 'газообразное'),
+              ('Углекислый газ', 'CO2', 'газообразное'), ('Перманганат калия', 'KMnO4', 'твёрдое')]
+EQUIPMENT = ['Спектрофотометр', 'pH-метр', 'Аналитические весы', 'Хроматограф', 'Термостат',
+             'Центрифуга', 'Вискозиметр', 'Кондуктометр', 'Муфельная печь', 'Ротационный испаритель']
+# (метод, свойство, единица, среднее, СКО, точность)
+MEASURED_PROPERTIES = [
+    ('Потенциометрия', 'pH', '', 7.0, 1.5, 0.01),
+    ('Термометрия', 'Температура', '°C', 25.0, 15.0, 0.1),
+    ('Гравиметрия', 'Масса', 'г', 10.0, 4.0, 0.001),
+    ('Денситометрия', 'Плотность', 'г/см³', 1.2, 0.3, 0.001),
+    ('Кондуктометрия', 'Электропроводность', 'мСм/см', 5.0, 2.0, 0.05),
+    ('Вискозиметрия', 'Вязкость', 'мПа·с', 3.0, 1.0, 0.01),
+]
+METHOD_NAMES = ['Титрование', 'Спектрофотометрия', 'Хроматография', 'Гравиметрия', 'Калориметрия',
+                'Рентгеноструктурный анализ', 'Перекристаллизация']
+RESULT_TYPES = ['Промежуточный', 'Итоговый', 'Отрицательный', 'Публикация']
+# Статусы экспериментов: доля завершённых растёт с давностью
+STATUS_WEIGHTS = (('completed', 0.55), ('in_progress', 0.25), ('planned', 0.2))
+HISTORY_DAYS = 3 * 365
+
+
+def volumes(scale='1k', overrides=None):
+    """Число строк для каждой таблицы при данном масштабе"""
+    measurements = SCALES[scale] if isinstance(scale, str) else int(scale)
+    result = {'measurements': measurements}
+    for name, (ratio, minimum) in VOLUME_RATIOS.items():
+        result[name] = max(minimum, int(measurements * ratio))
+    result.update(overrides or {})
+    return result
+
+
+class _Generator:
+    def __init__(self, seed, today):
+        self.rng = random.Random(seed)
+        self.today = today
+
+    def text(self, words, count):
+        return ' '.join(self.rng.choice(words) for _ in range(count))
+
+    def skewed_index(self, n):
+        """Индекс с перекосом к началу: часть образцов измеряется гораздо чаще остальных"""
+        return min(n - 1, int(n * self.rng.random() ** 2))
+
+    def past_date(self):
+        # Ближе к сегодняшнему дню экспериментов больше
+        return self.today - datetime.timedelta(days=int(HISTORY_DAYS * self.rng.random() ** 1.5))
+
+    def status(self, date_of_event):
+        if date_of_event > self.today - datetime.timedelta(days=30):
+            return self.rng.choice(('planned', 'in_progress'))
+        value, total = self.rng.random(), 0.0
+        for status, weight in STATUS_WEIGHTS:
+            total += weight
+            if value < total:
+                return status
+        return STATUS_WEIGHTS[-1][0]
+
+
+def _insert(database, model, fields, rows):
+    """Вставка кортежей rows (в порядке fields) пакетами через executemany"""
+    if not rows:
+        return 0
+    sql, _ = model.insert_many([rows[0]], fields=fields).sql()
+    cursor = database.cursor()
+    for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+        cursor.executemany(sql, chunk)
+    return len(rows)
+
+def _value(value):
+    # Даты строкой: одинаково принимают и MySQL, и SQLite
+    return str(value) if isinstance(value, (datetime.date, datetime.datetime)) else value
+
+
+def generate(counts, seed=DEFAULT_SEED, today=None):
+    """Строки для всех таблиц: {модель: (поля, [кортежи])}. id задаются явно, с 1."""
+    from database.models import (Researcher, Experiment, Sample, Equipment, Method, Result, Condition,
+                                 Measurement, ConductingAnExperiment, SampleInExperiment,
+                                 ExperimentalEquipment)
+    gen = _Generator(seed, today or datetime.date(2024, 6, 30))
+    rng = gen.rng
+    data = {}
+
+    rows = []
+    for i in range(1, counts['researchers'] + 1):
+        surname, name = rng.choice(SURNAMES), rng.choice(NAMES)
+        rows.append((i, surname, name, rng.choice(NAMES) + 'ович', gen.text(SURNAMES, 20),
+                     rng.choice(DEGREES), rng.choice(ORGANIZATIONS), f'user{i}@lab.example', None))
+    data[Researcher] = ([Researcher.id, Researcher.surname, Researcher.name, Researcher.patronymic,
+                         Researcher.biography, Researcher.academic_degree, Researcher.organization,
+                         Researcher.email, Researcher.URL], rows)
+
+    rows, experiment_dates = [], []
+    for i in range(1, counts['experiments'] + 1):
+        date_of_event = gen.past_date() if rng.random() > 0.02 else None
+        experiment_dates.append(date_of_event)
+        status = gen.status(date_of_event) if date_of_event else 'planned'
+        substance = rng.choice(SUBSTANCES)[0]
+        rows.append((i, f'Эксперимент {i}: {substance.lower()}', f'Исследование свойств: {substance.lower()}',
+                     gen.text(METHOD_NAMES, 40), gen.text(METHOD_NAMES, 15), _value(date_of_event), status))
+    data[Experiment] = ([Experiment.id, Experiment.name, Experiment.purpose, Experiment.description,
+                         Experiment.plan, Experiment.date_of_event, Experiment.status], rows)
+
+    rows = []
+    for i in range(1, counts['samples'] + 1):
+        name, formula, state = rng.choice(SUBSTANCES)
+        rows.append((i, f'{name} #{i}', gen.text(SURNAMES, 10), formula, state,
+                     round(rng.lognormvariate(1.5, 0.8), 3), round(rng.lognormvariate(2.0, 0.6), 2)))
+    data[Sample] = ([Sample.id, Sample.name, Sample.description, Sample.chemical_formula,
+                     Sample.aggregate_state, Sample.mass, Sample.volume], rows)
+
+    rows = [(i, f'{rng.choice(EQUIPMENT)} №{i}', gen.text(EQUIPMENT, 8)) for i in range(1, counts['equipment'] + 1)]
+    data[Equipment] = ([Equipment.id, Equipment.name, Equipment.description], rows)
+
+    n_exp = counts['experiments']
+    data[Method] = ([Method.id, Method.experiment, Method.name, Method.description],
+                    [(i, rng.randint(1, n_exp), rng.choice(METHOD_NAMES), gen.text(METHOD_NAMES, 12))
+                     for i in range(1, counts['methods'] + 1)])
+    data[Result] = ([Result.id, Result.experiment, Result.type, Result.description, Result.conclusions, Result.URL],
+                    [(i, rng.randint(1, n_exp), rng.choice(RESULT_TYPES), gen.text(SURNAMES, 25),
+                      gen.text(METHOD_NAMES, 10), None) for i in range(1, counts['results'] + 1)])
+
+    rows = []
+    for i in range(1, counts['conditions'] + 1):
+        rows.append((i, rng.randint(1, n_exp), round(rng.gauss(25, 10), 2), round(rng.gauss(101.3, 2), 2),
+                     round(min(100, max(0, rng.gauss(45, 15))), 2), round(min(9.99, max(0, rng.gauss(7, 1.5))), 2),
+                     rng.choice(('Дневной свет', 'Темнота', 'УФ-лампа', 'Лампа накаливания')),
+                     _value(datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=rng.randint(5, 600)))))
+    data[Condition] = ([Condition.id, Condition.experiment, Condition.temperature, Condition.pressure,
+                        Condition.humidity, Condition.pH, Condition.illumination, Condition.duration], rows)
+
+    # Связи: 1–2 исследователя, 1–4 образца и 0–3 единицы оборудования на эксперимент
+    conducting, sample_links, equipment_links = [], [], []
+    for exp_id in range(1, n_exp + 1):
+        for researcher_id in rng.sample(range(1, counts['researchers'] + 1), 1 + (rng.random() < 0.3)):
+            conducting.append((len(conducting) + 1, researcher_id, exp_id))
+        for sample_index in {gen.skewed_index(counts['samples']) for _ in range(rng.randint(1, 4))}:
+            sample_links.append((len(sample_links) + 1, sample_index + 1, exp_id))
+        for equipment_id in rng.sample(range(1, counts['equipment'] + 1), rng.randint(0, 3)):
+            equipment_links.append((len(equipment_links) + 1, equipment_id, exp_id))
+    data[ConductingAnExperiment] = ([ConductingAnExperiment.id, ConductingAnExperiment.researcher,
+                                     ConductingAnExperiment.experiment], conducting)
+    data[SampleInExperiment] = ([SampleInExperiment.id, SampleInExperiment.sample,
+                                 SampleInExperiment.experiment], sample_links)
+    data[ExperimentalEquipment] = ([ExperimentalEquipment.id, ExperimentalEquipment.equipment,
+                                    ExperimentalEquipment.experiment], equipment_links)
+
+    rows = []
+    start = datetime.datetime.combine(gen.today, datetime.time()) - datetime.timedelta(days=HISTORY_DAYS)
+    for i in range(1, counts['measurements'] + 1):
+        method, prop, unit, mean, sd, accuracy = rng.choice(MEASURED_PROPERTIES)
+        moment = start + datetime.timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))
+        rows.append((i, gen.skewed_index(counts['samples']) + 1, method, prop, round(rng.gauss(mean, sd), 4),
+                     unit, accuracy if rng.random() > 0.1 else None, _value(moment)))
+    data[Measurement] = ([Measurement.id, Measurement.sample, Measurement.method, Measurement.property,
+                          Measurement.value, Measurement.unit, Measurement.accuracy, Measurement.time_of_event], rows)
+    return data
+
+
+def seed(scale='1k', seed=DEFAULT_SEED, overrides=None, reset=False, today=None):
+    """Заполняет базу; таблицы должны быть пустыми (или reset=True). Возвращает {таблица: строк}."""
+    from database.connection import connection_scope
+    from database.models import ALL_MODELS
+    from database.rollups import ROLLUP_MODELS
+    from database.changes import ChangeLog
+    from database.migrations import SchemaMigration, run_migrations
+    from database import crud
+    from database import connection
+    database = connection.database
+
+    counts = volumes(scale, overrides)
+    with connection_scope():
+        if reset:
+            # Вместе с журналом миграций: run_migrations создаст всё заново
+            database.drop_tables(ALL_MODELS + ROLLUP_MODELS + [ChangeLog, SchemaMigration], safe=True)
+        run_migrations()
+        non_empty = [model._meta.table_name for model in ALL_MODELS if model.select().limit(1).exists()]
+        if non_empty:
+            raise RuntimeError(f"Таблицы не пусты: {', '.join(non_empty)} (используйте --reset)")
+
+        data = generate(counts, seed, today)
+        inserted = {}
+        with database.atomic():
+            for model in ALL_MODELS:  # порядок ALL_MODELS учитывает внешние ключи
+                fields, rows = data[model]
+                started = time.perf_counter()
+                inserted[model._meta.table_name] = _insert(database, model, fields, rows)
+                print(f"  {model._meta.table_name}: {len(rows)} строк за {time.perf_counter() - started:.2f} с")
+    crud.rebuild_rollups()
+    crud.query_cache.clear()
+    return inserted
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Заполнение базы LIS синтетическими данными")
+    parser.add_argument('--scale', default='1k', help="1k / 100k / 1m или число измерений")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--volume', action='append', default=[], metavar='ТАБЛИЦА=N',
+                        help="переопределить объём таблицы, например samples=5000")
+    parser.add_argument('--sqlite', metavar='ФАЙЛ', help="файл SQLite вместо базы из настроек (.env)")
+    parser.add_argument('--reset', action='store_true', help="пересоздать таблицы перед заполнением")
+    args = parser.parse_args(argv)
+
+    overrides = {}
+    for item in args.volume:
+        name, _, value = item.partition('=')
+        overrides[name] = int(value)
+    backend.configure(args.sqlite)
+    scale = args.scale if args.scale in SCALES else int(args.scale)
+    started = time.perf_counter()
+    inserted = seed(scale, args.seed, overrides, args.reset)
+    print(f"✅ Вставлено {sum(inserted.values())} строк за {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == '__main__':
+    main()
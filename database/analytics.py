@@ -0,0 +1,271 @@
+# lis_project/database/analytics.py
+"""Колоночное хранилище измерений для аналитики (NumPy).
+
+Измерения по фильтру (эксперимент, набор образцов, свойства, интервал времени)
+читаются с курсора пачками прямо в типизированные массивы, минуя объекты ORM:
+значения и точность — float64 (NaN, если точность не указана), время —
+datetime64[us] (NaT, если не указано или некорректно, например нулевая дата
+MySQL), образец/свойство/единица/метод — целочисленные коды со словарями.
+Статистика по группам (count/mean/std/min/max) считается векторно через
+np.bincount и ufunc.at.
+"""
+import time
+import numpy as np
+from peewee import MySQLDatabase
+from .connection import database
+from .models import Measurement, SampleInExperiment
+from .cache import cached_query
+from .crud import safe_db_operation
+from . import instrumentation
+
+FETCH_CHUNK_SIZE = 50000
+
+# Колонки, по которым можно группировать: имя -> (атрибут кодов, атрибут словаря)
+GROUP_KEYS = {
+    'sample': ('sample_code', 'sample_ids'),
+    'property': ('property_code', 'properties'),
+    'unit': ('unit_code', 'units'),
+    'method': ('method_code', 'methods'),
+}
+# Единица входит в группу по умолчанию: значения в разных единицах усреднять нельзя
+DEFAULT_GROUP_BY = ('property', 'unit', 'sample')
+# Составной ключ группы упаковывается в int64, пока произведение размеров словарей меньше этого
+PACKED_KEY_LIMIT = 2 ** 63
+
+
+class _Dictionary:
+    """Словарное кодирование строк: значение -> код по порядку появления"""
+    __slots__ = ('codes', 'labels')
+
+    def __init__(self):
+        self.codes = {}
+        self.labels = []
+
+    def encode(self, column):
+        codes = self.codes
+        for value in set(column).difference(codes):
+            codes[value] = len(self.labels)
+            self.labels.append(value)
+        return np.fromiter(map(codes.__getitem__, column), dtype=np.int32, count=len(column))
+
+
+class MeasurementFrame:
+    """Измерения в виде колонок одинаковой длины.
+
+    value, accuracy — float64; time — datetime64[us]; bad_time — bool, время
+    в БД некорректно (в time такие строки — NaT, как и строки без времени);
+    sample_code, property_code, unit_code, method_code — int32, индексы в
+    sample_ids (int64), properties, units, methods.
+    """
+    __slots__ = ('value', 'accuracy', 'time', 'bad_time', 'sample_code', 'property_code', 'unit_code',
+                 'method_code', 'sample_ids', 'properties', 'units', 'methods')
+
+    def __init__(self, value, accuracy, time, bad_time, sample_code, property_code, unit_code, method_code,
+                 sample_ids, properties, units, methods):
+        self.value = value
+        self.accuracy = accuracy
+        self.time = time
+        self.bad_time = bad_time
+        self.sample_code = sample_code
+        self.property_code = property_code
+        self.unit_code = unit_code
+        self.method_code = method_code
+        self.sample_ids = sample_ids
+        self.properties = properties
+        self.units = units
+        self.methods = methods
+
+    def __len__(self):
+        return len(self.value)
+
+    @property
+    def sample_id(self):
+        """id образца для каждой строки"""
+        return self.sample_ids[self.sample_code]
+
+    def property_mask(self, name):
+        """Маска строк со свойством name (без сравнения строк по всем строкам)"""
+        code = self.properties.index(name) if name in self.properties else -1
+        return self.property_code == code
+
+    def take(self, mask):
+        """Подмножество строк по маске или индексам; словари общие с исходным"""
+        return MeasurementFrame(self.value[mask], self.accuracy[mask], self.time[mask], self.bad_time[mask],
+                                self.sample_code[mask], self.property_code[mask],
+                                self.unit_code[mask], self.method_code[mask],
+                                self.sample_ids, self.properties, self.units, self.methods)
+
+
+def _measurement_query(experiment_id=None, sample_ids=None, properties=None, since=None, until=None):
+    query = Measurement.select(Measurement.sample, Measurement.property, Measurement.unit,
+                               Measurement.method, Measurement.value, Measurement.accuracy,
+                               Measurement.time_of_event)
+    if experiment_id is not None:
+        query = query.where(Measurement.sample.in_(
+            SampleInExperiment.select(SampleInExperiment.sample)
+            .where(SampleInExperiment.experiment == experiment_id)))
+    if sample_ids is not None:
+        query = query.where(Measurement.sample.in_(list(sample_ids)))
+    if properties is not None:
+        query = query.where(Measurement.property.in_(list(properties)))
+    if since is not None:
+        query = query.where(Measurement.time_of_event >= since)
+    if until is not None:
+        query = query.where(Measurement.time_of_event < until)
+    return query
+
+def _fetch_chunks(query, size):
+    """Строки запроса пачками по size без преобразований peewee. В MySQL — через SSCursor."""
+    sql, params = query.sql()
+    if isinstance(database, MySQLDatabase):
+        import pymysql.cursors
+        cursor = database.connection().cursor(pymysql.cursors.SSCursor)
+        started = time.perf_counter()
+        cursor.execute(sql, params)
+        instrumentation.record_statement(sql, params, time.perf_counter() - started)
+    else:
+        cursor = database.execute_sql(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+def _time_column(column):
+    """Время пачки -> (datetime64[us], маска некорректных). Нулевые даты MySQL
+    ('0000-00-00 00:00:00') драйвер отдаёт строкой — в массиве они NaT."""
+    try:
+        return np.array(column, dtype='datetime64[us]'), np.zeros(len(column), dtype=bool)
+    except ValueError:
+        pass
+    times = np.empty(len(column), dtype='datetime64[us]')
+    bad = np.zeros(len(column), dtype=bool)
+    for i, value in enumerate(column):
+        try:
+            times[i] = np.datetime64(value, 'us') if value is not None else np.datetime64('NaT')
+        except ValueError:
+            times[i] = np.datetime64('NaT')
+            bad[i] = True
+    return times, bad
+
+@safe_db_operation
+def load_measurements(experiment_id=None, sample_ids=None, properties=None, since=None, until=None,
+                      chunk_size=FETCH_CHUNK_SIZE):
+    """Загружает измерения по фильтру в MeasurementFrame.
+
+    since/until — границы time_of_event (until не включается); измерения без
+    времени в выборку с такими границами не попадают.
+    """
+    query = _measurement_query(experiment_id, sample_ids, properties, since, until)
+    property_dict, unit_dict, method_dict = _Dictionary(), _Dictionary(), _Dictionary()
+    columns = {name: [] for name in ('sample', 'property', 'unit', 'method', 'value', 'accuracy', 'time',
+                                     'bad_time')}
+    for rows in _fetch_chunks(query, chunk_size):
+        sample, prop, unit, method, value, accuracy, moment = zip(*rows)
+        columns['sample'].append(np.array(sample, dtype=np.int64))
+        columns['property'].append(property_dict.encode(prop))
+        columns['unit'].append(unit_dict.encode(unit))
+        columns['method'].append(method_dict.encode(method))
+        columns['value'].append(np.array(value, dtype=np.float64))
+        columns['accuracy'].append(np.array(accuracy, dtype=np.float64))
+        times, bad_time = _time_column(moment)
+        columns['time'].append(times)
+        columns['bad_time'].append(bad_time)
+
+    empty = {'sample': np.int64, 'property': np.int32, 'unit': np.int32, 'method': np.int32,
+             'value': np.float64, 'accuracy': np.float64, 'time': 'datetime64[us]', 'bad_time': bool}
+    data = {name: np.concatenate(parts) if parts else np.empty(0, dtype=empty[name])
+            for name, parts in columns.items()}
+    sample_ids, sample_code = np.unique(data['sample'], return_inverse=True)
+    return MeasurementFrame(data['value'], data['accuracy'], data['time'], data['bad_time'],
+                            sample_code.astype(np.int32), data['property'], data['unit'], data['method'],
+                            sample_ids, property_dict.labels, unit_dict.labels, method_dict.labels)
+
+
+def group_stats(frame, by=DEFAULT_GROUP_BY, ddof=0):
+    """Статистика значений по группам.
+
+    Возвращает колонки: по одной на каждый ключ из by ('sample' -> 'sample_id'),
+    плюс 'count', 'mean', 'std', 'min', 'max' (массивы NumPy одной длины).
+    Строки с некорректным временем (bad_time) не учитываются.
+    """
+    unknown = [key for key in by if key not in GROUP_KEYS]
+    if unknown:
+        raise ValueError(f"Группировка по {', '.join(unknown)} не поддерживается: {', '.join(GROUP_KEYS)}")
+    if frame.bad_time.any():
+        frame = frame.take(~frame.bad_time)
+
+    codes = [getattr(frame, GROUP_KEYS[name][0]) for name in by]
+    sizes = [max(len(getattr(frame, GROUP_KEYS[name][1])), 1) for name in by]
+    space = np.prod(sizes, dtype=np.float64)
+    if space < PACKED_KEY_LIMIT:
+        # Составной ключ группы: коды всех колонок, упакованные в одно int64
+        key = np.zeros(len(frame), dtype=np.int64)
+        for code, size in zip(codes, sizes):
+            key = key * size + code
+        if space <= max(len(frame), 1 << 20):
+            # Небольшое пространство ключей — перенумерация через bincount за O(n)
+            space = int(space)
+            groups = np.flatnonzero(np.bincount(key, minlength=space))
+            remap = np.empty(space, dtype=np.int64)
+            remap[groups] = np.arange(len(groups))
+            inverse = remap[key]
+        else:
+            groups, inverse = np.unique(key, return_inverse=True)
+        group_codes, remainder = [], groups
+        for size in reversed(sizes):
+            group_codes.insert(0, remainder % size)
+            remainder = remainder // size
+    else:
+        # Ключ переполнил бы int64 — уникальные строки матрицы кодов (n, k)
+        stacked = np.stack(codes, axis=1).astype(np.int64) if codes else np.zeros((len(frame), 0), np.int64)
+        groups, inverse = np.unique(stacked, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        group_codes = list(groups.T)
+
+    n_groups = len(groups)
+    values = frame.value
+    count = np.bincount(inverse, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(inverse, weights=values, minlength=n_groups) / count
+        deviation = values - mean[inverse]
+        squares = np.bincount(inverse, weights=deviation * deviation, minlength=n_groups)
+        std = np.sqrt(squares / (count - ddof))
+    std[count <= ddof] = np.nan
+    minimum = np.full(n_groups, np.inf)
+    maximum = np.full(n_groups, -np.inf)
+    np.minimum.at(minimum, inverse, values)
+    np.maximum.at(maximum, inverse, values)
+
+    result = {}
+    for name, codes in zip(by, group_codes):
+        labels = getattr(frame, GROUP_KEYS[name][1])
+        if name == 'sample':
+            result['sample_id'] = labels[codes]
+        else:
+            result[name] = np.array(labels, dtype=object)[codes] if labels else np.empty(0, dtype=object)
+    result = {name: result[name] for name in (('sample_id' if k == 'sample' else k) for k in by)}
+    result.update(count=count, mean=mean, std=std, min=minimum, max=maximum)
+    return result
+
+def stats_records(stats):
+    """Колонки group_stats -> список словарей (для таблиц и отчётов)"""
+    names = list(stats)
+    return [dict(zip(names, row)) for row in zip(*(stats[name].tolist() for name in names))]
+
+
+@cached_query(Measurement, SampleInExperiment)
+@safe_db_operation
+def get_measurement_stats(experiment_id=None, sample_ids=None, properties=None, since=None, until=None,
+                          by=DEFAULT_GROUP_BY):
+    """Сводка измерений по группам списком словарей: загрузка + group_stats.
+
+    sample_ids/properties передавайте кортежами — тогда результат кэшируется.
+    """
+    frame = load_measurements(experiment_id, sample_ids, properties, since, until)
+    if frame is None:
+        return None
+    return stats_records(group_stats(frame, by))
@@ -0,0 +1,285 @@
+# lis_project/database/cache.py
+"""Кэш результатов чтения из БД (read-through) с TTL, LRU-вытеснением и тегами.
+
+Каждая читающая функция помечается таблицами, которые она затрагивает,
+каждая изменяющая — таблицами, которые она меняет. Запись в таблицу
+увеличивает "поколение" её тега, и все закэшированные результаты,
+прочитанные при старом поколении, перестают считаться действительными.
+
+SnapshotCache — LRU снимков по ключу (агрегаты экспериментов по id):
+изменяющая функция сбрасывает только снимки затронутых ключей.
+
+Сбросы выполняются после коммита: изменяющие функции, вызванные внутри
+другой изменяющей функции или transaction_scope, копят их до выхода из самой
+внешней области записи (deferred_invalidation).
+"""
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+CACHE_CONFIG = {
+    'max_entries': int(os.environ.get('LIS_CACHE_MAX_ENTRIES', 256)),  # верхняя граница числа записей
+    'ttl': float(os.environ.get('LIS_CACHE_TTL', 60)),                 # время жизни записи (сек)
+    'enabled': os.environ.get('LIS_CACHE_DISABLED', '') in ('', '0')
+}
+
+SNAPSHOT_CONFIG = {
+    'max_entries': int(os.environ.get('LIS_SNAPSHOT_MAX_ENTRIES', 32)),  # сколько снимков держать
+    # Правки других клиентов точечная инвалидация не видит — снимок живёт не дольше записи кэша
+    'ttl': float(os.environ.get('LIS_SNAPSHOT_TTL', CACHE_CONFIG['ttl'])),
+}
+
+
+def _tag_names(models):
+    return tuple(model._meta.table_name for model in models)
+
+
+class QueryCache:
+    """Потокобезопасный LRU-кэш с TTL и инвалидацией по тегам (именам таблиц)"""
+
+    def __init__(self, max_entries=256, ttl=60.0, enabled=True):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries = OrderedDict()  # key -> (expires_at, tags, generations, value)
+        self._generations = {}         # tag -> номер поколения
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generations(self, tags):
+        with self._lock:
+            return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def get(self, key):
+        """Возвращает (True, значение) или (False, None), если записи нет или она устарела"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, tags, generations, value = entry
+                current = tuple(self._generations.get(tag, 0) for tag in tags)
+                if expires_at > time.monotonic() and generations == current:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key, tags, generations, value):
+        with self._lock:
+            current = tuple(self._generations.get(tag, 0) for tag in tags)
+            # Пока шло чтение, таблицу успели изменить — результат уже устарел
+            if generations != current:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, tags, generations, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+query_cache = QueryCache(**CACHE_CONFIG)
+
+
+class SnapshotCache:
+    """Потокобезопасный LRU снимков с TTL и точечной инвалидацией по ключу.
+
+    Снимок, чтение которого началось до сброса его ключа, не сохраняется:
+    перед чтением берётся epoch(key), put() сверяет его с текущим.
+    """
+
+    def __init__(self, max_entries=32, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, значение)
+        self._epochs = {}              # key -> номер поколения ключа
+        self._epoch_all = 0            # поколение сброса всех ключей
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def epoch(self, key):
+        with self._lock:
+            return self._epoch_all, self._epochs.get(key, 0)
+
+    def _live(self, key):
+        # Вызывается под self._lock; устаревший снимок сразу удаляется
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry
+
+    def get(self, key):
+        """Возвращает (True, значение) или (False, None), если снимка нет или он устарел"""
+        with self._lock:
+            entry = self._live(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._live(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def put(self, key, epoch, value):
+        with self._lock:
+            if epoch != (self._epoch_all, self._epochs.get(key, 0)):
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys=None):
+        """Сбрасывает снимки keys (None — все)"""
+        with self._lock:
+            if keys is None:
+                self._epoch_all += 1
+                self._entries.clear()
+                return
+            for key in keys:
+                self._epochs[key] = self._epochs.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+experiment_snapshots = SnapshotCache(**SNAPSHOT_CONFIG)
+
+
+def _copy_result(value):
+    # Списки и словари копируются поверхностно, чтобы вызывающий код
+    # (сортировка, фильтрация) не портил закэшированное значение
+    if isinstance(value, (list, dict)):
+        return copy.copy(value)
+    return value
+
+def cached_query(*models):
+    """Декоратор читающей функции: результат кэшируется с тегами таблиц models.
+
+    None (в т.ч. результат ошибки в safe_db_operation) не кэшируется.
+    Вызовы с нехешируемыми аргументами идут мимо кэша.
+    """
+    tags = _tag_names(models)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not query_cache.enabled:
+                return func(*args, **kwargs)
+            key = (func.__module__, func.__qualname__, args, tuple(sorted(kwargs.items())))
+            try:
+                found, value = query_cache.get(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            if found:
+                return _copy_result(value)
+            generations = query_cache.generations(tags)
+            value = func(*args, **kwargs)
+            if value is not None:
+                query_cache.put(key, tags, generations, value)
+            return _copy_result(value)
+        wrapper.cache_tags = tags
+        return wrapper
+    return decorator
+
+_pending = threading.local()
+
+@contextmanager
+def deferred_invalidation():
+    """Область записи. Сбросы кэшей внутри неё (after_write) выполняются при выходе
+    из самой внешней области — когда её транзакция уже закоммичена или откачена.
+    Иначе другой поток успел бы закэшировать незакоммиченные данные под новым поколением."""
+    depth = getattr(_pending, 'depth', 0)
+    if depth == 0:
+        _pending.actions = []
+    _pending.depth = depth + 1
+    try:
+        yield
+    finally:
+        _pending.depth -= 1
+        if _pending.depth == 0:
+            actions, _pending.actions = _pending.actions, []
+            for action in actions:
+                action()
+
+def after_write(action):
+    """Выполняет action (сброс кэша) по выходе из области записи или сразу, если её нет"""
+    if getattr(_pending, 'depth', 0):
+        _pending.actions.append(action)
+    else:
+        action()
+
+def invalidates(*models):
+    """Декоратор изменяющей функции: после вызова сбрасывает теги таблиц models.
+
+    Сброс выполняется и при ошибке — часть изменений могла дойти до БД.
+    Вложенный вызов сбрасывает теги вместе с внешним, после его коммита.
+    """
+    tags = _tag_names(models)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with deferred_invalidation():
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    after_write(lambda: query_cache.invalidate(*tags))
+        wrapper.cache_tags = tags
+        return wrapper
+    return decorator
+
+def invalidates_snapshots(cache, resolve):
+    """Декоратор изменяющей функции: resolve(*args, **kwargs) до вызова находит
+    ключи затронутых снимков (None — все), после вызова они сбрасываются.
+
+    Если ключи определить не удалось, сбрасываются все снимки.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            keys = None
+            if len(cache):  # пустой кэш — искать нечего, сбрасываются и чтения "в полёте"
+                try:
+                    keys = resolve(*args, **kwargs)
+                except Exception:
+                    keys = None
+            with deferred_invalidation():
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    after_write(lambda: cache.invalidate(keys))
+        return wrapper
+    return decorator
@@ -0,0 +1,137 @@
+# lis_project/database/changes.py
+"""Журнал изменений для инкрементального обновления страниц.
+
+Каждая запись в отслеживаемые таблицы (create/update/delete в database.crud)
+добавляет строку в change_log в той же транзакции. Номер строки журнала —
+монотонная "отметка" (watermark): страница запоминает отметку, на которой
+загрузила данные, и потом запрашивает только строки, изменённые после неё,
+и id удалённых.
+"""
+from peewee import Model, AutoField, CharField, IntegerField, BooleanField, DateTimeField, MySQLDatabase, SQL, fn
+from .connection import database
+from .models import Researcher, Experiment, Sample
+
+# Таблицы, изменения которых записываются в журнал (их показывают списочные страницы)
+TRACKED_MODELS = (Researcher, Experiment, Sample)
+CHANGE_LOG_RETENTION_DAYS = 7
+# Строка-метка очистки журнала: row_id = последний удалённый номер
+PRUNED_MARKER = '*'
+# Номер записи выдаётся при вставке, а видна она становится при коммите: транзакция,
+# начатая раньше, может закоммитить меньший номер уже после того, как страница
+# увидела больший. Пропуск среди записей последних CHANGE_LOG_SETTLE_SECONDS секунд
+# считается такой транзакцией, более старый — откатом (его номер не появится).
+# Пропуски ищутся не дальше CHANGE_LOG_OVERLAP номеров от последней записи.
+CHANGE_LOG_OVERLAP = 1000
+CHANGE_LOG_SETTLE_SECONDS = 60
+
+
+def server_time(seconds_ago=0):
+    """Выражение "время на сервере БД минус seconds_ago секунд".
+
+    Время записи и границы окна берутся по часам сервера: часы клиентов
+    расходятся, и отстающий клиент сдвинул бы отметку за ещё открытый пропуск.
+    """
+    seconds_ago = int(seconds_ago)
+    if isinstance(database, MySQLDatabase):
+        return fn.NOW() - SQL(f'INTERVAL {seconds_ago} SECOND')
+    return fn.datetime('now', 'localtime', f'-{seconds_ago} seconds')
+
+
+class ChangeLog(Model):
+    id = AutoField()
+    table = CharField(max_length=64)
+    row_id = IntegerField()
+    deleted = BooleanField(default=False)
+    changed_at = DateTimeField(default=server_time)
+
+    class Meta:
+        database = database
+        table_name = 'change_log'
+        indexes = (
+            (('table', 'id'), False),
+        )
+
+
+def record_changes(model, ids, deleted=False):
+    """Отмечает строки model с данными id изменёнными (или удалёнными)"""
+    if model not in TRACKED_MODELS:
+        return
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return
+    now = server_time()
+    table = model._meta.table_name
+    ChangeLog.insert_many([(table, row_id, deleted, now) for row_id in ids],
+                          fields=[ChangeLog.table, ChangeLog.row_id, ChangeLog.deleted,
+                                  ChangeLog.changed_at]).execute()
+
+def latest_id():
+    return ChangeLog.select(fn.MAX(ChangeLog.id)).scalar() or 0
+
+def current_watermark(top=None):
+    """Отметка, до которой журнал виден без пропусков.
+
+    Обычно это номер последней записи. Если среди недавних записей есть пропуск
+    (ещё не закоммиченная транзакция), отметка ставится перед ним: следующая
+    дельта перечитает журнал с этого места и не потеряет запоздавшую запись.
+    top — уже прочитанный latest_id().
+    """
+    if top is None:
+        top = latest_id()
+    floor = max(top - CHANGE_LOG_OVERLAP, 0)
+    settled_at = server_time(CHANGE_LOG_SETTLE_SECONDS)
+    # Последняя "устоявшаяся" запись: пропуски ниже неё — откаты, их не ждём
+    base = (ChangeLog
+            .select(fn.MAX(ChangeLog.id))
+            .where((ChangeLog.id > floor) & (ChangeLog.changed_at < settled_at))
+            .scalar()) or floor
+    if base == top:
+        return top
+    expected = base + 1
+    for (row_id,) in ChangeLog.select(ChangeLog.id).where(ChangeLog.id > base).order_by(ChangeLog.id).tuples():
+        if row_id != expected:
+            return expected - 1
+        expected = row_id + 1
+    return top
+
+def changes_since(watermark, upto):
+    """Изменения в интервале (watermark, upto]: {таблица: (изменённые id, удалённые id)}.
+
+    None — отметка устарела (журнал очищен после неё или база пересоздана),
+    нужна полная перезагрузка.
+    """
+    if watermark > upto:
+        return None
+    pruned = (ChangeLog
+              .select(fn.MAX(ChangeLog.row_id))
+              .where(ChangeLog.table == PRUNED_MARKER)
+              .scalar())
+    if pruned and watermark < pruned:
+        return None
+    result = {}
+    if watermark == upto:
+        return result
+    query = (ChangeLog
+             .select(ChangeLog.table, ChangeLog.row_id, fn.MAX(ChangeLog.deleted))
+             .where((ChangeLog.id > watermark) & (ChangeLog.id <= upto) &
+                    (ChangeLog.table != PRUNED_MARKER))
+             .group_by(ChangeLog.table, ChangeLog.row_id)
+             .tuples())
+    for table, row_id, deleted in query:
+        changed, removed = result.setdefault(table, (set(), set()))
+        # id не переиспользуются: удалённая однажды строка удалена окончательно
+        (removed if deleted else changed).add(row_id)
+    return result
+
+def prune_change_log(days=CHANGE_LOG_RETENTION_DAYS):
+    """Удаляет записи старше days дней; страницы со старой отметкой перезагрузятся целиком"""
+    cutoff = server_time(days * 24 * 3600)
+    last_old = (ChangeLog
+                .select(fn.MAX(ChangeLog.id))
+                .where((ChangeLog.changed_at < cutoff) & (ChangeLog.table != PRUNED_MARKER))
+                .scalar())
+    if not last_old:
+        return 0
+    removed = ChangeLog.delete().where(ChangeLog.id <= last_old).execute()
+    ChangeLog.create(table=PRUNED_MARKER, row_id=last_old)
+    return removed
@@ -1,22 +1,109 @@
-from peewee import MySQLDatabase
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from playhouse.pool import PooledMySQLDatabase, PooledSqliteDatabase, MaxConnectionsExceeded
+from pymysql.constants import CLIENT
+from . import instrumentation
+from .cache import deferred_invalidation
+
+# Настройки берутся из окружения и файла .env (см. .env.example)
+load_dotenv()
+
+# mysql — сервер лаборатории; sqlite — локальный файл без сервера
+# (отдельное рабочее место, бенчмарки, CI)
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').strip().lower()
 
 DB_CONFIG = {
-    'host': '127.0.0.1',
-    'port': 3306,
-    'user': 'mikki@localhost',
-    'password': '07bcf91@K',
-    'database': 'elfimova',
+    'host': os.getenv('DB_HOST', '127.0.0.1'),
+    'port': int(os.getenv('DB_PORT', '3306')),
+    'user': os.getenv('DB_USER', 'root'),
+    'password': os.getenv('DB_PASSWORD', ''),
+    'database': os.getenv('DB_NAME', 'lis_db'),
     'charset': 'utf8mb4'
 }
 
-database = MySQLDatabase(
-    DB_CONFIG['database'],
-    host=DB_CONFIG['host'],
-    port=DB_CONFIG['port'],
-    user=DB_CONFIG['user'],
-    password=DB_CONFIG['password'],
-    charset=DB_CONFIG['charset']
-)
+SQLITE_PATH = os.getenv('DB_PATH', 'lis.db')
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',  # читатели не блокируют писателя и друг друга
+    # В режиме WAL normal не портит базу при сбое, теряется лишь последняя транзакция
+    'synchronous': os.getenv('DB_SQLITE_SYNCHRONOUS', 'normal'),
+    'cache_size': -1024 * int(os.getenv('DB_SQLITE_CACHE_MB', '64')),  # отрицательное — в КБ
+    'mmap_size': 1024 * 1024 * int(os.getenv('DB_SQLITE_MMAP_MB', '256')),
+    'temp_store': 'memory',
+    'foreign_keys': 1,  # как InnoDB: ссылки проверяются, ON DELETE CASCADE работает
+    'busy_timeout': 10000,  # мс ожидания блокировки записи другим потоком
+}
+
+# Параметры пула соединений
+POOL_CONFIG = {
+    'max_connections': 8,   # верхняя граница числа открытых соединений
+    'stale_timeout': 300,   # максимальный возраст соединения (сек), после — переоткрывается
+    'timeout': 10           # сколько ждать свободного соединения, если пул исчерпан (сек)
+}
+
+class _InstrumentedMixin:
+    """Сообщает о каждом запросе в database.instrumentation"""
+
+    def execute_sql(self, sql, params=None, *args, **kwargs):
+        if not instrumentation.enabled():
+            return super().execute_sql(sql, params, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().execute_sql(sql, params, *args, **kwargs)
+        finally:
+            instrumentation.record_statement(sql, params, time.perf_counter() - started)
+
+class InstrumentedPooledMySQLDatabase(_InstrumentedMixin, PooledMySQLDatabase):
+    pass
+
+class InstrumentedPooledSqliteDatabase(_InstrumentedMixin, PooledSqliteDatabase):
+    pass
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def create_database(backend=DB_BACKEND, sqlite_path=SQLITE_PATH):
+    """База для выбранного backend ('mysql' или 'sqlite')"""
+    if backend == 'sqlite':
+        # Пул держит соединения открытыми: прагмы и кэш страниц не теряются между запросами
+        sqlite_db = InstrumentedPooledSqliteDatabase(
+            sqlite_path,
+            pragmas=SQLITE_PRAGMAS,
+            # Соединение из пула может достаться другому потоку DataLoader
+            check_same_thread=False,
+            max_connections=POOL_CONFIG['max_connections'],
+            stale_timeout=POOL_CONFIG['stale_timeout'],
+            timeout=POOL_CONFIG['timeout']
+        )
+        # LOWER и LIKE в SQLite не различают регистр только у ASCII — для поиска
+        # по кириллице строки приводятся к одному регистру функцией casefold()
+        sqlite_db.register_function(_casefold, 'casefold', 1)
+        return sqlite_db
+    if backend != 'mysql':
+        raise ValueError(f"Неизвестный DB_BACKEND: {backend!r} (ожидается mysql или sqlite)")
+    # Пул сам проверяет соединение (ping) при выдаче и отбрасывает "мёртвые"
+    return InstrumentedPooledMySQLDatabase(
+        DB_CONFIG['database'],
+        host=DB_CONFIG['host'],
+        port=DB_CONFIG['port'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        charset=DB_CONFIG['charset'],
+        max_connections=POOL_CONFIG['max_connections'],
+        stale_timeout=POOL_CONFIG['stale_timeout'],
+        timeout=POOL_CONFIG['timeout'],
+        # rowcount UPDATE = число найденных строк, а не только реально изменённых:
+        # update_* возвращают 0 лишь для несуществующего id (в SQLite так по умолчанию)
+        client_flag=CLIENT.FOUND_ROWS
+    )
+
+database = create_database()
+
+_scope = threading.local()
 
 def connect_db():
     if database.is_closed():
@@ -24,5 +111,64 @@ def connect_db():
     return True
 
 def close_db():
+    # Для пула close() не рвёт TCP-соединение, а возвращает его в пул
     if not database.is_closed():
         database.close()
+
+@contextmanager
+def connection_scope():
+    """Реентерабельная область соединения.
+
+    Внешний вход берёт соединение из пула, вложенные входы (в том же потоке)
+    используют его же. Соединение возвращается в пул только при выходе
+    из самой внешней области.
+    """
+    depth = getattr(_scope, 'depth', 0)
+    if depth == 0:
+        _scope.opened = database.is_closed()
+        if _scope.opened:
+            started = time.perf_counter()
+            database.connect()
+            instrumentation.record_connect(time.perf_counter() - started)
+    _scope.depth = depth + 1
+    try:
+        yield database
+    finally:
+        # Счётчик, а не восстановление сохранённой глубины: области, открытые
+        # в генераторах, могут закрываться не в том порядке, в каком открывались
+        _scope.depth -= 1
+        if _scope.depth == 0 and _scope.opened:
+            _scope.opened = False
+            close_db()
+
+@contextmanager
+def dedicated_connection():
+    """Отдельное соединение из пула, не связанное с соединением потока.
+
+    Для генераторов, которые держат курсор открытым между yield: у каждого
+    своё соединение, поэтому их можно читать вперемешку в одном потоке.
+    """
+    started = time.perf_counter()
+    deadline = time.monotonic() + POOL_CONFIG['timeout']
+    while True:
+        try:
+            conn = database._connect()
+            break
+        except MaxConnectionsExceeded:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+    instrumentation.record_connect(time.perf_counter() - started)
+    try:
+        yield conn
+    finally:
+        database._close(conn)
+
+@contextmanager
+def transaction_scope():
+    """Область соединения + транзакция (вложенные области становятся savepoint'ами).
+    Сбросы кэшей изменяющих функций внутри неё выполняются после коммита."""
+    with deferred_invalidation():
+        with connection_scope():
+            with database.atomic():
+                yield database
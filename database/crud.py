@@ -1,30 +1,210 @@
-from .connection import connect_db, close_db, database  
+from .connection import connect_db, close_db, database, connection_scope, transaction_scope, dedicated_connection
+from .cache import (
+    cached_query, invalidates, query_cache, experiment_snapshots, invalidates_snapshots, after_write
+)
+from . import instrumentation
+from . import rollups
+from . import changes
+from .rows import SampleRow, ResearcherRow, EquipmentRow, select_rows, fetch_rows
+from .rollups import ExperimentMonthRollup, ExperimentStatusRollup, ResearcherExperimentRollup
 from .models import (
     Researcher, Experiment, Sample, Equipment, Method, Result,
     Measurement, Condition,
     ConductingAnExperiment, ExperimentalEquipment, SampleInExperiment
 )
-from peewee import fn
+from peewee import fn, JOIN, prefetch, chunked, MySQLDatabase
+from functools import wraps
 import datetime
+import time
 
 def safe_db_operation(func):
-    """Декоратор для безопасной работы с базой данных"""
+    """Декоратор для безопасной работы с базой данных.
+
+    Соединение берётся из пула через реентерабельную область: вложенные
+    и последовательные вызовы внутри одной области используют одно соединение.
+    """
+    @wraps(func)
     def wrapper(*args, **kwargs):
-        try:
-            connect_db()
-            return func(*args, **kwargs)
-        except Exception as e:
-            print(f"DB Error in {func.__name__}: {e}")
-            return None
-        finally:
-            close_db()
+        with instrumentation.track_call(func.__name__) as call:
+            try:
+                with connection_scope():
+                    result = func(*args, **kwargs)
+            except Exception as e:
+                print(f"DB Error in {func.__name__}: {e}")
+                return None
+            instrumentation.set_result(call, result)
+            return result
     return wrapper
 
 
+# === СНИМКИ ЭКСПЕРИМЕНТОВ ===
+# Изменяющие функции сбрасывают в experiment_snapshots только снимки затронутых
+# экспериментов. Резолвер получает аргументы функции и до записи находит id
+# экспериментов (None — сбросить все).
+
+def invalidates_experiments(resolve):
+    def resolve_in_scope(*args, **kwargs):
+        with connection_scope():
+            return resolve(*args, **kwargs)
+    return invalidates_snapshots(experiment_snapshots, resolve_in_scope)
+
+def _all_experiments(*args, **kwargs):
+    return None
+
+def _experiment_arg(experiment_id, *args, **kwargs):
+    return [experiment_id]
+
+def _experiments_of(model):
+    """Резолвер для записи model с полем experiment; id записи — первый аргумент"""
+    def resolve(record_id, *args, **kwargs):
+        return [experiment_id for (experiment_id,) in
+                model.select(model.experiment).where(model.id == record_id).tuples()]
+    return resolve
+
+def _experiments_with_samples(sample_ids):
+    return [experiment_id for (experiment_id,) in
+            (SampleInExperiment
+             .select(SampleInExperiment.experiment)
+             .where(SampleInExperiment.sample.in_(list(sample_ids)))
+             .distinct()
+             .tuples())]
+
+def _sample_experiments(sample_id, *args, **kwargs):
+    return _experiments_with_samples([sample_id])
+
+def _linked_sample_experiments(experiment_id, sample_id, *args, **kwargs):
+    return [experiment_id] + _experiments_with_samples([sample_id])
+
+def _measurement_experiments(measurement_id, *args, **kwargs):
+    # Измерение видно во всех экспериментах своего образца (и нового, если образец меняют)
+    sample_ids = [sample_id for (sample_id,) in
+                  Measurement.select(Measurement.sample).where(Measurement.id == measurement_id).tuples()]
+    for field in ('sample', 'sample_id'):
+        if kwargs.get(field) is not None:
+            sample_ids.append(kwargs[field])
+    return _experiments_with_samples(sample_ids)
+
+def _equipment_experiments(equipment_id, *args, **kwargs):
+    return [experiment_id for (experiment_id,) in
+            (ExperimentalEquipment
+             .select(ExperimentalEquipment.experiment)
+             .where(ExperimentalEquipment.equipment == equipment_id)
+             .distinct()
+             .tuples())]
+
+def _researcher_experiments(researcher_id, *args, **kwargs):
+    return [experiment_id for (experiment_id,) in
+            (ConductingAnExperiment
+             .select(ConductingAnExperiment.experiment)
+             .where(ConductingAnExperiment.researcher == researcher_id)
+             .distinct()
+             .tuples())]
+
+def _new_sample_experiments(name, description, chemical_formula, aggregate_state, mass, volume, researcher_id):
+    # Образец попадает в эксперимент исследователя по умолчанию
+    return _researcher_experiments(researcher_id)
+
+
+# === ОБНОВЛЕНИЕ ПОЛЕЙ ===
+# update_* пишут только переданные колонки одним UPDATE без предварительного
+# SELECT и возвращают число затронутых строк (0 — записи с таким id нет).
+
+UPDATE_BATCH_SIZE = 1000  # id в одном UPDATE ... WHERE id IN (...)
+
+def _update_changes(model, update_data):
+    """Проверяет имена полей по модели: {поле: значение} для UPDATE"""
+    meta = model._meta
+    changes, unknown = {}, []
+    for name, value in update_data.items():
+        field = meta.combined.get(name)  # и имя поля, и колонка ('sample' / 'sample_id')
+        if field is None or field is meta.primary_key:
+            unknown.append(name)
+        else:
+            changes[field] = value
+    if unknown:
+        raise ValueError(f"{model.__name__}: нельзя обновить поля {', '.join(unknown)}")
+    return changes
+
+def _update_rows(model, ids, update_data):
+    """UPDATE model SET <переданные поля> WHERE id IN (ids); возвращает число строк"""
+    fields = _update_changes(model, update_data)
+    ids = list(dict.fromkeys(ids))
+    count = 0
+    with database.atomic():
+        for batch in chunked(ids, UPDATE_BATCH_SIZE):
+            condition = model.id == batch[0] if len(batch) == 1 else model.id.in_(batch)
+            if not fields:
+                count += model.select().where(condition).count()  # нечего менять: сколько записей есть
+                continue
+            updated = model.update(fields).where(condition).execute()
+            count += updated
+            if updated and updated < len(batch):
+                # Часть id не существует: в журнал — только найденные строки
+                batch = [row_id for (row_id,) in model.select(model.id).where(condition).tuples()]
+            if updated:
+                changes.record_changes(model, batch)
+    return count
+
+def _update_experiments(ids, update_data):
+    """Обновление экспериментов с поправкой сводных таблиц по месяцам и статусам"""
+    _update_changes(Experiment, update_data)
+    ids = list(dict.fromkeys(ids))
+    if 'date_of_event' not in update_data and 'status' not in update_data:
+        return _update_rows(Experiment, ids, update_data)
+    new_date = update_data.get('date_of_event')
+    if new_date is not None:
+        new_date = Experiment.date_of_event.python_value(new_date)  # строка 'ГГГГ-ММ-ДД' -> date
+    with database.atomic():
+        old_rows = []
+        for batch in chunked(ids, UPDATE_BATCH_SIZE):
+            old_rows.extend(Experiment
+                            .select(Experiment.date_of_event, Experiment.status)
+                            .where(Experiment.id.in_(batch))
+                            .tuples())
+        count = _update_rows(Experiment, ids, update_data)
+        rollups.experiments_changed(
+            (old_date, old_status,
+             new_date if 'date_of_event' in update_data else old_date,
+             update_data.get('status', old_status))
+            for old_date, old_status in old_rows)
+    return count
+
+# Групповое обновление: модель -> таблицы, чей кэш нужно сбросить
+_BATCH_UPDATE_TAGS = {
+    Researcher: (Researcher,),
+    Experiment: (Experiment, ExperimentMonthRollup, ExperimentStatusRollup),
+    Sample: (Sample,),
+    Equipment: (Equipment,),
+    Method: (Method,),
+    Result: (Result,),
+    Condition: (Condition,),
+    Measurement: (Measurement,),
+}
+
+@safe_db_operation
+def update_many(model, ids, **update_data):
+    """Одинаковые значения полей для многих записей; возвращает число строк.
+
+    update_many(Sample, [1, 2, 3], aggregate_state='жидкое')
+    """
+    if model not in _BATCH_UPDATE_TAGS:
+        raise ValueError(f"Групповое обновление {model.__name__} не поддерживается")
+    try:
+        if model is Experiment:
+            return _update_experiments(ids, update_data)
+        return _update_rows(model, ids, update_data)
+    finally:
+        tags = [table._meta.table_name for table in _BATCH_UPDATE_TAGS[model]]
+        after_write(lambda: query_cache.invalidate(*tags))
+        after_write(experiment_snapshots.invalidate)
+
+
 # === RESEARCHER ===
+@cached_query(Researcher)
 @safe_db_operation
 def get_all_researchers():
-    return list(Researcher.select())
+    """Список исследователей для таблиц: ResearcherRow (id, surname, name, organization)"""
+    return fetch_rows(ResearcherRow, select_rows(ResearcherRow, Researcher).order_by(Researcher.id))
 
 @safe_db_operation
 def get_researcher_by_id(researcher_id):
@@ -33,211 +213,272 @@ def get_researcher_by_id(researcher_id):
     except Researcher.DoesNotExist:
         return None
 
+@invalidates_experiments(_researcher_experiments)
+@invalidates(Researcher)
 @safe_db_operation
 def update_researcher(researcher_id, **update_data):
-    researcher = Researcher.get_by_id(researcher_id)
-    for field, value in update_data.items():
-        if hasattr(researcher, field):
-            setattr(researcher, field, value)
-    researcher.save()
-    return True
+    return _update_rows(Researcher, [researcher_id], update_data)
 
+@invalidates_experiments(_researcher_experiments)
+@invalidates(Researcher, ConductingAnExperiment, ResearcherExperimentRollup)
 @safe_db_operation
 def delete_researcher(researcher_id):
     with database.atomic():
         # Удаляем связанные записи
+        _record_researcher_removed(researcher_id)
         ConductingAnExperiment.delete().where(ConductingAnExperiment.researcher == researcher_id).execute()
+        rollups.researcher_removed(researcher_id)
         # Удаляем исследователя
         Researcher.delete_by_id(researcher_id)
     return True
 
 
 # === EXPERIMENT ===
+@invalidates(Experiment, ConductingAnExperiment, *rollups.ROLLUP_MODELS)
 @safe_db_operation
 def create_experiment(name, purpose, description="", plan="", status="planned", date_of_event=None, researcher_id=None):
-    experiment = Experiment.create(
-        name=name,
-        purpose=purpose,
-        description=description,
-        plan=plan,
-        status=status,
-        date_of_event=date_of_event or datetime.date.today()
-    )
-    if researcher_id:
-        ConductingAnExperiment.create(experiment=experiment.id, researcher=researcher_id)
+    # Диалоги передают дату строкой 'ГГГГ-ММ-ДД', сводным таблицам нужен date
+    date_of_event = Experiment.date_of_event.python_value(date_of_event) if date_of_event else datetime.date.today()
+    with database.atomic():
+        experiment = Experiment.create(
+            name=name,
+            purpose=purpose,
+            description=description,
+            plan=plan,
+            status=status,
+            date_of_event=date_of_event
+        )
+        if researcher_id:
+            ConductingAnExperiment.create(experiment=experiment.id, researcher=researcher_id)
+        rollups.experiment_added(experiment.date_of_event, experiment.status,
+                                 [researcher_id] if researcher_id else [])
+        changes.record_changes(Experiment, [experiment.id])
     return experiment
 
-@safe_db_operation
-def get_all_experiments_with_researchers():
-    experiments = []
-    for exp in Experiment.select():
-        researchers = (Researcher
-                       .select()
-                       .join(ConductingAnExperiment)
-                       .where(ConductingAnExperiment.experiment == exp.id))
-        main = f"{researchers[0].surname} {researchers[0].name}" if researchers else "Не указан"
-        date_str = exp.date_of_event.strftime('%d.%m.%Y') if exp.date_of_event else 'Не указана'
-        experiments.append({
-            'id': exp.id,
-            'name': exp.name,
-            'purpose': exp.purpose,
-            'status': exp.status,
-            'date': date_str,
-            'date_of_event': exp.date_of_event,
-            'description': exp.description,
-            'researcher': main
-        })
-    return experiments
-
-@safe_db_operation
-def get_my_experiments(researcher_id):
-    experiments = (Experiment
-                   .select()
-                   .join(ConductingAnExperiment)
-                   .where(ConductingAnExperiment.researcher == researcher_id))
+def _experiments_list_query(list_only=False):
+    first_link = (ConductingAnExperiment
+                  .select(ConductingAnExperiment.experiment.alias('experiment_id'),
+                          fn.MIN(ConductingAnExperiment.id).alias('link_id'))
+                  .group_by(ConductingAnExperiment.experiment)
+                  .alias('first_link'))
+    columns = [Experiment.id, Experiment.name, Experiment.purpose,
+               Experiment.status, Experiment.date_of_event]
+    if not list_only:
+        columns.append(Experiment.description)
+    return (Experiment
+            .select(*columns,
+                    Researcher.surname.alias('researcher_surname'),
+                    Researcher.name.alias('researcher_name'))
+            .join(first_link, JOIN.LEFT_OUTER, on=(first_link.c.experiment_id == Experiment.id))
+            .join(ConductingAnExperiment, JOIN.LEFT_OUTER, on=(ConductingAnExperiment.id == first_link.c.link_id))
+            .join(Researcher, JOIN.LEFT_OUTER, on=(Researcher.id == ConductingAnExperiment.researcher))
+            .order_by(Experiment.id))
+
+def _experiment_list_row(row, list_only=False):
+    date_of_event = row['date_of_event']
+    exp = {
+        'id': row['id'],
+        'name': row['name'],
+        'purpose': row['purpose'],
+        'status': row['status'],
+        'date': date_of_event.strftime('%d.%m.%Y') if date_of_event else 'Не указана',
+        'date_of_event': date_of_event,
+        'researcher': (f"{row['researcher_surname']} {row['researcher_name']}"
+                       if row['researcher_surname'] is not None else "Не указан")
+    }
+    if not list_only:
+        exp['description'] = row['description']
+    return exp
+
+@cached_query(Experiment, ConductingAnExperiment, Researcher)
+@safe_db_operation
+def get_all_experiments_with_researchers(list_only=False):
+    """Все эксперименты с основным исследователем — одним запросом.
+
+    Основной исследователь — первая (по id) запись в conducting_an_experiment.
+    При list_only=True большие текстовые поля (description, plan) не загружаются
+    и ключа 'description' в результате нет.
+    """
+    query = _experiments_list_query(list_only).dicts()
+    return [_experiment_list_row(row, list_only) for row in query]
+
+def _remove_from_rollups(experiment_id):
+    """Вычитает эксперимент из сводных таблиц (вызывать до удаления его связей)"""
+    exp = (Experiment
+           .select(Experiment.date_of_event, Experiment.status)
+           .where(Experiment.id == experiment_id)
+           .first())
+    if exp is None:
+        return
+    researcher_ids = [rid for (rid,) in (ConductingAnExperiment
+                                         .select(ConductingAnExperiment.researcher)
+                                         .where(ConductingAnExperiment.experiment == experiment_id)
+                                         .tuples())]
+    rollups.experiment_removed(exp.date_of_event, exp.status, researcher_ids)
+
+def _record_experiment_removed(experiment_id):
+    """Журнал изменений: эксперимент удалён, его образцы могут выпасть из "Моих образцов" """
+    sample_ids = [sid for (sid,) in (SampleInExperiment
+                                     .select(SampleInExperiment.sample)
+                                     .where(SampleInExperiment.experiment == experiment_id)
+                                     .tuples())]
+    changes.record_changes(Sample, sample_ids)
+    changes.record_changes(Experiment, [experiment_id], deleted=True)
+
+def _record_researcher_removed(researcher_id):
+    """Журнал изменений: исследователь удалён, у его экспериментов меняется колонка исследователя"""
+    experiment_ids = [eid for (eid,) in (ConductingAnExperiment
+                                         .select(ConductingAnExperiment.experiment)
+                                         .where(ConductingAnExperiment.researcher == researcher_id)
+                                         .tuples())]
+    changes.record_changes(Experiment, experiment_ids)
+    changes.record_changes(Researcher, [researcher_id], deleted=True)
+
+@cached_query(Experiment, ConductingAnExperiment)
+@safe_db_operation
+def get_my_experiments(researcher_id, list_only=False):
+    """Эксперименты исследователя; при list_only=True без ключа 'description'"""
+    return _my_experiment_rows(_my_experiments_query(researcher_id, list_only), list_only)
+
+def _my_experiments_query(researcher_id, list_only=False):
+    columns = [Experiment.id, Experiment.name, Experiment.purpose,
+               Experiment.status, Experiment.date_of_event]
+    if not list_only:
+        columns.append(Experiment.description)
+    return (Experiment
+            .select(*columns)
+            .join(ConductingAnExperiment)
+            .where(ConductingAnExperiment.researcher == researcher_id))
+
+def _my_experiment_rows(query, list_only=False):
     result = []
-    for exp in experiments:
-        date_str = exp.date_of_event.strftime('%d.%m.%Y') if exp.date_of_event else ''
-        result.append({
-            'id': exp.id,
-            'name': exp.name,
-            'purpose': exp.purpose,
-            'status': exp.status,
-            'date': date_str,
-            'date_of_event': exp.date_of_event,
-            'description': exp.description
-        })
+    for row in query.tuples():
+        exp_id, name, purpose, status, date_of_event = row[:5]
+        exp = {
+            'id': exp_id,
+            'name': name,
+            'purpose': purpose,
+            'status': status,
+            'date': date_of_event.strftime('%d.%m.%Y') if date_of_event else '',
+            'date_of_event': date_of_event
+        }
+        if not list_only:
+            exp['description'] = row[5]
+        result.append(exp)
     return result
 
-@safe_db_operation
-def get_experiment_with_relations(experiment_id):
-    try:
-        exp = Experiment.get_by_id(experiment_id)
-        researchers = list(Researcher.select().join(ConductingAnExperiment).where(ConductingAnExperiment.experiment == experiment_id))
-        methods = list(Method.select().where(Method.experiment == experiment_id))
-        samples = list(Sample.select().join(SampleInExperiment).where(SampleInExperiment.experiment == experiment_id))
-        equipment = list(Equipment.select().join(ExperimentalEquipment).where(ExperimentalEquipment.experiment == experiment_id))
-        results = list(Result.select().where(Result.experiment == experiment_id))
-        conditions = list(Condition.select().where(Condition.experiment == experiment_id))
-        
-        # Получаем ID образцов, связанных с экспериментом
-        sample_ids = [s.id for s in samples]
-        # Получаем измерения для этих образцов
-        measurements = list(Measurement.select().where(Measurement.sample.in_(sample_ids)))
-
-        return {
-            'experiment': exp,
-            'researchers': researchers,
-            'methods': methods,
-            'samples': samples,
-            'equipment': equipment,
-            'results': results,
-            'conditions': conditions,
-            'measurements': measurements
-        }
-    except Exception as e:
-        print(f"Ошибка загрузки эксперимента {experiment_id}: {e}")
-        return None
-        
-        # Безопасное получение исследователей
-        try:
-            researchers = list(
-                Researcher
+# Связи эксперимента, которые умеет загружать get_experiment_with_relations
+EXPERIMENT_RELATIONS = ('researchers', 'methods', 'samples', 'equipment',
+                        'results', 'conditions', 'measurements')
+
+# Заголовок карточки эксперимента: остальные связи карточка догружает по вкладкам
+EXPERIMENT_HEADER_RELATIONS = ('researchers',)
+
+# Связи "один-ко-многим" подгружаются через prefetch вместе с самим экспериментом
+_PREFETCH_RELATIONS = {'methods': Method, 'results': Result, 'conditions': Condition}
+
+def _load_researchers(experiment_id):
+    return list(Researcher
                 .select()
                 .join(ConductingAnExperiment)
                 .where(ConductingAnExperiment.experiment == experiment_id)
-            )
-        except Exception as e:
-            print(f"Ошибка загрузки исследователей: {e}")
-            researchers = []
+                .order_by(ConductingAnExperiment.id))
 
-        # Безопасное получение методов
-        try:
-            methods = list(Method.select().where(Method.experiment == experiment_id))
-        except Exception as e:
-            print(f"Ошибка загрузки методов: {e}")
-            methods = []
-
-        # Безопасное получение образцов
-        try:
-            samples = list(
-                Sample
+def _load_samples(experiment_id):
+    return list(Sample
                 .select()
                 .join(SampleInExperiment)
-                .where(SampleInExperiment.experiment == experiment_id)
-            )
-        except Exception as e:
-            print(f"Ошибка загрузки образцов: {e}")
-            samples = []
+                .where(SampleInExperiment.experiment == experiment_id))
 
-        # Безопасное получение оборудования
-        try:
-            equipment = list(
-                Equipment
+def _load_equipment(experiment_id):
+    return list(Equipment
                 .select()
                 .join(ExperimentalEquipment)
-                .where(ExperimentalEquipment.experiment == experiment_id)
-            )
-        except Exception as e:
-            print(f"Ошибка загрузки оборудования: {e}")
-            equipment = []
-
-        # Безопасное получение результатов
-        try:
-            results = list(Result.select().where(Result.experiment == experiment_id))
-        except Exception as e:
-            print(f"Ошибка загрузки результатов: {e}")
-            results = []
-
-        # Безопасное получение условий
-        try:
-            conditions = list(Condition.select().where(Condition.experiment == experiment_id))
-        except Exception as e:
-            print(f"Ошибка при загрузке условий: {e}")
-            import traceback
-            traceback.print_exc()
-            conditions = []
-
-        # Безопасное получение измерений
-        try:
-            sample_ids = [s.id for s in samples]
-            measurements = list(Measurement.select().where(Measurement.sample.in_(sample_ids)))
-        except Exception as e:
-            print(f"Ошибка загрузки измерений: {e}")
-            measurements = []
-
-        return {
-            'experiment': exp,
-            'researchers': researchers,
-            'methods': methods,
-            'samples': samples,
-            'equipment': equipment,
-            'results': results,
-            'conditions': conditions,
-            'measurements': measurements
-        }
-    except Experiment.DoesNotExist:
+                .where(ExperimentalEquipment.experiment == experiment_id))
+
+def _load_measurements(experiment_id):
+    # Образец выбирается тем же JOIN'ом, поэтому m.sample.name не делает запросов
+    sample_ids = (SampleInExperiment
+                  .select(SampleInExperiment.sample)
+                  .where(SampleInExperiment.experiment == experiment_id))
+    return list(Measurement
+                .select(Measurement, Sample)
+                .join(Sample)
+                .where(Measurement.sample.in_(sample_ids)))
+
+_JOIN_LOADERS = {
+    'researchers': _load_researchers,
+    'samples': _load_samples,
+    'equipment': _load_equipment,
+    'measurements': _load_measurements,
+}
+
+@cached_query(Researcher, Experiment, Sample, Equipment, Method, Result, Measurement, Condition, ConductingAnExperiment, ExperimentalEquipment, SampleInExperiment)
+@safe_db_operation
+def get_experiment_with_relations(experiment_id, relations=None):
+    """Загружает эксперимент и его связи за одно соединение.
+
+    relations — какие связи загрузить (по умолчанию все из EXPERIMENT_RELATIONS).
+    В результат попадают только запрошенные ключи, 'experiment' есть всегда.
+    Пустой список — только заголовок эксперимента.
+    """
+    wanted = EXPERIMENT_RELATIONS if relations is None else tuple(relations)
+    unknown = set(wanted) - set(EXPERIMENT_RELATIONS)
+    if unknown:
+        raise ValueError(f"Неизвестные связи эксперимента: {', '.join(sorted(unknown))}")
+
+    prefetch_models = [_PREFETCH_RELATIONS[name] for name in wanted if name in _PREFETCH_RELATIONS]
+    found = prefetch(Experiment.select().where(Experiment.id == experiment_id), *prefetch_models)
+    if not found:
         print(f"Эксперимент с ID={experiment_id} не найден")
         return None
-    except Exception as e:
-        print(f"Критическая ошибка загрузки эксперимента {experiment_id}: {e}")
-        import traceback
-        traceback.print_exc()
-        return None
-        
+    exp = found[0]
+
+    data = {'experiment': exp}
+    for name in wanted:
+        if name in _PREFETCH_RELATIONS:
+            data[name] = list(getattr(exp, name))
+        else:
+            data[name] = _JOIN_LOADERS[name](experiment_id)
+    return data
+
+# Снимок для карточки эксперимента: всё, кроме измерений — их у эксперимента
+# бывают десятки тысяч, карточка грузит их при открытии вкладки
+EXPERIMENT_SNAPSHOT_RELATIONS = tuple(name for name in EXPERIMENT_RELATIONS if name != 'measurements')
+
+def get_experiment_snapshot(experiment_id):
+    """Агрегат эксперимента (связи EXPERIMENT_SNAPSHOT_RELATIONS) через LRU experiment_snapshots.
+
+    Снимок сбрасывается изменяющими функциями, которые затрагивают этот эксперимент.
+    """
+    found, data = experiment_snapshots.get(experiment_id)
+    if not found:
+        epoch = experiment_snapshots.epoch(experiment_id)
+        data = get_experiment_with_relations(experiment_id, EXPERIMENT_SNAPSHOT_RELATIONS)
+        if data is None:
+            return None
+        experiment_snapshots.put(experiment_id, epoch, data)
+    return dict(data)
+
+def peek_experiment_snapshot(experiment_id):
+    """Снимок из LRU без обращения к БД; None — снимка нет"""
+    found, data = experiment_snapshots.get(experiment_id)
+    return dict(data) if found else None
+
+@invalidates_experiments(_experiment_arg)
+@invalidates(Experiment, ExperimentMonthRollup, ExperimentStatusRollup)
 @safe_db_operation
 def update_experiment(experiment_id, **update_data):
-    exp = Experiment.get_by_id(experiment_id)
-    # Обновляем ВСЕ переданные поля
-    for field, value in update_data.items():
-        if hasattr(exp, field):
-            setattr(exp, field, value)
-    exp.save()
-    return True
+    return _update_experiments([experiment_id], update_data)
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(Experiment, ConductingAnExperiment, ExperimentalEquipment, SampleInExperiment, Method, Result, Condition,
+             *rollups.ROLLUP_MODELS)
 @safe_db_operation
 def delete_experiment(experiment_id):
     with database.atomic():
+        _remove_from_rollups(experiment_id)
+        _record_experiment_removed(experiment_id)
         ConductingAnExperiment.delete().where(ConductingAnExperiment.experiment == experiment_id).execute()
         ExperimentalEquipment.delete().where(ExperimentalEquipment.experiment == experiment_id).execute()
         SampleInExperiment.delete().where(SampleInExperiment.experiment == experiment_id).execute()
@@ -254,9 +495,14 @@ def get_experiment_by_id(experiment_id):
     except Experiment.DoesNotExist:
         return None
 
+@invalidates_experiments(_all_experiments)
+@invalidates(Experiment, ConductingAnExperiment, ExperimentalEquipment, SampleInExperiment, Method, Result, Condition, Measurement,
+             *rollups.ROLLUP_MODELS)
 @safe_db_operation
 def delete_experiment_completely(experiment_id):
     with database.atomic():
+        _remove_from_rollups(experiment_id)
+        _record_experiment_removed(experiment_id)
         # Удаляем связанные сущности
         ConductingAnExperiment.delete().where(ConductingAnExperiment.experiment == experiment_id).execute()
         SampleInExperiment.delete().where(SampleInExperiment.experiment == experiment_id).execute()
@@ -277,85 +523,103 @@ def delete_experiment_completely(experiment_id):
     
 
 # === SAMPLE ===
+@invalidates_experiments(_new_sample_experiments)
+@invalidates(Sample, SampleInExperiment, Experiment, ConductingAnExperiment, *rollups.ROLLUP_MODELS)
 @safe_db_operation
 def create_sample_with_researcher(name, description, chemical_formula, aggregate_state, mass, volume, researcher_id):
-    sample = Sample.create(
-        name=name,
-        description=description,
-        chemical_formula=chemical_formula,
-        aggregate_state=aggregate_state,
-        mass=mass or 0.0,
-        volume=volume or 0.0
-    )
-    # Находим или создаём эксперимент по умолчанию
-    default_exp = (Experiment
-                   .select()
-                   .join(ConductingAnExperiment)
-                   .where(ConductingAnExperiment.researcher == researcher_id)
-                   .first())
-    if not default_exp:
-        default_exp = create_experiment(
-            name=f"Эксперименты исследователя {researcher_id}",
-            purpose="Общие эксперименты",
-            status="in_progress",
-            researcher_id=researcher_id
+    # Одна транзакция: вложенный create_experiment работает на том же соединении
+    with transaction_scope():
+        sample = Sample.create(
+            name=name,
+            description=description,
+            chemical_formula=chemical_formula,
+            aggregate_state=aggregate_state,
+            mass=mass or 0.0,
+            volume=volume or 0.0
         )
-    SampleInExperiment.create(experiment=default_exp.id, sample=sample.id)
+        # Находим или создаём эксперимент по умолчанию
+        default_exp = (Experiment
+                       .select()
+                       .join(ConductingAnExperiment)
+                       .where(ConductingAnExperiment.researcher == researcher_id)
+                       .first())
+        if not default_exp:
+            default_exp = create_experiment(
+                name=f"Эксперименты исследователя {researcher_id}",
+                purpose="Общие эксперименты",
+                status="in_progress",
+                researcher_id=researcher_id
+            )
+        SampleInExperiment.create(experiment=default_exp.id, sample=sample.id)
+        changes.record_changes(Sample, [sample.id])
     return sample
 
+@cached_query(Sample)
 @safe_db_operation
 def get_all_samples():
-    return list(Sample.select())
+    """Список образцов для таблиц: SampleRow (id, name, chemical_formula, mass, volume)"""
+    return fetch_rows(SampleRow, select_rows(SampleRow, Sample).order_by(Sample.id))
 
+@cached_query(Sample, SampleInExperiment, Experiment, ConductingAnExperiment)
 @safe_db_operation
 def get_my_samples(researcher_id):
+    return fetch_rows(SampleRow, _my_samples_query(researcher_id))
+
+def _my_samples_query(researcher_id):
     exp_ids = (Experiment
                .select(Experiment.id)
                .join(ConductingAnExperiment)
                .where(ConductingAnExperiment.researcher == researcher_id))
-    samples = (Sample
-               .select()
-               .join(SampleInExperiment)
-               .where(SampleInExperiment.experiment.in_(exp_ids)))
-    return list(samples)
+    # Образец из нескольких экспериментов исследователя — одна строка
+    return (select_rows(SampleRow, Sample)
+            .join(SampleInExperiment)
+            .where(SampleInExperiment.experiment.in_(exp_ids))
+            .distinct())
 
 @safe_db_operation
 def get_sample_by_id(sample_id):
     return Sample.get_by_id(sample_id)
 
+@invalidates_experiments(_sample_experiments)
+@invalidates(Sample)
 @safe_db_operation
 def update_sample(sample_id, **update_data):
-    sample = Sample.get_by_id(sample_id)
-    for field, value in update_data.items():
-        if hasattr(sample, field):
-            setattr(sample, field, value)
-    sample.save()
-    return True
+    return _update_rows(Sample, [sample_id], update_data)
 
+@invalidates_experiments(_sample_experiments)
+@invalidates(Sample, SampleInExperiment, Measurement)
 @safe_db_operation
 def delete_sample(sample_id):
     with database.atomic():
         SampleInExperiment.delete().where(SampleInExperiment.sample == sample_id).execute()
         Measurement.delete().where(Measurement.sample == sample_id).execute()
         Sample.delete_by_id(sample_id)
+        changes.record_changes(Sample, [sample_id], deleted=True)
     return True
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(SampleInExperiment)
 @safe_db_operation
 def add_sample_to_experiment(experiment_id, sample_id):
-    existing = SampleInExperiment.select().where(
-        (SampleInExperiment.experiment == experiment_id) &
-        (SampleInExperiment.sample == sample_id)
-    ).first()
-    if not existing:
-        SampleInExperiment.create(experiment=experiment_id, sample=sample_id)
+    # Уникальный индекс (experiment, sample) отсекает повтор — один INSERT вместо SELECT + INSERT
+    with database.atomic():
+        (SampleInExperiment
+         .insert(experiment=experiment_id, sample=sample_id)
+         .on_conflict_ignore()
+         .execute())
+        changes.record_changes(Sample, [sample_id])  # образец мог попасть в "Мои образцы"
     return True
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(SampleInExperiment)
 @safe_db_operation
 def delete_sample_from_experiment(experiment_id, sample_id):
-    SampleInExperiment.delete().where(
-        (SampleInExperiment.experiment == experiment_id) &
-        (SampleInExperiment.sample == sample_id)
-    ).execute()
+    with database.atomic():
+        SampleInExperiment.delete().where(
+            (SampleInExperiment.experiment == experiment_id) &
+            (SampleInExperiment.sample == sample_id)
+        ).execute()
+        changes.record_changes(Sample, [sample_id])
     return True
 
 
@@ -366,18 +630,20 @@ def get_method_by_id(method_id):
         return Method.get_by_id(method_id)
     except Method.DoesNotExist:
         return None
+@invalidates_experiments(_experiment_arg)
+@invalidates(Method)
 @safe_db_operation
 def create_method(experiment_id, name, description):
     return Method.create(experiment=experiment_id, name=name, description=description)
 
+@invalidates_experiments(_experiments_of(Method))
+@invalidates(Method)
 @safe_db_operation
 def update_method(method_id, name, description):
-    method = Method.get_by_id(method_id)
-    method.name = name
-    method.description = description
-    method.save()
-    return True
+    return _update_rows(Method, [method_id], {'name': name, 'description': description})
 
+@invalidates_experiments(_experiments_of(Method))
+@invalidates(Method)
 @safe_db_operation
 def delete_method(method_id):
     Method.delete_by_id(method_id)
@@ -385,6 +651,7 @@ def delete_method(method_id):
 
 
 # === EQUIPMENT ===
+@invalidates(Equipment)
 @safe_db_operation
 def create_equipment(name, description):
     existing = Equipment.select().where(Equipment.name == name).first()
@@ -392,15 +659,14 @@ def create_equipment(name, description):
         return existing
     return Equipment.create(name=name, description=description)
 
+@invalidates_experiments(_equipment_experiments)
+@invalidates(Equipment)
 @safe_db_operation
 def update_equipment(equipment_id, **update_data):
-    equip = Equipment.get_by_id(equipment_id)
-    for field, value in update_data.items():
-        if hasattr(equip, field):
-            setattr(equip, field, value)
-    equip.save()
-    return True
+    return _update_rows(Equipment, [equipment_id], update_data)
 
+@invalidates_experiments(_equipment_experiments)
+@invalidates(Equipment, ExperimentalEquipment)
 @safe_db_operation
 def delete_equipment(equipment_id):
     with database.atomic():
@@ -408,16 +674,18 @@ def delete_equipment(equipment_id):
         Equipment.delete_by_id(equipment_id)
     return True
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(ExperimentalEquipment)
 @safe_db_operation
 def add_equipment_to_experiment(experiment_id, equipment_id):
-    existing = ExperimentalEquipment.select().where(
-        (ExperimentalEquipment.experiment == experiment_id) &
-        (ExperimentalEquipment.equipment == equipment_id)
-    ).first()
-    if not existing:
-        ExperimentalEquipment.create(experiment=experiment_id, equipment=equipment_id)
+    (ExperimentalEquipment
+     .insert(experiment=experiment_id, equipment=equipment_id)
+     .on_conflict_ignore()
+     .execute())
     return True
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(ExperimentalEquipment)
 @safe_db_operation
 def delete_equipment_from_experiment(experiment_id, equipment_id):
     ExperimentalEquipment.delete().where(
@@ -428,6 +696,8 @@ def delete_equipment_from_experiment(experiment_id, equipment_id):
 
 
 # === MEASUREMENT ===
+@invalidates_experiments(_sample_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def create_measurement(sample_id, method, property_name, value, unit, accuracy, time_of_event):
     return Measurement.create(
@@ -440,15 +710,14 @@ def create_measurement(sample_id, method, property_name, value, unit, accuracy,
         time_of_event=time_of_event
     )
 
+@invalidates_experiments(_measurement_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def update_measurement(measurement_id, **update_data):
-    meas = Measurement.get_by_id(measurement_id)
-    for field, value in update_data.items():
-        if hasattr(meas, field):
-            setattr(meas, field, value)
-    meas.save()
-    return True
+    return _update_rows(Measurement, [measurement_id], update_data)
 
+@invalidates_experiments(_measurement_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def delete_measurement(measurement_id):
     Measurement.delete_by_id(measurement_id)
@@ -456,6 +725,8 @@ def delete_measurement(measurement_id):
 
 
 # === CONDITION ===
+@invalidates_experiments(_experiment_arg)
+@invalidates(Condition)
 @safe_db_operation
 def create_condition(experiment_id, temperature=None, pressure=None, humidity=None, pH=None, illumination=None, duration=None):
     return Condition.create(
@@ -468,6 +739,7 @@ def create_condition(experiment_id, temperature=None, pressure=None, humidity=No
         duration=duration
     )
     
+@cached_query(Condition, Experiment)
 @safe_db_operation
 def get_all_conditions():
     """
@@ -493,15 +765,14 @@ def get_all_conditions():
         })
     return conditions
 
+@invalidates_experiments(_experiments_of(Condition))
+@invalidates(Condition)
 @safe_db_operation
 def update_condition(condition_id, **update_data):
-    cond = Condition.get_by_id(condition_id)
-    for field, value in update_data.items():
-        if hasattr(cond, field):
-            setattr(cond, field, value)
-    cond.save()
-    return True
+    return _update_rows(Condition, [condition_id], update_data)
 
+@invalidates_experiments(_experiments_of(Condition))
+@invalidates(Condition)
 @safe_db_operation
 def delete_condition(condition_id):
     Condition.delete_by_id(condition_id)
@@ -509,6 +780,8 @@ def delete_condition(condition_id):
 
 
 # === RESULT ===
+@invalidates_experiments(_experiment_arg)
+@invalidates(Result)
 @safe_db_operation
 def create_result(experiment_id, result_type, description, conclusions=None, url=None):
     return Result.create(
@@ -519,15 +792,14 @@ def create_result(experiment_id, result_type, description, conclusions=None, url
         URL=url
     )
 
+@invalidates_experiments(_experiments_of(Result))
+@invalidates(Result)
 @safe_db_operation
 def update_result(result_id, **update_data):
-    res = Result.get_by_id(result_id)
-    for field, value in update_data.items():
-        if hasattr(res, field):
-            setattr(res, field, value)
-    res.save()
-    return True
+    return _update_rows(Result, [result_id], update_data)
 
+@invalidates_experiments(_experiments_of(Result))
+@invalidates(Result)
 @safe_db_operation
 def delete_result(result_id):
     Result.delete_by_id(result_id)
@@ -535,25 +807,34 @@ def delete_result(result_id):
 
 
 # === SERVICE ===
+@cached_query(Researcher)
 @safe_db_operation
 def get_current_researcher_id():
     researcher = Researcher.select().first()
     return researcher.id if researcher else 1
 
+@cached_query(Experiment, SampleInExperiment)
 @safe_db_operation
 def get_experiments_by_sample_id(sample_id):
     exps = (Experiment
-            .select()
+            .select(Experiment.id, Experiment.name, Experiment.status, Experiment.date_of_event)
             .join(SampleInExperiment)
-            .where(SampleInExperiment.sample == sample_id))
-    return [{'id': e.id, 'name': e.name, 'status': e.status, 'date': e.date_of_event.strftime('%d.%m.%Y') if e.date_of_event else ''} for e in exps]
+            .where(SampleInExperiment.sample == sample_id)
+            .tuples())
+    return [{'id': exp_id, 'name': name, 'status': status, 'date': date_of_event.strftime('%d.%m.%Y') if date_of_event else ''}
+            for exp_id, name, status, date_of_event in exps]
 
 # ... предыдущие CRUD-функции ...
 
 # === УДАЛЕНИЕ ===
+@invalidates_experiments(_experiment_arg)
+@invalidates(Experiment, ConductingAnExperiment, ExperimentalEquipment, SampleInExperiment, Method, Result, Condition,
+             *rollups.ROLLUP_MODELS)
 @safe_db_operation
 def delete_experiment(experiment_id):
     with database.atomic():
+        _remove_from_rollups(experiment_id)
+        _record_experiment_removed(experiment_id)
         ConductingAnExperiment.delete().where(ConductingAnExperiment.experiment == experiment_id).execute()
         ExperimentalEquipment.delete().where(ExperimentalEquipment.experiment == experiment_id).execute()
         SampleInExperiment.delete().where(SampleInExperiment.experiment == experiment_id).execute()
@@ -563,19 +844,26 @@ def delete_experiment(experiment_id):
         Experiment.delete_by_id(experiment_id)
     return True
 
+@invalidates_experiments(_sample_experiments)
+@invalidates(Sample, SampleInExperiment, Measurement)
 @safe_db_operation
 def delete_sample_completely(sample_id):
     with database.atomic():
         SampleInExperiment.delete().where(SampleInExperiment.sample == sample_id).execute()
         Measurement.delete().where(Measurement.sample == sample_id).execute()
         Sample.delete_by_id(sample_id)
+        changes.record_changes(Sample, [sample_id], deleted=True)
     return True
 
+@invalidates_experiments(_experiments_of(Method))
+@invalidates(Method)
 @safe_db_operation
 def delete_method(method_id):
     Method.delete_by_id(method_id)
     return True
 
+@invalidates_experiments(_equipment_experiments)
+@invalidates(Equipment, ExperimentalEquipment)
 @safe_db_operation
 def delete_equipment(equipment_id):
     with database.atomic():
@@ -583,144 +871,223 @@ def delete_equipment(equipment_id):
         Equipment.delete_by_id(equipment_id)
     return True
 
+@invalidates_experiments(_measurement_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def delete_measurement(measurement_id):
     Measurement.delete_by_id(measurement_id)
     return True
 
+@invalidates_experiments(_experiments_of(Condition))
+@invalidates(Condition)
 @safe_db_operation
 def delete_condition(condition_id):
     Condition.delete_by_id(condition_id)
     return True
 
+@invalidates_experiments(_experiments_of(Result))
+@invalidates(Result)
 @safe_db_operation
 def delete_result(result_id):
     Result.delete_by_id(result_id)
     return True
 
+@invalidates_experiments(_researcher_experiments)
+@invalidates(Researcher, ConductingAnExperiment, ResearcherExperimentRollup)
 @safe_db_operation
 def delete_researcher(researcher_id):
     with database.atomic():
+        _record_researcher_removed(researcher_id)
         ConductingAnExperiment.delete().where(ConductingAnExperiment.researcher == researcher_id).execute()
+        rollups.researcher_removed(researcher_id)
         Researcher.delete_by_id(researcher_id)
     return True
     
 # === EQUIPMENT ===
+@cached_query(Equipment)
 @safe_db_operation
 def get_all_equipment():
-    return list(Equipment.select())
+    """Список оборудования: EquipmentRow (id, name)"""
+    return fetch_rows(EquipmentRow, select_rows(EquipmentRow, Equipment).order_by(Equipment.id))
 
 # === MEASUREMENTS ===
+def _measurements_query():
+    # Получаем измерения с именами образцов
+    return (Measurement
+            .select(Measurement, Sample.name)
+            .join(Sample, on=(Measurement.sample == Sample.id)))
+
+def _measurement_row(m):
+    return {
+        'id': m.id,
+        'method': m.method,
+        'property': m.property,
+        'value': m.value,
+        'unit': m.unit,
+        'accuracy': m.accuracy,
+        'time_of_event': m.time_of_event,
+        'sample_name': m.sample.name
+    }
+
+@cached_query(Measurement, Sample)
 @safe_db_operation
 def get_all_measurements():
-    # Получаем измерения с именами образцов
-    query = (Measurement
-             .select(Measurement, Sample.name.alias('sample_name'))
-             .join(Sample, on=(Measurement.sample == Sample.id))
-             .order_by(Measurement.time_of_event.desc()))
-    results = []
-    for m in query:
-        results.append({
-            'id': m.id,
-            'method': m.method,
-            'property': m.property,
-            'value': m.value,
-            'unit': m.unit,
-            'accuracy': m.accuracy,
-            'time_of_event': m.time_of_event,
-            'sample_name': m.sample.name
-        })
-    return results
+    query = _measurements_query().order_by(Measurement.time_of_event.desc())
+    return [_measurement_row(m) for m in query]
 
 # === METHODS ===
+def _methods_query():
+    return (Method
+            .select(Method, Experiment.name)
+            .join(Experiment, on=(Method.experiment == Experiment.id)))
+
+def _method_row(m):
+    return {
+        'id': m.id,
+        'name': m.name,
+        'description': m.description,
+        'experiment_name': m.experiment.name
+    }
+
+@cached_query(Method, Experiment)
 @safe_db_operation
 def get_all_methods():
-    query = (Method
-             .select(Method, Experiment.name.alias('experiment_name'))
-             .join(Experiment, on=(Method.experiment == Experiment.id))
-             .order_by(Experiment.name))
-    results = []
-    for m in query:
-        results.append({
-            'id': m.id,
-            'name': m.name,
-            'description': m.description,
-            'experiment_name': m.experiment.name
-        })
-    return results
+    return [_method_row(m) for m in _methods_query().order_by(Experiment.name)]
 
 # === RESULTS ===
+def _results_query():
+    return (Result
+            .select(Result, Experiment.name)
+            .join(Experiment, on=(Result.experiment == Experiment.id)))
+
+def _result_row(r):
+    return {
+        'id': r.id,
+        'type': r.type,
+        'description': r.description,
+        'conclusions': r.conclusions,
+        'experiment_name': r.experiment.name
+    }
+
+@cached_query(Result, Experiment)
 @safe_db_operation
 def get_all_results():
-    query = (Result
-             .select(Result, Experiment.name.alias('experiment_name'))
-             .join(Experiment, on=(Result.experiment == Experiment.id))
-             .order_by(Experiment.name))
-    results = []
-    for r in query:
-        results.append({
-            'id': r.id,
-            'type': r.type,
-            'description': r.description,
-            'conclusions': r.conclusions,
-            'experiment_name': r.experiment.name
-        })
-    return results
+    return [_result_row(r) for r in _results_query().order_by(Experiment.name)]
 
 # === CONDITIONS ===
+def _conditions_query():
+    return (Condition
+            .select(Condition, Experiment.name)
+            .join(Experiment, on=(Condition.experiment == Experiment.id)))
+
+def _condition_row(c):
+    return {
+        'id': c.id,
+        'temperature': c.temperature,
+        'pressure': c.pressure,
+        'humidity': c.humidity,
+        'pH': c.pH,
+        'illumination': c.illumination,
+        'duration': c.duration,
+        'experiment_name': c.experiment.name
+    }
+
+@cached_query(Condition, Experiment)
 @safe_db_operation
 def get_all_conditions():
-    query = (Condition
-             .select(Condition, Experiment.name.alias('experiment_name'))
-             .join(Experiment, on=(Condition.experiment == Experiment.id))
-             .order_by(Experiment.name))
-    results = []
-    for c in query:
-        results.append({
-            'id': c.id,
-            'temperature': c.temperature,
-            'pressure': c.pressure,
-            'humidity': c.humidity,
-            'pH': c.pH,
-            'illumination': c.illumination,
-            'duration': c.duration,
-            'experiment_name': c.experiment.name
-        })
-    return results
+    return [_condition_row(c) for c in _conditions_query().order_by(Experiment.name)]
     
+# Статистика читается из сводных таблиц (database.rollups), а не считается по базовым
+@cached_query(Researcher, ResearcherExperimentRollup)
 @safe_db_operation
 def get_researcher_stats():
     """Возвращает список исследователей с количеством экспериментов"""
-    from .models import Researcher, ConductingAnExperiment
+    experiment_count = fn.COALESCE(ResearcherExperimentRollup.count, 0)
     query = (Researcher
-             .select(Researcher.surname, Researcher.name,
-                     fn.COUNT(ConductingAnExperiment.id).alias('experiment_count'))
-             .join(ConductingAnExperiment, JOIN.LEFT_OUTER)
-             .group_by(Researcher.id)
-             .order_by(fn.COUNT(ConductingAnExperiment.id).desc()))
+             .select(Researcher.surname, Researcher.name, experiment_count.alias('experiment_count'))
+             .join(ResearcherExperimentRollup, JOIN.LEFT_OUTER,
+                   on=(ResearcherExperimentRollup.researcher == Researcher.id))
+             .order_by(experiment_count.desc(), Researcher.id))
     return [
         {'surname': r.surname, 'name': r.name, 'experiment_count': r.experiment_count}
         for r in query
     ]
 
+@cached_query(ExperimentMonthRollup)
 @safe_db_operation
 def get_monthly_experiment_counts():
-    """Возвращает словарь {месяц: количество} за последние 6 месяцев"""
-    from .models import Experiment
-    from datetime import datetime, timedelta
-    six_months_ago = datetime.now() - timedelta(days=180)
-    query = (Experiment
-             .select(fn.strftime('%Y-%m', Experiment.date_of_event).alias('month'),
-                     fn.COUNT(Experiment.id).alias('count'))
-             .where(Experiment.date_of_event >= six_months_ago)
-             .group_by(fn.strftime('%Y-%m', Experiment.date_of_event))
-             .order_by(fn.strftime('%Y-%m', Experiment.date_of_event)))
+    """Возвращает словарь {месяц: количество} за последние 6 месяцев (включая неполный первый)"""
+    first_month = rollups.month_key(datetime.date.today() - datetime.timedelta(days=180))
+    query = (ExperimentMonthRollup
+             .select()
+             .where((ExperimentMonthRollup.month >= first_month) & (ExperimentMonthRollup.count > 0))
+             .order_by(ExperimentMonthRollup.month))
     result = {}
     for row in query:
-        month = datetime.strptime(row.month, '%Y-%m').strftime('%b %Y')
+        month = datetime.datetime.strptime(row.month, '%Y-%m').strftime('%b %Y')
         result[month] = row.count
     return result
+
+@cached_query(Experiment)
+@safe_db_operation
+def get_daily_experiment_counts(days):
+    """{дата: количество} за последние days дней — диапазон по индексу date_of_event"""
+    since = datetime.date.today() - datetime.timedelta(days=days)
+    query = (Experiment
+             .select(Experiment.date_of_event, fn.COUNT(Experiment.id))
+             .where(Experiment.date_of_event >= since)
+             .group_by(Experiment.date_of_event)
+             .tuples())
+    return dict(query)
+
+@invalidates(*rollups.ROLLUP_MODELS)
+def rebuild_rollups():
+    """Пересчитывает сводные таблицы статистики по базовым таблицам"""
+    rollups.rebuild_rollups()
+    return True
     
+DASHBOARD_RECENT_LIMIT = 5
+DASHBOARD_RECENT_DAYS = 30
+
+@cached_query(Experiment, Researcher, ExperimentMonthRollup, ExperimentStatusRollup)
+@safe_db_operation
+def get_dashboard_stats(recent_limit=DASHBOARD_RECENT_LIMIT, recent_days=DASHBOARD_RECENT_DAYS):
+    """Данные главной страницы без загрузки списков.
+
+    Итоги и помесячные числа берутся из сводных таблиц, "новые" и последние
+    эксперименты — индексированными запросами по date_of_event.
+    Возвращает {'experiments', 'researchers', 'last_30_days' (за recent_days дней),
+    'recent': последние recent_limit экспериментов по дате,
+    'monthly': {'ГГГГ-ММ': количество} по месяцам с экспериментами}.
+    """
+    cutoff = datetime.date.today() - datetime.timedelta(days=recent_days)
+    monthly = dict(ExperimentMonthRollup
+                   .select(ExperimentMonthRollup.month, ExperimentMonthRollup.count)
+                   .where(ExperimentMonthRollup.count > 0)
+                   .order_by(ExperimentMonthRollup.month)
+                   .tuples())
+    stats = {
+        'experiments': ExperimentStatusRollup.select(fn.SUM(ExperimentStatusRollup.count)).scalar() or 0,
+        'researchers': Researcher.select().count(),
+        'last_30_days': Experiment.select().where(Experiment.date_of_event > cutoff).count(),
+        'monthly': monthly
+    }
+
+    latest = (Experiment
+              .select(Experiment.id, Experiment.name, Experiment.status, Experiment.date_of_event)
+              .where(Experiment.date_of_event.is_null(False))
+              .order_by(Experiment.date_of_event.desc(), Experiment.id.desc())
+              .limit(recent_limit)
+              .dicts())
+    stats['recent'] = [
+        {'id': e['id'], 'name': e['name'], 'status': e['status'],
+         'date': e['date_of_event'].strftime('%d.%m.%Y'), 'date_of_event': e['date_of_event']}
+        for e in latest
+    ]
+    return stats
+
+@invalidates_experiments(_all_experiments)
+@invalidates(Method, Sample, Equipment, Result, Condition, Measurement)
 @safe_db_operation
 def delete_related_item(item_type, item_id):
     from .models import Method, Sample, Equipment, Result, Condition, Measurement
@@ -730,6 +1097,7 @@ def delete_related_item(item_type, item_id):
         elif item_type == "sample":
             # Удалить связь и сам образец (если не используется в других экспериментах)
             Sample.delete_by_id(item_id)
+            changes.record_changes(Sample, [item_id], deleted=True)
         elif item_type == "equipment":
             Equipment.delete_by_id(item_id)
         elif item_type == "result":
@@ -743,13 +1111,17 @@ def delete_related_item(item_type, item_id):
         print(f"Ошибка удаления {item_type} {item_id}: {e}")
         return False
         
+@invalidates_experiments(_experiment_arg)
+@invalidates(SampleInExperiment)
 @safe_db_operation
 def remove_sample_from_experiment(experiment_id, sample_id):
     # Удаляем связь из промежуточной таблицы
-    SampleInExperiment.delete().where(
-        (SampleInExperiment.experiment == experiment_id) &
-        (SampleInExperiment.sample == sample_id)
-    ).execute()
+    with database.atomic():
+        SampleInExperiment.delete().where(
+            (SampleInExperiment.experiment == experiment_id) &
+            (SampleInExperiment.sample == sample_id)
+        ).execute()
+        changes.record_changes(Sample, [sample_id])
     return True
 
 @safe_db_operation
@@ -759,15 +1131,14 @@ def get_equipment_by_id(equipment_id):
     except Equipment.DoesNotExist:
         return None
 
+@invalidates_experiments(_equipment_experiments)
+@invalidates(Equipment)
 @safe_db_operation
 def update_equipment(equipment_id, **kwargs):
-    equip = Equipment.get_by_id(equipment_id)
-    for field, value in kwargs.items():
-        if hasattr(equip, field):
-            setattr(equip, field, value)
-    equip.save()
-    return True
+    return _update_rows(Equipment, [equipment_id], kwargs)
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(Equipment, ExperimentalEquipment)
 @safe_db_operation
 def create_equipment_and_link_to_experiment(experiment_id, name, description):
     # 1. Создаём оборудование
@@ -779,6 +1150,8 @@ def create_equipment_and_link_to_experiment(experiment_id, name, description):
     )
     return True
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(ExperimentalEquipment)
 @safe_db_operation
 def remove_equipment_from_experiment(experiment_id, equipment_id):
     ExperimentalEquipment.delete().where(
@@ -789,11 +1162,15 @@ def remove_equipment_from_experiment(experiment_id, equipment_id):
 
 @safe_db_operation
 def get_measurement_by_id(measurement_id):
-    try:
-        return Measurement.get_by_id(measurement_id)
-    except Measurement.DoesNotExist:
-        return None
+    # Образец подгружается JOIN'ом, чтобы m.sample не требовал отдельного запроса
+    return (Measurement
+            .select(Measurement, Sample)
+            .join(Sample)
+            .where(Measurement.id == measurement_id)
+            .first())
 
+@invalidates_experiments(_linked_sample_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def create_measurement_for_experiment(experiment_id, sample_id, method, property, value, unit, accuracy, time_of_event):
     Measurement.create(
@@ -807,25 +1184,27 @@ def create_measurement_for_experiment(experiment_id, sample_id, method, property
     )
     return True
 
+@invalidates_experiments(_measurement_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def update_measurement(measurement_id, **kwargs):
-    m = Measurement.get_by_id(measurement_id)
-    for field, value in kwargs.items():
-        if hasattr(m, field):
-            setattr(m, field, value)
-    m.save()
-    return True
+    return _update_rows(Measurement, [measurement_id], kwargs)
 
+@invalidates_experiments(_measurement_experiments)
+@invalidates(Measurement)
 @safe_db_operation
 def delete_measurement(measurement_id):
     Measurement.delete_by_id(measurement_id)
     return True
     
+@cached_query(Sample, SampleInExperiment)
 @safe_db_operation
 def get_samples_for_experiment(experiment_id):
     """Получает все образцы, привязанные к эксперименту"""
-    samples = Sample.select().join(SampleInExperiment).where(SampleInExperiment.experiment == experiment_id)
-    return list(samples)
+    samples = (select_rows(SampleRow, Sample)
+               .join(SampleInExperiment)
+               .where(SampleInExperiment.experiment == experiment_id))
+    return fetch_rows(SampleRow, samples)
     
 # В crud.py
 
@@ -836,20 +1215,21 @@ def get_result_by_id(result_id):
     except Result.DoesNotExist:
         return None
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(Result)
 @safe_db_operation
 def create_result_for_experiment(experiment_id, **kwargs):
     Result.create(experiment=experiment_id, **kwargs)
     return True
 
+@invalidates_experiments(_experiments_of(Result))
+@invalidates(Result)
 @safe_db_operation
 def update_result(result_id, **kwargs):
-    r = Result.get_by_id(result_id)
-    for field, value in kwargs.items():
-        if hasattr(r, field):
-            setattr(r, field, value)
-    r.save()
-    return True
+    return _update_rows(Result, [result_id], kwargs)
 
+@invalidates_experiments(_experiments_of(Result))
+@invalidates(Result)
 @safe_db_operation
 def delete_result(result_id):
     Result.delete_by_id(result_id)
@@ -862,21 +1242,404 @@ def get_condition_by_id(condition_id):
     except Condition.DoesNotExist:
         return None
 
+@invalidates_experiments(_experiment_arg)
+@invalidates(Condition)
 @safe_db_operation
 def create_condition_for_experiment(experiment_id, **kwargs):
     Condition.create(experiment=experiment_id, **kwargs)
     return True
 
+@invalidates_experiments(_experiments_of(Condition))
+@invalidates(Condition)
 @safe_db_operation
 def update_condition(condition_id, **kwargs):
-    c = Condition.get_by_id(condition_id)
-    for field, value in kwargs.items():
-        if hasattr(c, field):
-            setattr(c, field, value)
-    c.save()
-    return True
+    return _update_rows(Condition, [condition_id], kwargs)
 
+@invalidates_experiments(_experiments_of(Condition))
+@invalidates(Condition)
 @safe_db_operation
 def delete_condition(condition_id):
     Condition.delete_by_id(condition_id)
     return True
+
+
+# === ИНКРЕМЕНТАЛЬНОЕ ОБНОВЛЕНИЕ СТРАНИЦ ===
+# Страница загружает список вместе с отметкой get_change_watermark(), а при
+# повторном показе запрашивает get_*_delta(отметка):
+# {'watermark': новая отметка, 'rows': изменённые и новые строки,
+#  'deleted': id строк, которые нужно убрать, 'full': True — загрузить всё заново}.
+
+DELTA_MAX_ROWS = 5000  # больше изменений — дешевле перечитать список целиком
+
+@safe_db_operation
+def get_change_watermark():
+    return changes.current_watermark()
+
+@safe_db_operation
+def read_with_watermark(read, *args, **kwargs):
+    """(отметка, read(*args, **kwargs)) для полной загрузки списка.
+
+    Отметка и строки читаются в одной транзакции (одном снимке БД) и мимо кэша
+    запросов: кэш не знает о правках других клиентов, а изменение, попавшее
+    между строками из кэша и отметкой, не пришло бы ни одной дельтой.
+    None — ошибка чтения.
+    """
+    with database.atomic():
+        watermark = changes.current_watermark()
+        rows = getattr(read, '__wrapped__', read)(*args, **kwargs)
+    return None if rows is None else (watermark, rows)
+
+def _item_value(item, key):
+    return item[key] if isinstance(item, dict) else getattr(item, key)
+
+def _delta(model, watermark, fetch, related_ids=None):
+    """fetch(ids) -> строки списка с этими id (только попадающие в список);
+    related_ids(журнал) -> id строк, изменившихся из-за других таблиц."""
+    with database.atomic():  # журнал и строки — из одного снимка
+        return _read_delta(model, watermark, fetch, related_ids)
+
+def _read_delta(model, watermark, fetch, related_ids):
+    # Читается всё видимое, но отметка — до первого пропуска в журнале:
+    # записи после него придут ещё раз, пока пропуск не заполнится или не устареет
+    upto = changes.latest_id()
+    next_watermark = changes.current_watermark(upto)
+    log = changes.changes_since(watermark, upto) if watermark is not None else None
+    if log is None:
+        return {'watermark': next_watermark, 'rows': [], 'deleted': [], 'full': True}
+    changed, deleted = log.get(model._meta.table_name, (set(), set()))
+    ids = set(changed)
+    if related_ids is not None:
+        ids |= related_ids(log)
+    ids -= deleted
+    if len(ids) > DELTA_MAX_ROWS:
+        return {'watermark': next_watermark, 'rows': [], 'deleted': [], 'full': True}
+    rows = []
+    for batch in chunked(sorted(ids), UPDATE_BATCH_SIZE):
+        rows.extend(fetch(batch))
+    found = {_item_value(row, 'id') for row in rows}
+    # Строки, которые изменились, но больше не входят в список, тоже убираются
+    return {'watermark': next_watermark, 'rows': rows, 'deleted': sorted(deleted | (ids - found)),
+            'full': False}
+
+def _experiments_of_changed_researchers(log):
+    """В списке экспериментов показан исследователь: его правка меняет и эти строки"""
+    researcher_ids = log.get(Researcher._meta.table_name, (set(), set()))[0]
+    if not researcher_ids:
+        return set()
+    return {eid for (eid,) in (ConductingAnExperiment
+                               .select(ConductingAnExperiment.experiment)
+                               .where(ConductingAnExperiment.researcher.in_(list(researcher_ids)))
+                               .tuples())}
+
+@safe_db_operation
+def get_samples_delta(watermark):
+    return _delta(Sample, watermark, lambda ids: fetch_rows(
+        SampleRow, select_rows(SampleRow, Sample).where(Sample.id.in_(ids)).order_by(Sample.id)))
+
+@safe_db_operation
+def get_my_samples_delta(researcher_id, watermark):
+    return _delta(Sample, watermark, lambda ids: fetch_rows(
+        SampleRow, _my_samples_query(researcher_id).where(Sample.id.in_(ids)).order_by(Sample.id)))
+
+@safe_db_operation
+def get_researchers_delta(watermark):
+    return _delta(Researcher, watermark, lambda ids: fetch_rows(
+        ResearcherRow, select_rows(ResearcherRow, Researcher).where(Researcher.id.in_(ids)).order_by(Researcher.id)))
+
+@safe_db_operation
+def get_experiments_delta(watermark, list_only=False):
+    def fetch(ids):
+        query = _experiments_list_query(list_only).where(Experiment.id.in_(ids)).dicts()
+        return [_experiment_list_row(row, list_only) for row in query]
+    return _delta(Experiment, watermark, fetch, _experiments_of_changed_researchers)
+
+@safe_db_operation
+def get_my_experiments_delta(researcher_id, watermark, list_only=False):
+    return _delta(Experiment, watermark, lambda ids: _my_experiment_rows(
+        _my_experiments_query(researcher_id, list_only).where(Experiment.id.in_(ids)).order_by(Experiment.id),
+        list_only))
+
+@safe_db_operation
+def prune_change_log(days=changes.CHANGE_LOG_RETENTION_DAYS):
+    return changes.prune_change_log(days)
+
+
+# === ПОТОКОВОЕ ЧТЕНИЕ (для отчётов) ===
+# Функции iter_* отдают строки по одной (словари с нужными колонками), не собирая
+# весь результат в память. Соединение занято, пока генератор не дочитан до конца:
+# другие запросы во время чтения выполнять нельзя.
+
+def stream_db_operation(func):
+    """Декоратор для генераторов строк.
+
+    Каждый запрос генератора читается через своё соединение (_iter_tuples),
+    поэтому генераторы можно читать вперемешку. Ошибки не глотаются: отчёт,
+    прервавшийся на середине, должен сообщить об этом, а не оборваться молча.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        call = instrumentation.begin_call(func.__name__)
+        started = time.perf_counter()
+        rows = func(*args, **kwargs)
+        try:
+            while True:
+                with instrumentation.resumed(call):
+                    try:
+                        row = next(rows)
+                    except StopIteration:
+                        return
+                    except Exception as e:
+                        print(f"DB Error in {func.__name__}: {e}")
+                        raise
+                instrumentation.add_rows(call)
+                yield row
+        finally:
+            with instrumentation.resumed(call):
+                rows.close()
+            instrumentation.end_call(call, time.perf_counter() - started)
+    return wrapper
+
+def _iter_tuples(query):
+    """Строки запроса кортежами через отдельное соединение из пула.
+    В MySQL — через небуферизованный курсор (SSCursor)."""
+    sql, params = query.sql()
+    # Преобразования полей, которые peewee применил бы сам (даты из строк SQLite и т.п.)
+    converters = [getattr(node, 'python_value', None) for node in query._returning]
+    with dedicated_connection() as conn:
+        if isinstance(database, MySQLDatabase):
+            import pymysql.cursors
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+        else:
+            cursor = conn.cursor()
+        try:
+            started = time.perf_counter()
+            cursor.execute(sql, params)
+            instrumentation.record_statement(sql, params, time.perf_counter() - started)
+            for row in cursor:
+                yield tuple(value if value is None or convert is None else convert(value)
+                            for value, convert in zip(row, converters))
+        finally:
+            cursor.close()
+
+def _iter_dicts(query, names):
+    for row in _iter_tuples(query):
+        yield dict(zip(names, row))
+
+@stream_db_operation
+def iter_researchers():
+    names = ('id', 'surname', 'name', 'patronymic', 'organization', 'email')
+    query = Researcher.select(*(getattr(Researcher, n) for n in names)).order_by(Researcher.id)
+    yield from _iter_dicts(query, names)
+
+@stream_db_operation
+def iter_experiments_with_researchers(list_only=False):
+    names = ['id', 'name', 'purpose', 'status', 'date_of_event']
+    if not list_only:
+        names.append('description')
+    names += ['researcher_surname', 'researcher_name']
+    for row in _iter_dicts(_experiments_list_query(list_only), names):
+        yield _experiment_list_row(row, list_only)
+
+@stream_db_operation
+def iter_samples():
+    names = ('id', 'name', 'chemical_formula', 'aggregate_state', 'mass', 'volume', 'description')
+    query = Sample.select(*(getattr(Sample, n) for n in names)).order_by(Sample.id)
+    yield from _iter_dicts(query, names)
+
+@stream_db_operation
+def iter_equipment():
+    names = ('id', 'name', 'description')
+    query = Equipment.select(*(getattr(Equipment, n) for n in names)).order_by(Equipment.id)
+    yield from _iter_dicts(query, names)
+
+@stream_db_operation
+def iter_measurements():
+    names = ('id', 'method', 'property', 'value', 'unit', 'accuracy', 'time_of_event', 'sample_name')
+    query = (Measurement
+             .select(Measurement.id, Measurement.method, Measurement.property, Measurement.value,
+                     Measurement.unit, Measurement.accuracy, Measurement.time_of_event, Sample.name)
+             .join(Sample, on=(Measurement.sample == Sample.id))
+             .order_by(Measurement.time_of_event.desc()))
+    yield from _iter_dicts(query, names)
+
+@stream_db_operation
+def iter_methods():
+    names = ('id', 'name', 'description', 'experiment_name')
+    query = (Method
+             .select(Method.id, Method.name, Method.description, Experiment.name)
+             .join(Experiment, on=(Method.experiment == Experiment.id))
+             .order_by(Experiment.name))
+    yield from _iter_dicts(query, names)
+
+@stream_db_operation
+def iter_results():
+    names = ('id', 'type', 'description', 'conclusions', 'experiment_name')
+    query = (Result
+             .select(Result.id, Result.type, Result.description, Result.conclusions, Experiment.name)
+             .join(Experiment, on=(Result.experiment == Experiment.id))
+             .order_by(Experiment.name))
+    yield from _iter_dicts(query, names)
+
+@stream_db_operation
+def iter_conditions():
+    names = ('id', 'temperature', 'pressure', 'humidity', 'pH', 'illumination', 'duration', 'experiment_name')
+    query = (Condition
+             .select(Condition.id, Condition.temperature, Condition.pressure, Condition.humidity,
+                     Condition.pH, Condition.illumination, Condition.duration, Experiment.name)
+             .join(Experiment, on=(Condition.experiment == Experiment.id))
+             .order_by(Experiment.name))
+    yield from _iter_dicts(query, names)
+
+@cached_query(Researcher, Sample, Measurement, ExperimentStatusRollup)
+@safe_db_operation
+def get_report_counts():
+    """Количество строк основных таблиц и экспериментов по статусам (из сводной таблицы)"""
+    statuses = {row.status: row.count for row in
+                ExperimentStatusRollup.select().where(ExperimentStatusRollup.count > 0)}
+    return {
+        'researchers': Researcher.select().count(),
+        'experiments': sum(statuses.values()),
+        'samples': Sample.select().count(),
+        'measurements': Measurement.select().count(),
+        'statuses': statuses
+    }
+
+
+# === МАССОВАЯ ЗАГРУЗКА ИЗМЕРЕНИЙ ===
+# Показания приборов загружаются пакетами: записи проверяются по колонкам,
+# корректные вставляются пакетами по BULK_CHUNK_SIZE строк в одной транзакции,
+# некорректные возвращаются вызывающему с номером строки и причиной.
+BULK_CHUNK_SIZE = 1000         # строк в одном executemany
+BULK_VALIDATE_BATCH = 20000    # сколько записей проверяется за один проход
+
+MEASUREMENT_BULK_FIELDS = ('sample', 'method', 'property', 'value', 'unit', 'accuracy', 'time_of_event')
+# Синонимы ключей — как в create_measurement / create_measurement_for_experiment
+_MEASUREMENT_KEY_ALIASES = {'sample_id': 'sample', 'property_name': 'property'}
+
+def _normalize_measurement(record):
+    """Запись (словарь или последовательность в порядке MEASUREMENT_BULK_FIELDS) -> кортеж"""
+    if isinstance(record, dict):
+        values = {_MEASUREMENT_KEY_ALIASES.get(k, k): v for k, v in record.items()}
+        return tuple(values.get(name) for name in MEASUREMENT_BULK_FIELDS)
+    row = tuple(record)
+    if len(row) != len(MEASUREMENT_BULK_FIELDS):
+        raise ValueError(f"ожидается {len(MEASUREMENT_BULK_FIELDS)} значений, получено {len(row)}")
+    return row
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    return datetime.datetime.fromisoformat(str(value))
+
+def _validate_measurement_batch(batch, errors, offset, rejected):
+    """Проверяет пакет по колонкам; возвращает список корректных кортежей для вставки.
+
+    errors — заранее известные ошибки записей пакета (None для нечитанных без ошибок).
+    """
+    columns = list(zip(*batch)) if batch else [()] * len(MEASUREMENT_BULK_FIELDS)
+
+    def check(column, convert, message):
+        out = []
+        for i, value in enumerate(column):
+            if errors[i] is None:
+                try:
+                    value = convert(value)
+                except (TypeError, ValueError, OverflowError):
+                    errors[i] = message
+            out.append(value)
+        return out
+
+    def text(max_length, allow_empty=False):
+        def convert(value):
+            if value is None:
+                raise ValueError
+            value = str(value).strip()
+            if (not value and not allow_empty) or len(value) > max_length:
+                raise ValueError
+            return value
+        return convert
+
+    def number(value):
+        value = float(value)
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError
+        return value
+
+    sample_ids = check(columns[0], int, "некорректный sample_id")
+    methods = check(columns[1], text(Measurement.method.max_length), "пустой или слишком длинный method")
+    properties = check(columns[2], text(Measurement.property.max_length), "пустой или слишком длинный property")
+    values = check(columns[3], number, "value не является конечным числом")
+    # Безразмерные величины (pH, отношения) хранятся с пустой единицей — как в create_measurement
+    units = check(columns[4], text(Measurement.unit.max_length, allow_empty=True), "отсутствует или слишком длинная unit")
+    accuracies = check(columns[5], lambda v: None if v in (None, '') else number(v), "некорректная accuracy")
+    times = check(columns[6], _to_datetime, "некорректное time_of_event")
+
+    # Существование образцов — один запрос на пакет
+    wanted = {sid for sid, err in zip(sample_ids, errors) if err is None}
+    existing = set()
+    for ids in chunked(sorted(wanted), BULK_CHUNK_SIZE):
+        existing.update(sid for (sid,) in Sample.select(Sample.id).where(Sample.id.in_(ids)).tuples())
+
+    rows = []
+    for i, row in enumerate(zip(sample_ids, methods, properties, values, units, accuracies, times)):
+        if errors[i] is None and row[0] not in existing:
+            errors[i] = f"образец {row[0]} не найден"
+        if errors[i] is None:
+            rows.append(row)
+        else:
+            rejected.append((offset + i, errors[i]))
+    return rows
+
+@invalidates_experiments(_all_experiments)
+@invalidates(Measurement)
+@safe_db_operation
+def bulk_create_measurements(records, chunk_size=BULK_CHUNK_SIZE, all_or_nothing=False):
+    """Массовая вставка измерений.
+
+    records — итерируемое словарей (ключи как у полей Measurement, допускаются
+    sample_id и property_name) или кортежей в порядке MEASUREMENT_BULK_FIELDS.
+    Возвращает {'inserted': число вставленных, 'rejected': [(номер записи, причина), ...]}.
+    При all_or_nothing=True и хотя бы одной отбракованной записи ничего не вставляется.
+    """
+    fields = [getattr(Measurement, name) for name in MEASUREMENT_BULK_FIELDS]
+    inserted = 0
+    rejected = []
+    empty_row = (None,) * len(fields)
+    with database.atomic() as txn:
+        batch, errors, offset = [], [], 0
+        for index, record in enumerate(records):
+            try:
+                batch.append(_normalize_measurement(record))
+                errors.append(None)
+            except (TypeError, ValueError) as e:
+                batch.append(empty_row)
+                errors.append(f"некорректная запись: {e}")
+            if len(batch) >= BULK_VALIDATE_BATCH:
+                rows = _validate_measurement_batch(batch, errors, offset, rejected)
+                inserted += _insert_measurement_rows(rows, fields, chunk_size)
+                batch, errors, offset = [], [], index + 1
+        rows = _validate_measurement_batch(batch, errors, offset, rejected)
+        inserted += _insert_measurement_rows(rows, fields, chunk_size)
+        if all_or_nothing and rejected:
+            txn.rollback()
+            inserted = 0
+    return {'inserted': inserted, 'rejected': rejected}
+
+def _insert_measurement_rows(rows, fields, chunk_size):
+    if not rows:
+        return 0
+    # Текст INSERT строится peewee один раз, а не на каждый пакет: сборка
+    # многострочного insert_many в peewee дороже самой вставки. executemany
+    # в PyMySQL сам склеивает строки в многострочные INSERT VALUES (...), (...).
+    sql, _ = Measurement.insert_many([rows[0]], fields=fields).sql()
+    cursor = database.cursor()
+    try:
+        for chunk in chunked(rows, chunk_size):
+            started = time.perf_counter()
+            cursor.executemany(sql, chunk)
+            instrumentation.record_statement(sql, (), time.perf_counter() - started)
+    finally:
+        cursor.close()
+    return len(rows)
@@ -1,17 +1,17 @@
 # database/init_db.py
-from models import db, Experiment, Sample, Measurement, Equipment, Result, Condition, Researcher
+import os
+import sys
+
+# Запуск как скрипта: python database/init_db.py
+if __package__ in (None, ''):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.migrations import run_migrations
+from database.crud import prune_change_log
 
 def create_tables():
-    with db:
-        db.create_tables([
-            Researcher,
-            Experiment,
-            Sample,
-            Equipment,
-            Measurement,
-            Result,
-            Condition
-        ])
+    run_migrations()
+    prune_change_log()
     print("✅ Таблицы созданы!")
 
 if __name__ == "__main__":
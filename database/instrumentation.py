@@ -0,0 +1,188 @@
+# lis_project/database/instrumentation.py
+"""Профилирование вызовов database.crud.
+
+Для каждой функции с @safe_db_operation / @stream_db_operation учитываются
+время выполнения, число SQL-запросов, число возвращённых строк и время
+получения соединения из пула. Медленные вызовы вместе с их SQL попадают
+в кольцевой буфер. Включается переменной окружения LIS_DB_PROFILE=1;
+LIS_DB_PROFILE_DUMP=<файл> — сохранить статистику в JSON при выходе.
+"""
+import atexit
+import datetime
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PROFILE_CONFIG = {
+    'enabled': os.environ.get('LIS_DB_PROFILE', '') not in ('', '0'),
+    'slow_ms': float(os.environ.get('LIS_DB_SLOW_MS', 200)),           # порог "медленного" вызова
+    'slow_log_size': int(os.environ.get('LIS_DB_SLOW_LOG_SIZE', 100)),  # размер кольцевого буфера
+    'max_sql_per_call': 50,                                             # сколько SQL хранить для вызова
+    'dump_path': os.environ.get('LIS_DB_PROFILE_DUMP', '')
+}
+
+_local = threading.local()
+_lock = threading.Lock()
+_functions = {}  # имя функции -> агрегированная статистика
+_slow_calls = deque(maxlen=PROFILE_CONFIG['slow_log_size'])
+
+
+def enabled():
+    return PROFILE_CONFIG['enabled']
+
+def set_enabled(value):
+    PROFILE_CONFIG['enabled'] = bool(value)
+
+
+class _CallRecord:
+    __slots__ = ('function', 'started_at', 'statements', 'sql', 'rows', 'connect_time')
+
+    def __init__(self, function):
+        self.function = function
+        self.started_at = datetime.datetime.now()
+        self.statements = 0
+        self.sql = []
+        self.rows = 0
+        self.connect_time = 0.0
+
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def _result_rows(result):
+    if isinstance(result, (list, tuple, set)):
+        return len(result)
+    if hasattr(result, '__len__') and not isinstance(result, (dict, str, bytes)):
+        return len(result)  # колоночные выборки (analytics.MeasurementFrame)
+    return 0 if result is None else 1
+
+@contextmanager
+def track_call(function):
+    """Область учёта одного вызова. Вложенные вызовы учитываются и в родительских."""
+    if not PROFILE_CONFIG['enabled']:
+        yield None
+        return
+    record = _CallRecord(function)
+    stack = _stack()
+    stack.append(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        wall = time.perf_counter() - started
+        stack.pop()
+        _finish(record, wall)
+
+def begin_call(function):
+    """Запись вызова-генератора. На стек она попадает только через resumed()"""
+    return _CallRecord(function) if PROFILE_CONFIG['enabled'] else None
+
+@contextmanager
+def resumed(record):
+    """Область одного шага генератора. Пока генератор приостановлен, его записи
+    нет на стеке потока: запросы других вызовов ей не приписываются."""
+    if record is None:
+        yield
+        return
+    stack = _stack()
+    stack.append(record)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+def end_call(record, wall):
+    if record is not None:
+        _finish(record, wall)
+
+def set_result(record, result):
+    if record is not None:
+        record.rows = _result_rows(result)
+
+def add_rows(record, count=1):
+    if record is not None:
+        record.rows += count
+
+def record_statement(sql, params, elapsed):
+    """Вызывается при выполнении каждого SQL-запроса"""
+    stack = getattr(_local, 'stack', None)
+    if not stack:
+        return
+    for record in stack:
+        record.statements += 1
+        if len(record.sql) < PROFILE_CONFIG['max_sql_per_call']:
+            record.sql.append({'sql': sql, 'params': [str(p) for p in params or ()],
+                               'ms': round(elapsed * 1000, 3)})
+
+def record_connect(elapsed):
+    """Время ожидания соединения из пула"""
+    for record in getattr(_local, 'stack', None) or ():
+        record.connect_time += elapsed
+
+def _finish(record, wall):
+    wall_ms = wall * 1000
+    with _lock:
+        stats = _functions.get(record.function)
+        if stats is None:
+            stats = _functions[record.function] = {
+                'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'statements': 0,
+                'max_statements': 0, 'rows': 0, 'connect_ms': 0.0, 'slow_calls': 0
+            }
+        stats['calls'] += 1
+        stats['total_ms'] += wall_ms
+        stats['max_ms'] = max(stats['max_ms'], wall_ms)
+        stats['statements'] += record.statements
+        stats['max_statements'] = max(stats['max_statements'], record.statements)
+        stats['rows'] += record.rows
+        stats['connect_ms'] += record.connect_time * 1000
+        if wall_ms >= PROFILE_CONFIG['slow_ms']:
+            stats['slow_calls'] += 1
+            _slow_calls.append({
+                'function': record.function,
+                'started_at': record.started_at.isoformat(timespec='milliseconds'),
+                'wall_ms': round(wall_ms, 3),
+                'statements': record.statements,
+                'rows': record.rows,
+                'connect_ms': round(record.connect_time * 1000, 3),
+                'sql': record.sql
+            })
+
+
+def snapshot():
+    """Копия накопленной статистики: {'functions': {...}, 'slow_calls': [...]}"""
+    with _lock:
+        functions = {}
+        for name, stats in _functions.items():
+            item = dict(stats)
+            item['avg_ms'] = item['total_ms'] / item['calls'] if item['calls'] else 0.0
+            item['avg_statements'] = item['statements'] / item['calls'] if item['calls'] else 0.0
+            functions[name] = {k: round(v, 3) if isinstance(v, float) else v for k, v in item.items()}
+        return {
+            'enabled': PROFILE_CONFIG['enabled'],
+            'slow_ms': PROFILE_CONFIG['slow_ms'],
+            'functions': functions,
+            'slow_calls': list(_slow_calls)
+        }
+
+def reset():
+    with _lock:
+        _functions.clear()
+        _slow_calls.clear()
+
+def dump_json(path=None):
+    """Статистика в JSON; при указании path — ещё и запись в файл"""
+    text = json.dumps(snapshot(), ensure_ascii=False, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return text
+
+
+if PROFILE_CONFIG['dump_path']:
+    atexit.register(lambda: dump_json(PROFILE_CONFIG['dump_path']))
@@ -0,0 +1,102 @@
+# lis_project/database/migrations.py
+"""Создание схемы и миграции базы данных.
+
+Каждая миграция выполняется один раз, номер применённой миграции
+записывается в таблицу schema_migration. Индексы на существующих таблицах
+MySQL создаются онлайн (ALGORITHM=INPLACE, LOCK=NONE) — без блокировки записи.
+"""
+import datetime
+from peewee import Model, IntegerField, CharField, DateTimeField, MySQLDatabase, Select, fn
+from .connection import database, connection_scope
+from .models import ALL_MODELS
+from .search import ensure_fulltext_indexes
+from .rollups import ROLLUP_MODELS, rebuild_rollups
+from .changes import ChangeLog
+
+
+class SchemaMigration(Model):
+    version = IntegerField(primary_key=True)
+    name = CharField(max_length=200)
+    applied_at = DateTimeField(default=datetime.datetime.now)
+
+    class Meta:
+        database = database
+        table_name = 'schema_migration'
+
+
+def _existing_index_columns(table):
+    """Наборы колонок уже существующих индексов таблицы: {(колонки): unique}"""
+    return {tuple(idx.columns): idx.unique for idx in database.get_indexes(table)}
+
+def _index_columns(index):
+    return tuple(field.column_name for field in index._expressions)
+
+def _deduplicate(model, index):
+    """Удаляет дубли перед созданием уникального индекса (оставляет запись с минимальным id)"""
+    fields = index._expressions
+    keep = (model
+            .select(fn.MIN(model.id).alias('keep_id'))
+            .group_by(*fields)
+            .alias('keep'))
+    # Производная таблица нужна MySQL: нельзя читать из таблицы, из которой удаляем
+    keep_ids = Select([keep], [keep.c.keep_id])
+    removed = model.delete().where(model.id.not_in(keep_ids)).execute()
+    if removed:
+        print(f"⚠️ {model._meta.table_name}: удалено дублирующихся связей — {removed}")
+
+def _create_index_online(model, index):
+    sql, params = model._schema._create_index(index, safe=False).query()
+    if isinstance(database, MySQLDatabase):
+        sql += ' ALGORITHM=INPLACE LOCK=NONE'
+    database.execute_sql(sql, params)
+
+def ensure_indexes(models=None):
+    """Создаёт недостающие индексы, объявленные в моделях. Возвращает имена созданных."""
+    created = []
+    for model in models or ALL_MODELS:
+        table = model._meta.table_name
+        existing = _existing_index_columns(table)
+        for index in model._meta.fields_to_index():
+            columns = _index_columns(index)
+            if columns in existing and (existing[columns] or not index._unique):
+                continue
+            if index._unique:
+                _deduplicate(model, index)
+            _create_index_online(model, index)
+            created.append(index._name)
+            print(f"✅ Индекс {index._name} ({', '.join(columns)})")
+    return created
+
+
+def _create_tables():
+    # Существующие таблицы не трогаем: их индексы добавит ensure_indexes
+    missing = [model for model in ALL_MODELS if not model.table_exists()]
+    database.create_tables(missing)
+
+def _create_rollups():
+    database.create_tables(ROLLUP_MODELS, safe=True)
+    rebuild_rollups()
+
+def _create_change_log():
+    database.create_tables([ChangeLog], safe=True)
+
+MIGRATIONS = [
+    (1, 'Создание таблиц', _create_tables),
+    (2, 'Индексы внешних ключей и уникальность связующих таблиц', ensure_indexes),
+    (3, 'Полнотекстовые индексы для поиска', ensure_fulltext_indexes),
+    (4, 'Сводные таблицы статистики', _create_rollups),
+    (5, 'Журнал изменений для обновления страниц', _create_change_log),
+]
+
+def run_migrations():
+    """Применяет все ещё не применённые миграции по порядку"""
+    with connection_scope():
+        database.create_tables([SchemaMigration], safe=True)
+        applied = {m.version for m in SchemaMigration.select(SchemaMigration.version)}
+        for version, name, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            # DDL в MySQL не транзакционен: миграция отмечается только после успеха
+            migrate()
+            SchemaMigration.create(version=version, name=name)
+            print(f"✅ Миграция {version}: {name}")
@@ -23,8 +23,8 @@ class Experiment(Model):
     purpose = CharField(max_length=500)
     description = TextField(null=True)
     plan = TextField(null=True)
-    date_of_event = DateField(null=True)
-    status = CharField(max_length=20)  # planned, in_progress, completed
+    date_of_event = DateField(null=True, index=True)
+    status = CharField(max_length=20, index=True)  # planned, in_progress, completed
 
     class Meta:
         database = database
@@ -43,7 +43,7 @@ class Sample(Model):
         table_name = 'sample'
 
 class Equipment(Model):
-    name = CharField(max_length=200)
+    name = CharField(max_length=200, index=True)
     description = TextField(null=True)
 
     class Meta:
@@ -94,6 +94,9 @@ class Measurement(Model):
     class Meta:
         database = database
         table_name = 'measurement'
+        indexes = (
+            (('sample', 'time_of_event'), False),
+        )
 
 # Связующие таблицы (многие-ко-многим)
 class ConductingAnExperiment(Model):
@@ -103,6 +106,9 @@ class ConductingAnExperiment(Model):
     class Meta:
         database = database
         table_name = 'conducting_an_experiment'
+        indexes = (
+            (('researcher', 'experiment'), True),  # одна связь на пару
+        )
 
 class SampleInExperiment(Model):
     sample = ForeignKeyField(Sample, backref='experiments_used_in')
@@ -111,6 +117,9 @@ class SampleInExperiment(Model):
     class Meta:
         database = database
         table_name = 'sample_in_experiment'
+        indexes = (
+            (('experiment', 'sample'), True),  # одна связь на пару
+        )
 
 class ExperimentalEquipment(Model):
     equipment = ForeignKeyField(Equipment, backref='experiments_used_in')
@@ -119,3 +128,12 @@ class ExperimentalEquipment(Model):
     class Meta:
         database = database
         table_name = 'experimental_equipment'
+        indexes = (
+            (('experiment', 'equipment'), True),  # одна связь на пару
+        )
+
+# Все модели в порядке создания таблиц (сначала те, на которые ссылаются)
+ALL_MODELS = [
+    Researcher, Experiment, Sample, Equipment, Method, Result, Condition,
+    Measurement, ConductingAnExperiment, SampleInExperiment, ExperimentalEquipment
+]
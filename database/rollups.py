@@ -0,0 +1,133 @@
+# lis_project/database/rollups.py
+"""Сводные таблицы (rollup) статистики экспериментов.
+
+Хранят готовые счётчики: экспериментов по месяцам, по статусам и по
+исследователям. Счётчики меняются в тех же транзакциях, что и сами
+эксперименты (create/update/delete в database.crud), поэтому отчёты и главная
+страница читают несколько строк вместо COUNT/GROUP BY по всей таблице.
+При расхождении (например, после ручных правок в БД) — rebuild_rollups().
+"""
+from collections import Counter
+from peewee import Model, CharField, IntegerField, ForeignKeyField, MySQLDatabase, fn
+from .connection import database, transaction_scope
+from .models import Experiment, Researcher, ConductingAnExperiment
+
+
+class ExperimentMonthRollup(Model):
+    month = CharField(max_length=7, primary_key=True)  # 'ГГГГ-ММ'
+    count = IntegerField(default=0)
+
+    class Meta:
+        database = database
+        table_name = 'rollup_experiment_month'
+
+class ExperimentStatusRollup(Model):
+    status = CharField(max_length=50, primary_key=True)
+    count = IntegerField(default=0)
+
+    class Meta:
+        database = database
+        table_name = 'rollup_experiment_status'
+
+class ResearcherExperimentRollup(Model):
+    researcher = ForeignKeyField(Researcher, primary_key=True, on_delete='CASCADE')
+    count = IntegerField(default=0)
+
+    class Meta:
+        database = database
+        table_name = 'rollup_researcher_experiment'
+
+ROLLUP_MODELS = [ExperimentMonthRollup, ExperimentStatusRollup, ResearcherExperimentRollup]
+
+
+def month_key(date_of_event):
+    """Ключ месяца 'ГГГГ-ММ' (None для эксперимента без даты)"""
+    return date_of_event.strftime('%Y-%m') if date_of_event else None
+
+def _bump(model, key, delta):
+    if key is None or not delta:
+        return
+    # Один upsert вместо UPDATE + INSERT: два клиента, одновременно создающие
+    # строку счётчика, не получат ошибку дубликата ключа
+    key_field = model._meta.primary_key
+    query = model.insert({key_field: key, model.count: delta})
+    if isinstance(database, MySQLDatabase):
+        query = query.on_conflict(update={model.count: model.count + delta})  # ON DUPLICATE KEY UPDATE
+    else:
+        query = query.on_conflict(conflict_target=[key_field], update={model.count: model.count + delta})
+    query.execute()
+
+def experiment_added(date_of_event, status, researcher_ids=()):
+    _bump(ExperimentMonthRollup, month_key(date_of_event), 1)
+    _bump(ExperimentStatusRollup, status, 1)
+    for researcher_id in researcher_ids:
+        _bump(ResearcherExperimentRollup, researcher_id, 1)
+
+def experiment_removed(date_of_event, status, researcher_ids=()):
+    _bump(ExperimentMonthRollup, month_key(date_of_event), -1)
+    _bump(ExperimentStatusRollup, status, -1)
+    for researcher_id in researcher_ids:
+        _bump(ResearcherExperimentRollup, researcher_id, -1)
+
+def experiment_changed(old_date, old_status, new_date, new_status):
+    if month_key(old_date) != month_key(new_date):
+        _bump(ExperimentMonthRollup, month_key(old_date), -1)
+        _bump(ExperimentMonthRollup, month_key(new_date), 1)
+    if old_status != new_status:
+        _bump(ExperimentStatusRollup, old_status, -1)
+        _bump(ExperimentStatusRollup, new_status, 1)
+
+def experiments_changed(changes):
+    """Групповой вариант experiment_changed: changes — (old_date, old_status, new_date, new_status).
+    Сдвиги суммируются, и каждый счётчик меняется одним запросом."""
+    months, statuses = Counter(), Counter()
+    for old_date, old_status, new_date, new_status in changes:
+        if month_key(old_date) != month_key(new_date):
+            months[month_key(old_date)] -= 1
+            months[month_key(new_date)] += 1
+        if old_status != new_status:
+            statuses[old_status] -= 1
+            statuses[new_status] += 1
+    for key, delta in months.items():
+        _bump(ExperimentMonthRollup, key, delta)
+    for key, delta in statuses.items():
+        _bump(ExperimentStatusRollup, key, delta)
+
+def researcher_removed(researcher_id):
+    ResearcherExperimentRollup.delete().where(ResearcherExperimentRollup.researcher == researcher_id).execute()
+
+
+def rebuild_rollups():
+    """Пересчитывает все сводные таблицы по базовым таблицам"""
+    with transaction_scope():
+        for model in ROLLUP_MODELS:
+            model.delete().execute()
+
+        year = Experiment.date_of_event.year
+        month = Experiment.date_of_event.month
+        months = (Experiment
+                  .select(year, month, fn.COUNT(Experiment.id))
+                  .where(Experiment.date_of_event.is_null(False))
+                  .group_by(year, month)
+                  .tuples())
+        rows = [(f"{int(y):04d}-{int(m):02d}", count) for y, m, count in months]
+        if rows:
+            ExperimentMonthRollup.insert_many(rows, fields=[ExperimentMonthRollup.month,
+                                                            ExperimentMonthRollup.count]).execute()
+
+        statuses = (Experiment
+                    .select(Experiment.status, fn.COUNT(Experiment.id))
+                    .group_by(Experiment.status)
+                    .tuples())
+        rows = list(statuses)
+        if rows:
+            ExperimentStatusRollup.insert_many(rows, fields=[ExperimentStatusRollup.status,
+                                                             ExperimentStatusRollup.count]).execute()
+
+        # INSERT ... SELECT: счётчики исследователей считаются целиком на сервере
+        per_researcher = (ConductingAnExperiment
+                          .select(ConductingAnExperiment.researcher, fn.COUNT(ConductingAnExperiment.id))
+                          .group_by(ConductingAnExperiment.researcher))
+        ResearcherExperimentRollup.insert_from(per_researcher, [ResearcherExperimentRollup.researcher,
+                                                                ResearcherExperimentRollup.count]).execute()
+    print("✅ Сводные таблицы пересчитаны")
@@ -0,0 +1,27 @@
+# lis_project/database/rows.py
+"""Лёгкие типы строк для списков.
+
+Списочные страницы показывают 4–6 колонок, поэтому вместо экземпляров Model
+(со всеми TextField и служебным состоянием peewee) запросы выбирают только эти
+колонки через .tuples(), а строки упаковываются в namedtuple: доступ по
+атрибутам (s.name) как у модели, а памяти — как у обычного кортежа.
+"""
+from collections import namedtuple
+from .models import Researcher, Sample, Equipment
+
+SampleRow = namedtuple('SampleRow', ['id', 'name', 'chemical_formula', 'mass', 'volume'])
+SampleRow.columns = (Sample.id, Sample.name, Sample.chemical_formula, Sample.mass, Sample.volume)
+
+ResearcherRow = namedtuple('ResearcherRow', ['id', 'surname', 'name', 'organization'])
+ResearcherRow.columns = (Researcher.id, Researcher.surname, Researcher.name, Researcher.organization)
+
+EquipmentRow = namedtuple('EquipmentRow', ['id', 'name'])
+EquipmentRow.columns = (Equipment.id, Equipment.name)
+
+
+def select_rows(row_type, model):
+    """SELECT только колонок row_type из model (дальше можно добавить join/where/order_by)"""
+    return model.select(*row_type.columns)
+
+def fetch_rows(row_type, query):
+    return [row_type._make(row) for row in query.tuples()]
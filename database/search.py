@@ -0,0 +1,113 @@
+# lis_project/database/search.py
+"""Полнотекстовый поиск по экспериментам, образцам и исследователям.
+
+В MySQL используются FULLTEXT-индексы с парсером ngram: он режет текст на
+n-граммы, поэтому находит и части слов (как прежний поиск подстроки в таблице),
+и работает с кириллицей без словарей. Для коротких запросов и других СУБД
+остаётся поиск по LIKE; в SQLite он сравнивает строки через casefold(),
+иначе регистр кириллицы различался бы.
+"""
+from functools import reduce
+import operator
+from peewee import MySQLDatabase, SqliteDatabase, SQL, fn
+from playhouse.mysql_ext import Match
+from .connection import database
+from .models import Experiment, Sample, Researcher, ConductingAnExperiment, SampleInExperiment
+from .cache import cached_query
+from .crud import safe_db_operation
+
+SEARCH_PAGE_SIZE = 200
+NGRAM_TOKEN_SIZE = 2  # ngram_token_size сервера MySQL (по умолчанию 2)
+
+# Модель -> (имя индекса, колонки)
+SEARCH_INDEXES = {
+    Experiment: ('experiment_fulltext', (Experiment.name, Experiment.purpose, Experiment.description)),
+    Sample: ('sample_fulltext', (Sample.name, Sample.chemical_formula, Sample.description)),
+    Researcher: ('researcher_fulltext', (Researcher.surname, Researcher.organization)),
+}
+
+
+def ensure_fulltext_indexes():
+    """Создаёт недостающие FULLTEXT-индексы (только MySQL). Возвращает имена созданных."""
+    created = []
+    if not isinstance(database, MySQLDatabase):
+        return created
+    for model, (name, columns) in SEARCH_INDEXES.items():
+        table = model._meta.table_name
+        if name in {idx.name for idx in database.get_indexes(table)}:
+            continue
+        column_list = ', '.join(f'`{c.column_name}`' for c in columns)
+        database.execute_sql(
+            f'ALTER TABLE `{table}` ADD FULLTEXT INDEX `{name}` ({column_list}) WITH PARSER ngram')
+        created.append(name)
+        print(f"✅ Полнотекстовый индекс {name} ({column_list})")
+    return created
+
+
+def _terms(text):
+    # Кавычки и операторы boolean mode из запроса пользователя не пропускаем
+    cleaned = ''.join(' ' if ch in '"+-<>()~*@' else ch for ch in (text or ''))
+    return cleaned.split()
+
+def _search(model, text, page, page_size, scope=None):
+    """Ранжированные id записей model, подходящих под все слова запроса.
+    page_size=None — все совпадения одной страницей."""
+    terms = _terms(text)
+    if not terms:
+        return {'ids': [], 'has_more': False}
+    columns = SEARCH_INDEXES[model][1]
+    if isinstance(database, MySQLDatabase) and all(len(t) >= NGRAM_TOKEN_SIZE for t in terms):
+        # Каждое слово — обязательная фраза из n-грамм: '+"сло" +"во"'
+        score = Match(columns, ' '.join(f'+"{t}"' for t in terms), 'IN BOOLEAN MODE')
+        query = (model
+                 .select(model.id, score.alias('score'))
+                 .where(score)
+                 .order_by(SQL('score').desc(), model.id.desc()))
+    else:
+        if isinstance(database, SqliteDatabase):
+            columns = [fn.casefold(column) for column in columns]
+            terms = [t.casefold() for t in terms]
+        condition = reduce(operator.and_, [
+            reduce(operator.or_, [column.contains(t) for column in columns]) for t in terms])
+        query = model.select(model.id).where(condition).order_by(model.id.desc())
+    if scope is not None:
+        query = query.where(model.id.in_(scope))
+    if page_size is None:
+        # Все совпадения — для фильтра таблицы, где скрытые страницы недопустимы
+        return {'ids': [row[0] for row in query.tuples()], 'has_more': False}
+    # Лишняя строка показывает, есть ли следующая страница
+    ids = [row[0] for row in query.limit(page_size + 1).offset((page - 1) * page_size).tuples()]
+    return {'ids': ids[:page_size], 'has_more': len(ids) > page_size}
+
+def _researcher_experiment_ids(researcher_id):
+    return (ConductingAnExperiment
+            .select(ConductingAnExperiment.experiment)
+            .where(ConductingAnExperiment.researcher == researcher_id))
+
+@cached_query(Experiment, ConductingAnExperiment)
+@safe_db_operation
+def search_experiments(text, researcher_id=None, page=1, page_size=SEARCH_PAGE_SIZE):
+    """Поиск по названию, цели и описанию. researcher_id — только эксперименты исследователя.
+
+    Возвращает {'ids': [...] (по убыванию релевантности), 'has_more': bool};
+    page_size=None — все совпадения без постраничной разбивки.
+    """
+    scope = _researcher_experiment_ids(researcher_id) if researcher_id else None
+    return _search(Experiment, text, page, page_size, scope)
+
+@cached_query(Sample, SampleInExperiment, ConductingAnExperiment)
+@safe_db_operation
+def search_samples(text, researcher_id=None, page=1, page_size=SEARCH_PAGE_SIZE):
+    """Поиск по названию, формуле и описанию. researcher_id — только образцы из его экспериментов."""
+    scope = None
+    if researcher_id:
+        scope = (SampleInExperiment
+                 .select(SampleInExperiment.sample)
+                 .where(SampleInExperiment.experiment.in_(_researcher_experiment_ids(researcher_id))))
+    return _search(Sample, text, page, page_size, scope)
+
+@cached_query(Researcher)
+@safe_db_operation
+def search_researchers(text, page=1, page_size=SEARCH_PAGE_SIZE):
+    """Поиск по фамилии и организации"""
+    return _search(Researcher, text, page, page_size)
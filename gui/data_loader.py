@@ -0,0 +1,134 @@
+# lis_project/gui/data_loader.py
+"""Асинхронный доступ к данным для GUI.
+
+Функции database.crud выполняются в пуле потоков (QThreadPool), а результат
+возвращается в GUI-поток сигналом — окно не замирает, пока MySQL отвечает.
+Запросы именуются ключом: новый запрос с тем же ключом делает предыдущий
+устаревшим, и его результат отбрасывается.
+"""
+from itertools import count
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+# Не больше, чем соединений в пуле БД (POOL_CONFIG['max_connections'])
+MAX_WORKER_THREADS = 4
+
+_thread_pool = None
+_request_ids = count(1)
+# Задачи, которые ещё могут выполняться: держим ссылки, пока run() не завершится
+_live_tasks = {}
+
+
+def thread_pool():
+    """Общий пул потоков для запросов к БД"""
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = QThreadPool()
+        _thread_pool.setMaxThreadCount(MAX_WORKER_THREADS)
+    return _thread_pool
+
+
+class _TaskSignals(QObject):
+    finished = Signal(int, object)  # id запроса, результат
+    failed = Signal(int, str)       # id запроса, текст ошибки
+
+
+class _CallTask(QRunnable):
+    def __init__(self, request_id, func, args, kwargs, signals):
+        super().__init__()
+        self.request_id = request_id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = signals
+        # Временем жизни управляет DataLoader: задачу можно снять из очереди через tryTake
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self._emit(self.signals.failed, str(e))
+            return
+        else:
+            self._emit(self.signals.finished, result)
+        finally:
+            _live_tasks.pop(self.request_id, None)
+
+    def _emit(self, signal, value):
+        try:
+            signal.emit(self.request_id, value)
+        except RuntimeError:
+            pass  # окно, запросившее данные, уже закрыто
+
+
+class DataLoader(QObject):
+    """Фасад для вызова функций crud в фоне.
+
+    loader.request('list', get_all_samples, on_done=self.table_model.set_rows)
+    on_done/on_error вызываются в GUI-потоке и только для последнего
+    запроса с данным ключом; cancel() отменяет ещё не начатые и игнорирует
+    уже выполняющиеся запросы.
+    """
+    busy_changed = Signal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._signals = _TaskSignals(self)
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._pending = {}  # ключ -> (id, задача, on_done, on_error)
+
+    def request(self, key, func, *args, on_done=None, on_error=None, **kwargs):
+        self._drop(key)
+        request_id = next(_request_ids)
+        task = _CallTask(request_id, func, args, kwargs, self._signals)
+        was_busy = self.is_busy()
+        self._pending[key] = (request_id, task, on_done, on_error)
+        _live_tasks[request_id] = task
+        thread_pool().start(task)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        return request_id
+
+    def cancel(self, key=None):
+        """Отменяет запрос key (или все запросы загрузчика)"""
+        was_busy = self.is_busy()
+        for k in ([key] if key is not None else list(self._pending)):
+            self._drop(k)
+        if was_busy and not self.is_busy():
+            self.busy_changed.emit(False)
+
+    def is_busy(self, key=None):
+        return key in self._pending if key is not None else bool(self._pending)
+
+    def _drop(self, key):
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            # Задача ещё в очереди — снимаем; уже выполняется — результат будет проигнорирован
+            if thread_pool().tryTake(pending[1]):
+                _live_tasks.pop(pending[0], None)
+
+    def _take(self, request_id):
+        for key, pending in self._pending.items():
+            if pending[0] == request_id:
+                del self._pending[key]
+                if not self._pending:
+                    self.busy_changed.emit(False)
+                return pending
+        return None  # устаревший или отменённый запрос
+
+    @Slot(int, object)
+    def _on_finished(self, request_id, result):
+        pending = self._take(request_id)
+        if pending is not None and pending[2] is not None:
+            pending[2](result)
+
+    @Slot(int, str)
+    def _on_failed(self, request_id, message):
+        pending = self._take(request_id)
+        if pending is None:
+            return
+        if pending[3] is not None:
+            pending[3](message)
+        else:
+            print(f"❌ Ошибка фонового запроса: {message}")
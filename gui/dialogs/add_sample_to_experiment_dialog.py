@@ -5,6 +5,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt
 from database.crud import get_all_samples, add_sample_to_experiment
+from gui.data_loader import DataLoader
 
 class AddSampleToExperimentDialog(QDialog):
     def __init__(self, experiment_id, parent=None):
@@ -12,6 +13,7 @@ class AddSampleToExperimentDialog(QDialog):
         self.setWindowTitle("Добавить образец к эксперименту")
         self.setFixedSize(400, 150)
         self.experiment_id = experiment_id
+        self.loader = DataLoader(self)
         self.init_ui()
 
     def init_ui(self):
@@ -21,13 +23,14 @@ class AddSampleToExperimentDialog(QDialog):
         layout.addWidget(label)
 
         self.sample_combo = QComboBox()
-        samples = get_all_samples() or []
-        for s in samples:
-            self.sample_combo.addItem(f"{s.name} (ID: {s.id})", s.id)
+        self.sample_combo.addItem("Загрузка...")
+        self.sample_combo.setEnabled(False)
         layout.addWidget(self.sample_combo)
 
         btn_layout = QHBoxLayout()
         add_btn = QPushButton("Добавить")
+        add_btn.setEnabled(False)
+        self.add_btn = add_btn
         cancel_btn = QPushButton("Отмена")
 
         add_btn.clicked.connect(self.add_sample)
@@ -38,6 +41,14 @@ class AddSampleToExperimentDialog(QDialog):
         layout.addLayout(btn_layout)
 
         self.setLayout(layout)
+        self.loader.request('samples', get_all_samples, on_done=self.fill_samples)
+
+    def fill_samples(self, samples):
+        self.sample_combo.clear()
+        for s in samples or []:
+            self.sample_combo.addItem(f"{s.name} (ID: {s.id})", s.id)
+        self.sample_combo.setEnabled(True)
+        self.add_btn.setEnabled(True)
 
     def add_sample(self):
         sample_id = self.sample_combo.currentData()
@@ -0,0 +1,132 @@
+# lis_project/gui/dialogs/diagnostics_dialog.py
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTextEdit,
+    QFileDialog, QMessageBox
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+from database import instrumentation
+
+class DiagnosticsDialog(QDialog):
+    """Статистика запросов к БД по функциям crud и журнал медленных вызовов"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Диагностика запросов к БД")
+        self.resize(1000, 700)
+        self.slow_calls = []
+        self.init_ui()
+        self.refresh()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        title = QLabel("Функции")
+        title.setFont(QFont("Arial", 14, QFont.Bold))
+        layout.addWidget(title)
+
+        self.functions_table = QTableWidget(0, 8)
+        self.functions_table.setHorizontalHeaderLabels([
+            "Функция", "Вызовы", "Среднее, мс", "Макс., мс",
+            "SQL/вызов", "Макс. SQL", "Строк", "Соединение, мс"
+        ])
+        self.functions_table.verticalHeader().setVisible(False)
+        self.functions_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.functions_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.functions_table.setSortingEnabled(True)
+        layout.addWidget(self.functions_table)
+
+        title = QLabel("Медленные вызовы")
+        title.setFont(QFont("Arial", 14, QFont.Bold))
+        layout.addWidget(title)
+
+        self.slow_table = QTableWidget(0, 5)
+        self.slow_table.setHorizontalHeaderLabels(["Время", "Функция", "Длительность, мс", "SQL", "Строк"])
+        self.slow_table.verticalHeader().setVisible(False)
+        self.slow_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.slow_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.slow_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.slow_table.currentCellChanged.connect(self.show_sql)
+        layout.addWidget(self.slow_table)
+
+        self.sql_view = QTextEdit()
+        self.sql_view.setReadOnly(True)
+        self.sql_view.setPlaceholderText("Выберите медленный вызов, чтобы увидеть его SQL")
+        layout.addWidget(self.sql_view)
+
+        btn_layout = QHBoxLayout()
+        refresh_btn = QPushButton("Обновить")
+        reset_btn = QPushButton("Сбросить")
+        save_btn = QPushButton("Сохранить JSON")
+        close_btn = QPushButton("Закрыть")
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn.clicked.connect(self.reset)
+        save_btn.clicked.connect(self.save_json)
+        close_btn.clicked.connect(self.accept)
+        for btn in (refresh_btn, reset_btn, save_btn, close_btn):
+            btn.setFixedHeight(35)
+            btn_layout.addWidget(btn)
+        layout.addLayout(btn_layout)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        data = instrumentation.snapshot()
+        if data['enabled']:
+            self.status_label.setText(f"Профилирование включено, порог медленного вызова: {data['slow_ms']:.0f} мс")
+        else:
+            self.status_label.setText("Профилирование выключено (LIS_DB_PROFILE=1 — включить)")
+
+        self.functions_table.setSortingEnabled(False)
+        self.functions_table.setRowCount(len(data['functions']))
+        for row, (name, stats) in enumerate(data['functions'].items()):
+            values = [name, stats['calls'], stats['avg_ms'], stats['max_ms'], stats['avg_statements'],
+                      stats['max_statements'], stats['rows'], stats['connect_ms']]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem()
+                # Числа кладём как данные, чтобы сортировка была числовой
+                item.setData(Qt.DisplayRole, value)
+                self.functions_table.setItem(row, col, item)
+        self.functions_table.setSortingEnabled(True)
+        self.functions_table.sortByColumn(2, Qt.DescendingOrder)
+
+        self.slow_calls = list(reversed(data['slow_calls']))  # новые сверху
+        self.slow_table.setRowCount(len(self.slow_calls))
+        for row, call in enumerate(self.slow_calls):
+            self.slow_table.setItem(row, 0, QTableWidgetItem(call['started_at']))
+            self.slow_table.setItem(row, 1, QTableWidgetItem(call['function']))
+            self.slow_table.setItem(row, 2, QTableWidgetItem(f"{call['wall_ms']:.1f}"))
+            self.slow_table.setItem(row, 3, QTableWidgetItem(str(call['statements'])))
+            self.slow_table.setItem(row, 4, QTableWidgetItem(str(call['rows'])))
+        self.sql_view.clear()
+
+    def show_sql(self, row, column, previous_row, previous_column):
+        if not 0 <= row < len(self.slow_calls):
+            return
+        call = self.slow_calls[row]
+        lines = []
+        for i, statement in enumerate(call['sql'], 1):
+            lines.append(f"-- {i}. {statement['ms']} мс, параметры: {statement['params']}")
+            lines.append(statement['sql'])
+            lines.append("")
+        if call['statements'] > len(call['sql']):
+            lines.append(f"-- ... ещё {call['statements'] - len(call['sql'])} запросов")
+        self.sql_view.setPlainText("\n".join(lines))
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    def save_json(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Сохранить статистику", "db_profile.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            instrumentation.dump_json(path)
+            QMessageBox.information(self, "Успех", f"Статистика сохранена: {path}")
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось сохранить файл:\n{e}")
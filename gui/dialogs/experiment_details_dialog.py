@@ -1,65 +1,151 @@
 # lis_project/gui/dialogs/experiment_details_dialog.py
+from datetime import datetime
 from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTabWidget, QWidget, QTableWidget, QTableWidgetItem,
-    QTextEdit, QHeaderView, QMessageBox
+    QTabWidget, QWidget, QTextEdit, QMessageBox
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
+from gui.data_loader import DataLoader
+from gui.table_model import Column, RowTableModel, RowTableView, text_column, number_column
+
+STATUS_LABELS = {
+    'planned': 'Планирование',
+    'in_progress': 'В работе',
+    'completed': 'Завершён'
+}
+
+
+def _time_text(value):
+    """Время из БД: datetime или строка (нулевая дата MySQL '0000-00-00 ...' — прочерк)"""
+    if not value:
+        return "—"
+    if isinstance(value, str):
+        try:
+            value = datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return "—"
+    return value.strftime('%d.%m.%Y %H:%M')
+
+def _time_column(title, field):
+    # str(datetime) и строка из БД в формате ISO сортируются хронологически
+    return Column(title, field, _time_text, lambda value: str(value) if value else '', False)
+
+
+# Колонки таблиц вкладок; ключ — связь из database.crud.EXPERIMENT_RELATIONS
+RELATION_COLUMNS = {
+    'methods': (
+        number_column("ID", 'id'),
+        text_column("Название", 'name'),
+        text_column("Описание", 'description'),
+    ),
+    'samples': (
+        number_column("ID", 'id'),
+        text_column("Название", 'name'),
+        text_column("Формула", 'chemical_formula'),
+        text_column("Состояние", 'aggregate_state'),
+        number_column("Масса", 'mass'),
+    ),
+    'equipment': (
+        number_column("ID", 'id'),
+        text_column("Название", 'name'),
+        text_column("Описание", 'description'),
+    ),
+    'measurements': (
+        number_column("ID", 'id'),
+        text_column("Образец", 'sample.name'),
+        text_column("Метод", 'method'),
+        text_column("Параметр", 'property'),
+        number_column("Значение", 'value'),
+        text_column("Ед.", 'unit'),
+        number_column("Точность", 'accuracy'),
+        _time_column("Время", 'time_of_event'),
+    ),
+    'conditions': (
+        number_column("ID", 'id'),
+        number_column("Темп. (°C)", 'temperature', empty="—"),
+        number_column("Давл. (Па)", 'pressure', empty="—"),
+        number_column("Влажн. (%)", 'humidity', empty="—"),
+        number_column("pH", 'pH', empty="—"),
+        text_column("Освещённость", 'illumination'),
+        _time_column("Длительность", 'duration'),
+    ),
+    'results': (
+        number_column("ID", 'id'),
+        text_column("Тип", 'type'),
+        text_column("Описание", 'description'),
+        text_column("Выводы", 'conclusions'),
+        text_column("URL", 'URL'),
+    ),
+}
+
+# Измерения выбираются через образцы эксперимента и показывают имя образца
+SAMPLE_RELATIONS = ('samples', 'measurements')
+
 
 class ExperimentDetailsDialog(QDialog):
+    """Карточка эксперимента. experiment_data — результат get_experiment_with_relations:
+    достаточно заголовка (EXPERIMENT_HEADER_RELATIONS); связи, которых в нём нет,
+    загружаются при первом открытии своей вкладки."""
+
     def __init__(self, experiment_data, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Детали эксперимента")
         self.setFixedSize(1000, 700)
         self.experiment_data = experiment_data
         self.parent_window = parent
+        self.loader = DataLoader(self)
+        self.tables = {}        # связь -> RowTableView вкладки
+        self.placeholders = {}  # связь -> надпись на месте таблицы, пока данные не загружены
+        self.loaded = set()     # связи, чьи таблицы уже заполнены
+        self.stale = set()      # загруженные связи, изменённые, пока их вкладка была скрыта
         self.init_ui()
 
     def init_ui(self):
+        """Строится один раз; после правок обновляются только модели вкладок"""
         layout = QVBoxLayout()
         exp = self.experiment_data['experiment']
-        researchers = self.experiment_data['researchers']
 
         # Заголовок
-        title = QLabel(f"Эксперимент: {exp.name}")
-        title.setFont(QFont("Arial", 16, QFont.Bold))
-        layout.addWidget(title)
+        self.title_label = QLabel()
+        self.title_label.setFont(QFont("Arial", 16, QFont.Bold))
+        layout.addWidget(self.title_label)
 
         # Основная информация
-        status_rus = {
-            'planned': 'Планирование',
-            'in_progress': 'В работе',
-            'completed': 'Завершён'
-        }.get(exp.status, exp.status)
-        date_str = exp.date_of_event.strftime('%d.%m.%Y') if exp.date_of_event else 'Не указана'
-        researcher_names = ', '.join([f"{r.surname} {r.name}" for r in researchers])
+        self.info_label = QLabel()
+        self.info_label.setStyleSheet("background-color: #f0f0f0; padding: 10px; border-radius: 8px;")
+        layout.addWidget(self.info_label)
+        self.update_header()
 
-        info_text = f"""
-        <b>Цель:</b> {exp.purpose}<br/>
-        <b>Статус:</b> {status_rus}<br/>
-        <b>Дата:</b> {date_str}<br/>
-        <b>Исследователь:</b> {researcher_names}
-        """
-        info_label = QLabel(info_text)
-        info_label.setStyleSheet("background-color: #f0f0f0; padding: 10px; border-radius: 8px;")
-        layout.addWidget(info_label)
-
-        # Вкладки
+        # Вкладки: связи загружаются при первом открытии вкладки
         tabs = QTabWidget()
-        tabs.addTab(self.create_text_tab(exp.description or "Описание отсутствует"), "Описание")
-        tabs.addTab(self.create_text_tab(exp.plan or "План отсутствует"), "План")
-
-        # === МЕТОДЫ (с кнопками, если свой эксперимент) ===
-        methods_widget = self.create_methods_tab()
-        tabs.addTab(methods_widget, "Методы")
-
-        tabs.addTab(self.create_samples_tab(), "Образцы")
-        tabs.addTab(self.create_equipment_tab(), "Оборудование")
-        tabs.addTab(self.create_measurements_tab(), "Измерения")
-        tabs.addTab(self.create_conditions_tab(), "Условия")
-        tabs.addTab(self.create_results_tab(), "Результаты")
+        self.description_text = QTextEdit()
+        self.plan_text = QTextEdit()
+        tabs.addTab(self.create_text_tab(self.description_text), "Описание")
+        tabs.addTab(self.create_text_tab(self.plan_text), "План")
+        self.update_text_tabs()
+        tabs.addTab(self.create_relation_tab(
+            'methods', self.add_method, self.edit_method, self.delete_method), "Методы")
+        tabs.addTab(self.create_relation_tab(
+            'samples', self.add_sample_to_experiment, self.edit_selected_sample,
+            self.remove_sample_from_experiment), "Образцы")
+        tabs.addTab(self.create_relation_tab(
+            'equipment', self.add_equipment_to_experiment, self.edit_selected_equipment,
+            self.remove_equipment_from_experiment), "Оборудование")
+        tabs.addTab(self.create_relation_tab(
+            'measurements', self.add_measurement, self.edit_selected_measurement,
+            self.delete_selected_measurement), "Измерения")
+        tabs.addTab(self.create_relation_tab(
+            'conditions', self.add_condition, self.edit_selected_condition,
+            self.delete_selected_condition), "Условия")
+        tabs.addTab(self.create_relation_tab(
+            'results', self.add_result, self.edit_selected_result,
+            self.delete_selected_result), "Результаты")
+        self.tab_relations = {tabs.indexOf(self.tables[relation].parentWidget()): relation
+                              for relation in self.tables}
+        tabs.currentChanged.connect(self.on_tab_changed)
         layout.addWidget(tabs)
+        self.tabs = tabs
 
         # Кнопка закрытия
         close_btn = QPushButton("Закрыть")
@@ -69,31 +155,59 @@ class ExperimentDetailsDialog(QDialog):
 
         self.setLayout(layout)
 
+    def update_header(self):
+        exp = self.experiment_data['experiment']
+        researchers = self.experiment_data['researchers']
+        status_rus = STATUS_LABELS.get(exp.status, exp.status)
+        date_str = exp.date_of_event.strftime('%d.%m.%Y') if exp.date_of_event else 'Не указана'
+        researcher_names = ', '.join([f"{r.surname} {r.name}" for r in researchers])
+
+        self.title_label.setText(f"Эксперимент: {exp.name}")
+        self.info_label.setText(f"""
+        <b>Цель:</b> {exp.purpose}<br/>
+        <b>Статус:</b> {status_rus}<br/>
+        <b>Дата:</b> {date_str}<br/>
+        <b>Исследователь:</b> {researcher_names}
+        """)
+
+    def update_text_tabs(self):
+        exp = self.experiment_data['experiment']
+        self.description_text.setPlainText(exp.description or "Описание отсутствует")
+        self.plan_text.setPlainText(exp.plan or "План отсутствует")
+
     def is_my_experiment(self):
         """Проверяет, принадлежит ли эксперимент текущему пользователю (id=1)"""
         MY_USER_ID = 1
         researchers = self.experiment_data.get('researchers', [])
         return any(r.id == MY_USER_ID for r in researchers)
 
-    def create_methods_tab(self):
+    def create_text_tab(self, text_edit):
         widget = QWidget()
         layout = QVBoxLayout(widget)
+        text_edit.setReadOnly(True)
+        layout.addWidget(text_edit)
+        return widget
 
-        # Таблица методов
-        methods = self.experiment_data['methods']
-        table = QTableWidget(len(methods), 3)
-        table.setHorizontalHeaderLabels(["ID", "Название", "Описание"])
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-
-        for row, method in enumerate(methods):
-            table.setItem(row, 0, QTableWidgetItem(str(method.id)))
-            table.setItem(row, 1, QTableWidgetItem(method.name))
-            table.setItem(row, 2, QTableWidgetItem(method.description))
+    def create_relation_tab(self, relation, on_add, on_edit, on_delete):
+        """Вкладка со списком связи: таблица на RowTableModel и кнопки правки (для своего эксперимента)"""
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
 
+        model = RowTableModel(RELATION_COLUMNS[relation], self)
+        table = RowTableView(model)
         layout.addWidget(table)
-        self.methods_table = table
+        self.tables[relation] = table
+
+        placeholder = QLabel("Загрузка...")
+        placeholder.setAlignment(Qt.AlignCenter)
+        placeholder.setStyleSheet("color: #888888;")
+        layout.addWidget(placeholder)
+        self.placeholders[relation] = placeholder
+
+        if relation in self.experiment_data:
+            self.show_relation(relation, self.experiment_data[relation])
+        else:
+            table.hide()
 
         # Кнопки управления — только для своего эксперимента
         if self.is_my_experiment():
@@ -118,9 +232,9 @@ class ExperimentDetailsDialog(QDialog):
                     }
                 """)
 
-            add_btn.clicked.connect(self.add_method)
-            edit_btn.clicked.connect(self.edit_method)
-            delete_btn.clicked.connect(self.delete_method)
+            add_btn.clicked.connect(on_add)
+            edit_btn.clicked.connect(on_edit)
+            delete_btn.clicked.connect(on_delete)
 
             btn_layout.addWidget(add_btn)
             btn_layout.addWidget(edit_btn)
@@ -129,20 +243,98 @@ class ExperimentDetailsDialog(QDialog):
 
         return widget
 
-    def get_selected_method_id(self):
-        selected = self.methods_table.selectedItems()
-        if not selected:
-            QMessageBox.warning(self, "Внимание", "Выберите метод в таблице")
+    def get_selected_id(self, relation, hint):
+        row = self.tables[relation].selected_row()
+        if row is None:
+            QMessageBox.warning(self, "Внимание", hint)
             return None
-        row = selected[0].row()
-        return int(self.methods_table.item(row, 0).text())
+        return row.id
+
+    def on_tab_changed(self, index):
+        relation = self.tab_relations.get(index)
+        if relation is None:
+            return
+        if relation not in self.loaded:
+            self.load_relation(relation)
+        elif relation in self.stale:
+            self.refresh_relation(relation)
+
+    def load_relation(self, relation):
+        """Первая загрузка связи для вкладки; на время загрузки видна надпись-заглушка"""
+        from database.crud import get_experiment_with_relations
+        exp_id = self.experiment_data['experiment'].id
+        self.placeholders[relation].setText("Загрузка...")
+        self.loader.request(('tab', relation), get_experiment_with_relations, exp_id, (relation,),
+                            on_done=lambda data: self.on_relation_loaded(relation, data),
+                            on_error=lambda message: self.show_load_error(relation))
+
+    def on_relation_loaded(self, relation, experiment_data):
+        if experiment_data:
+            self.on_relations_reloaded(experiment_data)
+        else:
+            self.show_load_error(relation)
+
+    def show_load_error(self, relation):
+        # Повторная попытка — при следующем открытии вкладки
+        self.placeholders[relation].setText("Не удалось загрузить данные")
+
+    def show_relation(self, relation, items):
+        table = self.tables[relation]
+        if relation in self.loaded:
+            table.source_model.sync_rows(items)
+            return
+        # Первое заполнение — сбросом модели: представление получает строки пачками
+        table.source_model.set_rows(items)
+        self.loaded.add(relation)
+        self.placeholders[relation].hide()
+        table.show()
+
+    def reload_relations(self, *relations):
+        """После правки: связь открытой вкладки перезагружается сразу, остальные
+        загруженные помечаются устаревшими и обновятся при открытии своей вкладки.
+        Вкладки, которые ещё не открывали, загрузятся сами."""
+        current = self.tab_relations.get(self.tabs.currentIndex())
+        for relation in relations:
+            if relation not in self.loaded:
+                continue
+            if relation == current:
+                self.refresh_relation(relation)
+            else:
+                self.stale.add(relation)
+
+    def refresh_relation(self, relation):
+        """Перезагружает связь в фоне и обновляет строки её таблицы на месте"""
+        from database.crud import get_experiment_with_relations, EXPERIMENT_HEADER_RELATIONS
+        exp_id = self.experiment_data['experiment'].id
+        self.stale.discard(relation)
+        self.setCursor(Qt.BusyCursor)
+        # Вместе со связью — заголовок: правка могла затронуть и сам эксперимент
+        self.loader.request(('reload', relation), get_experiment_with_relations, exp_id,
+                            (relation,) + EXPERIMENT_HEADER_RELATIONS, on_done=self.on_relations_reloaded)
+
+    def on_relations_reloaded(self, experiment_data):
+        if not self.loader.is_busy():
+            self.unsetCursor()
+        if not experiment_data:
+            return
+        for relation, items in experiment_data.items():
+            self.experiment_data[relation] = items
+            if relation in self.tables:
+                self.show_relation(relation, items)
+        # 'experiment' есть в каждом ответе — заголовок и тексты всегда по свежему снимку
+        self.update_header()
+        self.update_text_tabs()
+
+    # === МЕТОДЫ ===
+    def get_selected_method_id(self):
+        return self.get_selected_id('methods', "Выберите метод в таблице")
 
     def add_method(self):
         from gui.dialogs.add_method_dialog import AddMethodDialog
         exp_id = self.experiment_data['experiment'].id
         dialog = AddMethodDialog(exp_id, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('methods')
 
     def edit_method(self):
         method_id = self.get_selected_method_id()
@@ -160,7 +352,7 @@ class ExperimentDetailsDialog(QDialog):
             'description': method_obj.description
         }, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('methods')
 
     def delete_method(self):
         method_id = self.get_selected_method_id()
@@ -176,103 +368,20 @@ class ExperimentDetailsDialog(QDialog):
             from database.crud import delete_method
             if delete_method(method_id):
                 QMessageBox.information(self, "Успех", "Метод удалён")
-                self.reload_experiment_data()
+                self.reload_relations('methods')
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить метод")
 
-    def reload_experiment_data(self):
-        """Перезагружает данные эксперимента и обновляет интерфейс"""
-        from database.crud import get_experiment_with_relations
-        exp_id = self.experiment_data['experiment'].id
-        self.experiment_data = get_experiment_with_relations(exp_id)
-        self.init_ui()  # ← перестраиваем весь диалог
-
-    def create_text_tab(self, text):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        text_edit = QTextEdit()
-        text_edit.setPlainText(text)
-        text_edit.setReadOnly(True)
-        layout.addWidget(text_edit)
-        return widget
-        
-    def create_samples_tab(self):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-
-        samples = self.experiment_data['samples']
-        
-        # ВСЕГДА создаём таблицу (даже если данных нет)
-        table = QTableWidget(len(samples), 5)
-        table.setHorizontalHeaderLabels(["ID", "Название", "Формула", "Состояние", "Масса"])
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        table.setObjectName("samples_table")  # ← Теперь безопасно!
-
-        for row, sample in enumerate(samples):
-            if sample is None:
-                continue
-            table.setItem(row, 0, QTableWidgetItem(str(sample.id)))
-            table.setItem(row, 1, QTableWidgetItem(sample.name))
-            table.setItem(row, 2, QTableWidgetItem(sample.chemical_formula))
-            table.setItem(row, 3, QTableWidgetItem(sample.aggregate_state))
-            table.setItem(row, 4, QTableWidgetItem(str(sample.mass)))
-
-        layout.addWidget(table)
-
-        # Кнопки управления — только для своего эксперимента
-        if self.is_my_experiment():
-            btn_layout = QHBoxLayout()
-            add_btn = QPushButton("➕ Добавить")
-            edit_btn = QPushButton("✏️ Редактировать")
-            delete_btn = QPushButton("🗑️ Удалить")
-
-            for btn in [add_btn, edit_btn, delete_btn]:
-                btn.setFixedHeight(30)
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #000;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        font-size: 11px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #333;
-                    }
-                """)
-
-            add_btn.clicked.connect(self.add_sample_to_experiment)
-            edit_btn.clicked.connect(self.edit_selected_sample)
-            delete_btn.clicked.connect(self.remove_sample_from_experiment)
-
-            btn_layout.addWidget(add_btn)
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
-            layout.addLayout(btn_layout)
-
-        return widget
-        
+    # === ОБРАЗЦЫ ===
     def get_selected_sample_id(self):
-        table = self.findChild(QTableWidget, "samples_table")
-        if not table:
-            QMessageBox.warning(self, "Ошибка", "Таблица образцов недоступна")
-            return None
-        selected = table.selectedItems()
-        if not selected:
-            QMessageBox.warning(self, "Внимание", "Выберите образец в таблице")
-            return None
-        row = selected[0].row()
-        return int(table.item(row, 0).text())
+        return self.get_selected_id('samples', "Выберите образец в таблице")
 
     def add_sample_to_experiment(self):
         from gui.dialogs.add_sample_to_experiment_dialog import AddSampleToExperimentDialog
         exp_id = self.experiment_data['experiment'].id
         dialog = AddSampleToExperimentDialog(exp_id, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations(*SAMPLE_RELATIONS)
 
     def edit_selected_sample(self):
         sample_id = self.get_selected_sample_id()
@@ -295,7 +404,7 @@ class ExperimentDetailsDialog(QDialog):
         }
         dialog = EditSampleDialog(sample_dict, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations(*SAMPLE_RELATIONS)
 
     def remove_sample_from_experiment(self):
         sample_id = self.get_selected_sample_id()
@@ -311,85 +420,20 @@ class ExperimentDetailsDialog(QDialog):
             from database.crud import remove_sample_from_experiment
             if remove_sample_from_experiment(self.experiment_data['experiment'].id, sample_id):
                 QMessageBox.information(self, "Успех", "Образец удалён из эксперимента")
-                self.reload_experiment_data()
+                self.reload_relations(*SAMPLE_RELATIONS)
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить образец")
-                
-    def create_equipment_tab(self):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-
-        equipment_list = self.experiment_data['equipment']
-        
-        # ВСЕГДА создаём таблицу (даже если данных нет)
-        table = QTableWidget(len(equipment_list), 3)
-        table.setHorizontalHeaderLabels(["ID", "Название", "Описание"])
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        table.setObjectName("equipment_table")  # ← Теперь безопасно!
-
-        for row, equip in enumerate(equipment_list):
-            if equip is None:
-                continue
-            table.setItem(row, 0, QTableWidgetItem(str(equip.id)))
-            table.setItem(row, 1, QTableWidgetItem(equip.name))
-            table.setItem(row, 2, QTableWidgetItem(equip.description))
-
-        layout.addWidget(table)
-
-        # Кнопки управления — только для своего эксперимента
-        if self.is_my_experiment():
-            btn_layout = QHBoxLayout()
-            add_btn = QPushButton("➕ Добавить")
-            edit_btn = QPushButton("✏️ Редактировать")
-            delete_btn = QPushButton("🗑️ Удалить")
-
-            for btn in [add_btn, edit_btn, delete_btn]:
-                btn.setFixedHeight(30)
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #000;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        font-size: 11px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #333;
-                    }
-                """)
-
-            add_btn.clicked.connect(self.add_equipment_to_experiment)
-            edit_btn.clicked.connect(self.edit_selected_equipment)
-            delete_btn.clicked.connect(self.remove_equipment_from_experiment)
-
-            btn_layout.addWidget(add_btn)
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
-            layout.addLayout(btn_layout)
 
-        return widget
-        
+    # === ОБОРУДОВАНИЕ ===
     def get_selected_equipment_id(self):
-        table = self.findChild(QTableWidget, "equipment_table")
-        if not table:
-            QMessageBox.warning(self, "Ошибка", "Таблица оборудования недоступна")
-            return None
-        selected = table.selectedItems()
-        if not selected:
-            QMessageBox.warning(self, "Внимание", "Выберите оборудование в таблице")
-            return None
-        row = selected[0].row()
-        return int(table.item(row, 0).text())
+        return self.get_selected_id('equipment', "Выберите оборудование в таблице")
 
     def add_equipment_to_experiment(self):
         from gui.dialogs.add_equipment_dialog import AddEquipmentDialog
         exp_id = self.experiment_data['experiment'].id
         dialog = AddEquipmentDialog(exp_id, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('equipment')
 
     def edit_selected_equipment(self):
         equip_id = self.get_selected_equipment_id()
@@ -407,7 +451,7 @@ class ExperimentDetailsDialog(QDialog):
             'description': equip_obj.description
         }, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('equipment')
 
     def remove_equipment_from_experiment(self):
         equip_id = self.get_selected_equipment_id()
@@ -423,110 +467,20 @@ class ExperimentDetailsDialog(QDialog):
             from database.crud import remove_equipment_from_experiment
             if remove_equipment_from_experiment(self.experiment_data['experiment'].id, equip_id):
                 QMessageBox.information(self, "Успех", "Оборудование удалено из эксперимента")
-                self.reload_experiment_data()
+                self.reload_relations('equipment')
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить оборудование")
-                
-    def create_measurements_tab(self):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-
-        measurements = self.experiment_data['measurements']
-        
-        # Всегда создаём таблицу (даже если данных нет)
-        table = QTableWidget(len(measurements), 8)
-        table.setHorizontalHeaderLabels(["ID", "Образец", "Метод", "Параметр", "Значение", "Ед.", "Точность", "Время"])
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        table.setObjectName("measurements_table")  # ← Теперь безопасно!
-
-        for row, m in enumerate(measurements):
-            if m is None:
-                continue
-
-            sample_name = m.sample.name if m.sample else "—"
-            
-            # Обработка времени
-            time_str = "—"
-            if m.time_of_event:
-                if isinstance(m.time_of_event, str):
-                    if m.time_of_event.startswith("0000-00-00") or m.time_of_event == "0000-00-00 00:00:00":
-                        time_str = "—"
-                    else:
-                        try:
-                            from datetime import datetime
-                            dt = datetime.strptime(m.time_of_event, '%Y-%m-%d %H:%M:%S')
-                            time_str = dt.strftime('%d.%m.%Y %H:%M')
-                        except ValueError:
-                            time_str = "—"
-                else:
-                    time_str = m.time_of_event.strftime('%d.%m.%Y %H:%M')
-
-            table.setItem(row, 0, QTableWidgetItem(str(m.id)))
-            table.setItem(row, 1, QTableWidgetItem(sample_name))
-            table.setItem(row, 2, QTableWidgetItem(m.method))
-            table.setItem(row, 3, QTableWidgetItem(m.property))  # ← ПАРАМЕТР
-            table.setItem(row, 4, QTableWidgetItem(str(m.value)))
-            table.setItem(row, 5, QTableWidgetItem(m.unit))
-            table.setItem(row, 6, QTableWidgetItem(str(m.accuracy)))
-            table.setItem(row, 7, QTableWidgetItem(time_str))
-
-        layout.addWidget(table)
-
-        # Кнопки управления (если свой эксперимент)
-        if self.is_my_experiment():
-            btn_layout = QHBoxLayout()
-            add_btn = QPushButton("➕ Добавить")
-            edit_btn = QPushButton("✏️ Редактировать")
-            delete_btn = QPushButton("🗑️ Удалить")
-
-            for btn in [add_btn, edit_btn, delete_btn]:
-                btn.setFixedHeight(30)
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #000;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        font-size: 11px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #333;
-                    }
-                """)
-
-            add_btn.clicked.connect(self.add_measurement)
-            edit_btn.clicked.connect(self.edit_selected_measurement)
-            delete_btn.clicked.connect(self.delete_selected_measurement)
-
-            btn_layout.addWidget(add_btn)
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
-            layout.addLayout(btn_layout)
 
-        return widget
-    
+    # === ИЗМЕРЕНИЯ ===
     def get_selected_measurement_id(self):
-        # Находим таблицу по имени
-        table = self.findChild(QTableWidget, "measurements_table")
-        if not table:
-            QMessageBox.warning(self, "Ошибка", "Таблица недоступна")
-            return None
-        selected = table.selectedItems()
-        if not selected:
-            QMessageBox.warning(self, "Внимание", "Выберите измерение в таблице")
-            return None
-        row = selected[0].row()
-        return int(table.item(row, 0).text())
+        return self.get_selected_id('measurements', "Выберите измерение в таблице")
 
     def add_measurement(self):
         from gui.dialogs.add_measurement_dialog import AddMeasurementDialog
         exp_id = self.experiment_data['experiment'].id
         dialog = AddMeasurementDialog(exp_id, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('measurements')
 
     def edit_selected_measurement(self):
         measurement_id = self.get_selected_measurement_id()
@@ -541,7 +495,7 @@ class ExperimentDetailsDialog(QDialog):
         # Получаем данные
         sample_name = m_obj.sample.name if m_obj.sample else "Не указан"
         sample_id = m_obj.sample.id if m_obj.sample else None
-        
+
         # Обработка времени
         time_str = ""
         if m_obj.time_of_event:
@@ -568,7 +522,7 @@ class ExperimentDetailsDialog(QDialog):
             'time_of_event': time_str  # ← ДОБАВЛЕНО!
         }, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('measurements')
 
     def delete_selected_measurement(self):
         measurement_id = self.get_selected_measurement_id()
@@ -584,84 +538,20 @@ class ExperimentDetailsDialog(QDialog):
             from database.crud import delete_measurement
             if delete_measurement(measurement_id):
                 QMessageBox.information(self, "Успех", "Измерение удалено")
-                self.reload_experiment_data()
+                self.reload_relations('measurements')
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить измерение")
-                
-    def create_results_tab(self):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-
-        results = self.experiment_data['results']
-        table = QTableWidget(len(results), 5)
-        table.setHorizontalHeaderLabels(["ID", "Тип", "Описание", "Выводы", "URL"])
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        table.setObjectName("results_table")
-
-        for row, r in enumerate(results):
-            if r is None:
-                continue
-            table.setItem(row, 0, QTableWidgetItem(str(r.id)))
-            table.setItem(row, 1, QTableWidgetItem(r.type))
-            table.setItem(row, 2, QTableWidgetItem(r.description))
-            table.setItem(row, 3, QTableWidgetItem(r.conclusions))
-            table.setItem(row, 4, QTableWidgetItem(r.URL))
-
-        layout.addWidget(table)
-
-        # Кнопки — только для своего эксперимента
-        if self.is_my_experiment():
-            btn_layout = QHBoxLayout()
-            add_btn = QPushButton("➕ Добавить")
-            edit_btn = QPushButton("✏️ Редактировать")
-            delete_btn = QPushButton("🗑️ Удалить")
-
-            for btn in [add_btn, edit_btn, delete_btn]:
-                btn.setFixedHeight(30)
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #000;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        font-size: 11px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #333;
-                    }
-                """)
-
-            add_btn.clicked.connect(self.add_result)
-            edit_btn.clicked.connect(self.edit_selected_result)
-            delete_btn.clicked.connect(self.delete_selected_result)
-
-            btn_layout.addWidget(add_btn)
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
-            layout.addLayout(btn_layout)
 
-        return widget
-        
+    # === РЕЗУЛЬТАТЫ ===
     def get_selected_result_id(self):
-        table = self.findChild(QTableWidget, "results_table")
-        if not table:
-            return None
-        selected = table.selectedItems()
-        if not selected:
-            QMessageBox.warning(self, "Внимание", "Выберите результат в таблице")
-            return None
-        row = selected[0].row()
-        return int(table.item(row, 0).text())
+        return self.get_selected_id('results', "Выберите результат в таблице")
 
     def add_result(self):
         from gui.dialogs.add_result_dialog import AddResultDialog
         exp_id = self.experiment_data['experiment'].id
         dialog = AddResultDialog(exp_id, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('results')
 
     def edit_selected_result(self):
         result_id = self.get_selected_result_id()
@@ -681,7 +571,7 @@ class ExperimentDetailsDialog(QDialog):
             'URL': r_obj.URL
         }, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('results')
 
     def delete_selected_result(self):
         result_id = self.get_selected_result_id()
@@ -697,102 +587,20 @@ class ExperimentDetailsDialog(QDialog):
             from database.crud import delete_result
             if delete_result(result_id):
                 QMessageBox.information(self, "Успех", "Результат удалён")
-                self.reload_experiment_data()
+                self.reload_relations('results')
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить результат")
-                
-    def create_conditions_tab(self):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-
-        conditions = self.experiment_data['conditions']
-        table = QTableWidget(len(conditions), 7)
-        table.setHorizontalHeaderLabels(["ID", "Темп. (°C)", "Давл. (Па)", "Влажн. (%)", "pH", "Освещённость", "Длительность"])
-        table.verticalHeader().setVisible(False)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        table.setObjectName("conditions_table")
-
-        for row, c in enumerate(conditions):
-            if c is None:
-                continue
-            # Обработка времени
-            duration_str = "—"
-            if c.duration:
-                if isinstance(c.duration, str):
-                    if c.duration.startswith("0000-00-00"):
-                        duration_str = "—"
-                    else:
-                        try:
-                            from datetime import datetime
-                            dt = datetime.strptime(c.duration, '%Y-%m-%d %H:%M:%S')
-                            duration_str = dt.strftime('%d.%m.%Y %H:%M')
-                        except ValueError:
-                            duration_str = "—"
-                else:
-                    duration_str = c.duration.strftime('%d.%m.%Y %H:%M')
-
-            table.setItem(row, 0, QTableWidgetItem(str(c.id)))
-            table.setItem(row, 1, QTableWidgetItem(str(c.temperature) if c.temperature is not None else "—"))
-            table.setItem(row, 2, QTableWidgetItem(str(c.pressure) if c.pressure is not None else "—"))
-            table.setItem(row, 3, QTableWidgetItem(str(c.humidity) if c.humidity is not None else "—"))
-            table.setItem(row, 4, QTableWidgetItem(str(c.pH) if c.pH is not None else "—"))
-            table.setItem(row, 5, QTableWidgetItem(c.illumination))
-            table.setItem(row, 6, QTableWidgetItem(duration_str))
-
-        layout.addWidget(table)
-
-        # Кнопки — только для своего эксперимента
-        if self.is_my_experiment():
-            btn_layout = QHBoxLayout()
-            add_btn = QPushButton("➕ Добавить")
-            edit_btn = QPushButton("✏️ Редактировать")
-            delete_btn = QPushButton("🗑️ Удалить")
-
-            for btn in [add_btn, edit_btn, delete_btn]:
-                btn.setFixedHeight(30)
-                btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #000;
-                        color: white;
-                        border: none;
-                        border-radius: 4px;
-                        font-size: 11px;
-                        font-weight: bold;
-                    }
-                    QPushButton:hover {
-                        background-color: #333;
-                    }
-                """)
-
-            add_btn.clicked.connect(self.add_condition)
-            edit_btn.clicked.connect(self.edit_selected_condition)
-            delete_btn.clicked.connect(self.delete_selected_condition)
-
-            btn_layout.addWidget(add_btn)
-            btn_layout.addWidget(edit_btn)
-            btn_layout.addWidget(delete_btn)
-            layout.addLayout(btn_layout)
 
-        return widget
-        
+    # === УСЛОВИЯ ===
     def get_selected_condition_id(self):
-        table = self.findChild(QTableWidget, "conditions_table")
-        if not table:
-            return None
-        selected = table.selectedItems()
-        if not selected:
-            QMessageBox.warning(self, "Внимание", "Выберите условие в таблице")
-            return None
-        row = selected[0].row()
-        return int(table.item(row, 0).text())
+        return self.get_selected_id('conditions', "Выберите условие в таблице")
 
     def add_condition(self):
         from gui.dialogs.add_condition_dialog import AddConditionDialog
         exp_id = self.experiment_data['experiment'].id
         dialog = AddConditionDialog(exp_id, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('conditions')
 
     def edit_selected_condition(self):
         condition_id = self.get_selected_condition_id()
@@ -814,7 +622,7 @@ class ExperimentDetailsDialog(QDialog):
             'duration': c_obj.duration.strftime('%Y-%m-%d %H:%M:%S') if c_obj.duration and not isinstance(c_obj.duration, str) else str(c_obj.duration) if c_obj.duration else ""
         }, self)
         if dialog.exec():
-            self.reload_experiment_data()
+            self.reload_relations('conditions')
 
     def delete_selected_condition(self):
         condition_id = self.get_selected_condition_id()
@@ -830,55 +638,6 @@ class ExperimentDetailsDialog(QDialog):
             from database.crud import delete_condition
             if delete_condition(condition_id):
                 QMessageBox.information(self, "Успех", "Условие удалено")
-                self.reload_experiment_data()
+                self.reload_relations('conditions')
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить условие")
-
-    def create_table_tab(self, items, headers, item_type):
-        widget = QWidget()
-        layout = QVBoxLayout(widget)
-        if not items:
-            label = QLabel("Нет данных")
-            label.setAlignment(Qt.AlignCenter)
-            layout.addWidget(label)
-            return widget
-
-        table = QTableWidget(len(items), len(headers))
-        table.setHorizontalHeaderLabels(headers)
-        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-
-        for row, item in enumerate(items):
-            if item_type == "method":
-                table.setItem(row, 0, QTableWidgetItem(item.name))
-                table.setItem(row, 1, QTableWidgetItem(item.description))
-            elif item_type == "sample":
-                table.setItem(row, 0, QTableWidgetItem(item.name))
-                table.setItem(row, 1, QTableWidgetItem(item.chemical_formula))
-                table.setItem(row, 2, QTableWidgetItem(item.aggregate_state))
-                table.setItem(row, 3, QTableWidgetItem(str(item.mass)))
-            elif item_type == "equipment":
-                table.setItem(row, 0, QTableWidgetItem(item.name))
-                table.setItem(row, 1, QTableWidgetItem(item.description))
-            elif item_type == "measurement":
-                sample_name = item.sample.name if item.sample else ""
-                table.setItem(row, 0, QTableWidgetItem(sample_name))
-                table.setItem(row, 1, QTableWidgetItem(item.method))
-                table.setItem(row, 2, QTableWidgetItem(str(item.value)))
-                table.setItem(row, 3, QTableWidgetItem(item.unit))
-            elif item_type == "condition":
-                temp = str(item.temperature) if item.temperature is not None else ""
-                press = str(item.pressure) if item.pressure is not None else ""
-                hum = str(item.humidity) if item.humidity is not None else ""
-                ph = str(item.pH) if item.pH is not None else ""
-                table.setItem(row, 0, QTableWidgetItem(temp))
-                table.setItem(row, 1, QTableWidgetItem(press))
-                table.setItem(row, 2, QTableWidgetItem(hum))
-                table.setItem(row, 3, QTableWidgetItem(ph))
-            elif item_type == "result":
-                table.setItem(row, 0, QTableWidgetItem(item.type))
-                table.setItem(row, 1, QTableWidgetItem(item.description))
-                table.setItem(row, 2, QTableWidgetItem(item.conclusions))
-
-        layout.addWidget(table)
-        return widget
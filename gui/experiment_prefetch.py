@@ -0,0 +1,79 @@
+# lis_project/gui/experiment_prefetch.py
+"""Предзагрузка карточек экспериментов для списочных страниц.
+
+Пока пользователь ведёт курсором по строкам или выбирает строку, снимок
+эксперимента (database.crud.get_experiment_snapshot) грузится в фоне и
+оседает в LRU experiment_snapshots. Двойной щелчок по такой строке
+открывает карточку без обращения к БД.
+"""
+from PySide6.QtCore import QObject, QTimer
+from gui.data_loader import DataLoader
+
+PREFETCH_DELAY_MS = 150  # курсор задержался на строке — начинаем загрузку
+
+
+class ExperimentPrefetcher(QObject):
+    """table — RowTableView со списком экспериментов (id в первой колонке);
+    on_open(снимок или None) вызывается из open()"""
+
+    def __init__(self, table, on_open, parent=None):
+        super().__init__(parent)
+        self.table = table
+        self.on_open = on_open
+        self.loader = DataLoader(self)
+        self._next_id = None      # строка, на которой задержался курсор/выделение
+        self._loading_id = None   # чей снимок сейчас грузится
+        self._open_id = None      # карточку какого эксперимента открыть по готовности
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(PREFETCH_DELAY_MS)
+        self.timer.timeout.connect(self._prefetch_next)
+
+        table.setMouseTracking(True)
+        table.entered.connect(self.schedule)
+        table.selectionModel().currentRowChanged.connect(lambda current, previous: self.schedule(current))
+
+    def schedule(self, index):
+        if not index.isValid():
+            return
+        self._next_id = self.table.row_at(index).id
+        self.timer.start()
+
+    def _prefetch_next(self):
+        from database.crud import experiment_snapshots
+        if self._open_id is not None:
+            return  # ждём карточку, которую уже открывают
+        if self._next_id is None or self._next_id in experiment_snapshots:
+            return
+        self._load(self._next_id)
+
+    def _load(self, experiment_id):
+        from database.crud import get_experiment_snapshot
+        self._loading_id = experiment_id
+        self.loader.request('snapshot', get_experiment_snapshot, experiment_id, on_done=self._on_loaded)
+
+    def _on_loaded(self, snapshot):
+        loaded_id, self._loading_id = self._loading_id, None
+        if self._open_id is not None and self._open_id == loaded_id:
+            self._open_id = None
+            self.on_open(snapshot)
+
+    def open(self, experiment_id):
+        """Открыть карточку: сразу из LRU, по готовности уже идущей загрузки или после новой"""
+        from database.crud import peek_experiment_snapshot
+        self.timer.stop()
+        snapshot = peek_experiment_snapshot(experiment_id)
+        if snapshot is not None:
+            self._open_id = None
+            self.on_open(snapshot)
+            return
+        self._open_id = experiment_id
+        if self._loading_id != experiment_id or not self.loader.is_busy():
+            self._load(experiment_id)
+
+    def cancel(self):
+        self.timer.stop()
+        self.loader.cancel()
+        self._loading_id = None
+        self._open_id = None
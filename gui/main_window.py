@@ -9,8 +9,20 @@ from gui.pages import (
 )
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    # Страницы создаются при первом переходе на них: атрибут окна -> класс
+    PAGES = {
+        'main_page': MainPage,
+        'experiments_page': ExperimentsPage,
+        'samples_page': SamplesPage,
+        'researchers_page': ResearchersPage,
+        'my_experiments_page': MyExperimentsPage,
+        'my_samples_page': MySamplesPage,
+    }
+
+    def __init__(self, started=None):
         super().__init__()
+        from gui.startup_timing import StartupTiming, FIRST_DATA
+        self.startup_timing = StartupTiming(self, started)
         self.setWindowTitle("Лабораторная информационная система | ЛИС")
         self.setGeometry(100, 100, 1200, 800)
 
@@ -52,24 +64,35 @@ class MainWindow(QMainWindow):
         menu_layout.addWidget(self.btn_reports)
         menu_layout.addStretch()
 
+        # Диагностика запросов — только при включённом профилировании (LIS_DB_PROFILE=1)
+        from database import instrumentation
+        if instrumentation.enabled():
+            self.btn_diagnostics = self._create_menu_button("Диагностика", self.show_diagnostics)
+            menu_layout.addWidget(self.btn_diagnostics)
+
         # === СТЕК СТРАНИЦ ===
         self.stacked_widget = QStackedWidget()
 
-        # Создаём страницы
-        self.main_page = MainPage(self)
-        self.experiments_page = ExperimentsPage(self)
-        self.samples_page = SamplesPage(self)
-        self.researchers_page = ResearchersPage(self)
-        self.my_experiments_page = MyExperimentsPage(self)
-        self.my_samples_page = MySamplesPage(self)
-
-        for page in [self.main_page, self.experiments_page, self.samples_page,
-                     self.researchers_page, self.my_experiments_page, self.my_samples_page]:
-            self.stacked_widget.addWidget(page)
+        # При старте — только главная; остальные страницы и их запросы к БД — по требованию
+        self.show_main()
+        self.main_page.stats_shown.connect(lambda: self.startup_timing.mark(FIRST_DATA))
 
         # Собираем всё вместе
         main_layout.addWidget(self.menu_widget)
         main_layout.addWidget(self.stacked_widget)
+        self.startup_timing.mark("окно создано")
+
+    def _page(self, name):
+        """Страница по имени атрибута; создаётся при первом обращении"""
+        page = getattr(self, name, None)
+        if page is None:
+            page = self.PAGES[name](self)
+            setattr(self, name, page)
+            self.stacked_widget.addWidget(page)
+        return page
+
+    def _show_page(self, name):
+        self.stacked_widget.setCurrentWidget(self._page(name))
 
     def _create_menu_button(self, text, callback):
         btn = QPushButton(text)
@@ -94,24 +117,29 @@ class MainWindow(QMainWindow):
         return btn
 
     def show_main(self):
-        self.stacked_widget.setCurrentIndex(0)
+        self._show_page('main_page')
 
     def show_experiments(self):
-        self.stacked_widget.setCurrentIndex(1)
+        self._show_page('experiments_page')
 
     def show_samples(self):
-        self.stacked_widget.setCurrentIndex(2)
+        self._show_page('samples_page')
 
     def show_researchers(self):
-        self.stacked_widget.setCurrentIndex(3)
+        self._show_page('researchers_page')
 
     def show_my_experiments(self):
-        self.stacked_widget.setCurrentIndex(4)
+        self._show_page('my_experiments_page')
 
     def show_my_samples(self):
-        self.stacked_widget.setCurrentIndex(5)
+        self._show_page('my_samples_page')
 
     def show_reports(self):
         from gui.dialogs.reports_dialog import ReportsDialog
         dialog = ReportsDialog(self)
         dialog.exec()
+
+    def show_diagnostics(self):
+        from gui.dialogs.diagnostics_dialog import DiagnosticsDialog
+        dialog = DiagnosticsDialog(self)
+        dialog.exec()
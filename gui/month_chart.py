@@ -0,0 +1,173 @@
+# lis_project/gui/month_chart.py
+"""График числа экспериментов по месяцам для главной страницы.
+
+Сцена (QChart, серия, оси) создаётся один раз: при обновлении меняются
+только значения столбцов и подписи оси, а если данные не изменились
+(совпал хэш), график не трогается вовсе. Ось — год-месяц без пропусков;
+колесо мыши меняет число видимых месяцев, полоса прокрутки сдвигает окно.
+В серии и на оси — только видимые месяцы: каждое изменение оси пересчитывает
+раскладку всех её подписей, и с полным диапазоном обновление шло в разы дольше.
+"""
+import datetime
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QPainter, QColor
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QScrollBar
+from PySide6.QtCharts import QChart, QChartView, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
+
+MONTH_NAMES = ("Янв", "Фев", "Март", "Апр", "Май", "Июнь",
+               "Июль", "Авг", "Сен", "Окт", "Нояб", "Дек")
+DEFAULT_WINDOW = 12   # видимых месяцев по умолчанию
+MIN_WINDOW = 3
+VERTICAL_LABELS_FROM = 24  # с этого числа месяцев подписи оси поворачиваются
+
+
+def month_key(date):
+    return f"{date.year:04d}-{date.month:02d}"
+
+def month_range(first, last):
+    """Ключи 'ГГГГ-ММ' от first до last включительно"""
+    year, month = int(first[:4]), int(first[5:7])
+    while True:
+        key = f"{year:04d}-{month:02d}"
+        if key > last:
+            return
+        yield key
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+def month_label(key):
+    return f"{MONTH_NAMES[int(key[5:7]) - 1]} {key[:4]}"
+
+
+class _ZoomableChartView(QChartView):
+    """QChartView, отдающий прокрутку колеса обработчику on_wheel(шаги, доля ширины под курсором)"""
+
+    def __init__(self, on_wheel, parent=None):
+        super().__init__(parent)
+        self.on_wheel = on_wheel
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return super().wheelEvent(event)
+        area = self.chart().plotArea()
+        x = self.mapToScene(event.position().toPoint()).x()
+        fraction = (x - area.left()) / area.width() if area.width() else 0.5
+        self.on_wheel(steps, min(max(fraction, 0.0), 1.0))
+        event.accept()
+
+
+class MonthlyChart(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._months = []     # ключи 'ГГГГ-ММ' категорий оси
+        self._values = []
+        self._digest = None   # хэш показанных данных
+        self._window = DEFAULT_WINDOW
+        self._first = 0       # первый видимый месяц
+
+        self.bar_set = QBarSet("Эксперименты")
+        self.bar_set.setColor(QColor("#000000"))
+        self.series = QBarSeries()
+        self.series.append(self.bar_set)
+
+        self.chart = QChart()
+        self.chart.addSeries(self.series)
+        self.axis_x = QBarCategoryAxis()
+        self.chart.addAxis(self.axis_x, Qt.AlignBottom)
+        self.series.attachAxis(self.axis_x)
+        self.axis_y = QValueAxis()
+        self.axis_y.setLabelFormat("%d")
+        self.chart.addAxis(self.axis_y, Qt.AlignLeft)
+        self.series.attachAxis(self.axis_y)
+        self.chart.legend().setVisible(False)
+        self.chart.setBackgroundBrush(Qt.white)
+
+        # График попадает в сцену с первыми данными: до этого раскладка считается
+        # один раз на всё, а не после каждого изменения оси
+        self.view = _ZoomableChartView(self.zoom)
+        self.view.setRenderHint(QPainter.Antialiasing)
+        self.view.setFixedHeight(300)
+        self.view.setStyleSheet("border: 1px solid #cccccc; border-radius: 8px;")
+
+        self.scroll_bar = QScrollBar(Qt.Horizontal)
+        self.scroll_bar.valueChanged.connect(self.scroll_to)
+        self.scroll_bar.hide()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.view)
+        layout.addWidget(self.scroll_bar)
+
+    def set_counts(self, monthly):
+        """monthly — {'ГГГГ-ММ': количество}. Возвращает False, если данные не изменились"""
+        items = tuple(sorted((key, count) for key, count in (monthly or {}).items() if count))
+        digest = hash(items)
+        if digest == self._digest:
+            return False
+        self._digest = digest
+
+        counts = dict(items)
+        if items:
+            months = list(month_range(items[0][0], items[-1][0]))
+        else:
+            months = [month_key(datetime.date.today())]
+        if months != self._months:
+            # Смотрели на последние месяцы — остаёмся у правого края
+            if self._first + self._window >= len(self._months):
+                self._first = len(months)
+            self._months = months
+        self._values = [counts.get(key, 0) for key in months]
+        self._apply_window()
+        if self.view.chart() is not self.chart:
+            self.view.setChart(self.chart)
+        return True
+
+    def zoom(self, steps, fraction=1.0):
+        """steps > 0 — приблизить (меньше месяцев), < 0 — отдалить; fraction — точка привязки"""
+        total = len(self._months)
+        if not total:
+            return  # данных ещё нет
+        window = min(self._window, total)
+        anchor = self._first + fraction * window
+        factor = 0.75 ** steps
+        self._window = int(min(max(round(window * factor), MIN_WINDOW), max(total, MIN_WINDOW)))
+        self._first = round(anchor - fraction * self._window)
+        self._apply_window()
+
+    def scroll_to(self, first):
+        if first != self._first:
+            self._first = first
+            self._apply_window()
+
+    def _apply_window(self):
+        total = len(self._months)
+        window = min(self._window, total)
+        self._first = min(max(self._first, 0), total - window)
+        end = self._first + window
+        # Ось и столбцы меняются только там, где отличаются от показанных
+        labels = [month_label(key) for key in self._months[self._first:end]]
+        if labels != self.axis_x.categories():
+            self.axis_x.setCategories(labels)
+        values = self._values[self._first:end]
+        present = self.bar_set.count()
+        for i, value in enumerate(values[:present]):
+            if self.bar_set.at(i) != value:
+                self.bar_set.replace(i, value)
+        if present < len(values):
+            self.bar_set.append(values[present:])
+        elif present > len(values):
+            self.bar_set.remove(len(values), present - len(values))
+        angle = -90 if window >= VERTICAL_LABELS_FROM else 0
+        if self.axis_x.labelsAngle() != angle:
+            self.axis_x.setLabelsAngle(angle)
+        top = max(values, default=0)
+        top = top + 1 if top > 0 else 1
+        if self.axis_y.min() != 0 or self.axis_y.max() != top:
+            self.axis_y.setRange(0, top)
+
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setRange(0, total - window)
+        self.scroll_bar.setPageStep(window)
+        self.scroll_bar.setValue(self._first)
+        self.scroll_bar.blockSignals(False)
+        self.scroll_bar.setVisible(total > window)
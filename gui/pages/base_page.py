@@ -0,0 +1,144 @@
+# lis_project/gui/pages/base_page.py
+"""Общая основа страниц главного окна: фоновая загрузка и списки с поиском"""
+from PySide6.QtWidgets import QWidget, QLabel, QLineEdit
+from PySide6.QtCore import QTimer
+from gui.data_loader import DataLoader
+
+
+class BasePage(QWidget):
+    """Страница, данные которой запрашиваются в фоне (self.loader) при каждом показе.
+
+    Подкласс реализует load_data() и кладёт self.loading_label в свою верхнюю панель.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Индикатор фоновой загрузки
+        self.loading_label = QLabel("Загрузка...")
+        self.loading_label.setStyleSheet("color: #888888; margin: 10px;")
+        self.loading_label.hide()
+        self.loader = DataLoader(self)
+        self.loader.busy_changed.connect(self.loading_label.setVisible)
+
+    def load_data(self):
+        raise NotImplementedError
+
+    def showEvent(self, event):
+        # Страница создаётся при первом показе: здесь и первая загрузка, и обновления
+        self.load_data()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # Ушли со страницы — ответы на её запросы больше не нужны
+        self.loader.cancel()
+        super().hideEvent(event)
+
+
+class ListPage(BasePage):
+    """Таблица строк с поиском, обновляемая по журналу изменений.
+
+    Подкласс создаёт self.table_model, self.table и строку поиска (create_search_bar)
+    и задаёт запросы read_list, read_delta и search — они выполняются в фоновом
+    потоке. researcher_id в них — текущий исследователь для страниц personal
+    ("Мои ..."), для остальных None.
+    """
+    personal = False
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.watermark = None  # отметка журнала изменений, на которой загружены строки таблицы
+        self.researcher_id = None
+        # Запрос к БД уходит только после паузы в наборе
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.apply_search)
+
+    def create_search_bar(self, placeholder):
+        self.search_bar = QLineEdit()
+        self.search_bar.setPlaceholderText(placeholder)
+        self.search_bar.setFixedWidth(250)
+        self.search_bar.textChanged.connect(self.filter_table)
+        return self.search_bar
+
+    @staticmethod
+    def read_list(researcher_id):
+        """Полный список: результат crud.read_with_watermark"""
+        raise NotImplementedError
+
+    @staticmethod
+    def read_delta(researcher_id, watermark):
+        """Изменения списка после отметки: результат crud.get_*_delta"""
+        raise NotImplementedError
+
+    @staticmethod
+    def search(text, researcher_id):
+        """Все совпадения: результат database.search.search_*"""
+        raise NotImplementedError
+
+    def load_data(self):
+        # Первый раз — весь список, дальше — только изменения после отметки
+        if self.watermark is None:
+            self.loader.request('list', self.fetch_rows, on_done=self.on_data_loaded)
+        else:
+            self.loader.request('list', self.fetch_delta, self.researcher_id, self.watermark,
+                                on_done=self.on_delta_loaded)
+
+    @classmethod
+    def fetch_rows(cls):
+        """Выполняется в фоновом потоке"""
+        from database.crud import get_current_researcher_id, get_change_watermark
+        researcher_id = None
+        if cls.personal:
+            researcher_id = get_current_researcher_id()
+            if not researcher_id:
+                return researcher_id, get_change_watermark(), []
+        # Отметка и строки — из одного снимка БД; правки после него придут дельтой
+        watermark, rows = cls.read_list(researcher_id) or (None, None)
+        return researcher_id, watermark, rows or []
+
+    @classmethod
+    def fetch_delta(cls, researcher_id, watermark):
+        """Выполняется в фоновом потоке"""
+        if cls.personal:
+            from database.crud import get_current_researcher_id
+            if get_current_researcher_id() != researcher_id:
+                return {'full': True}  # сменился пользователь — список другой
+        return cls.read_delta(researcher_id, watermark)
+
+    def on_data_loaded(self, result):
+        self.researcher_id, self.watermark, rows = result
+        self.table_model.set_rows(rows)
+        self.apply_search()
+
+    def on_delta_loaded(self, delta):
+        if delta is None:
+            return
+        if delta['full']:
+            self.watermark = None
+            self.load_data()
+            return
+        self.watermark = delta['watermark']
+        if not delta['rows'] and not delta['deleted']:
+            return  # ничего не изменилось — таблица остаётся как есть
+        self.table_model.apply_delta(delta)
+        if self.search_bar.text().strip():
+            self.apply_search()  # состав результатов поиска мог измениться
+
+    def filter_table(self, text):
+        self.search_timer.start()
+
+    def apply_search(self):
+        text = self.search_bar.text().strip()
+        if not text:
+            self.loader.cancel('search')
+            self.table.filter_ids(None)
+            return
+        self.loader.request('search', self.search, text, self.researcher_id, on_done=self.show_search_results)
+
+    def show_search_results(self, found):
+        self.table.filter_ids((found or {'ids': []})['ids'])
+
+    def hideEvent(self, event):
+        self.search_timer.stop()
+        super().hideEvent(event)
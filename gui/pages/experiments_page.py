@@ -1,13 +1,24 @@
 # lis_project/gui/pages/experiments_page.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
     QFrame, QMessageBox
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
+from gui.pages.base_page import ListPage
+from gui.experiment_prefetch import ExperimentPrefetcher
+from gui.table_model import RowTableModel, RowTableView, text_column, number_column, date_column
 
-class ExperimentsPage(QWidget):
+EXPERIMENT_COLUMNS = (
+    number_column("ID", 'id'),
+    text_column("Название", 'name'),
+    text_column("Цель", 'purpose'),
+    text_column("Статус", 'status'),
+    date_column("Дата", 'date_of_event', empty='Не указана'),
+    text_column("Исследователь", 'researcher'),
+)
+
+class ExperimentsPage(ListPage):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #ffffff;")
@@ -18,13 +29,10 @@ class ExperimentsPage(QWidget):
         title.setFont(QFont("Arial", 18, QFont.Bold))
         title.setStyleSheet("color: #000000; margin: 10px;")
         top_layout.addWidget(title)
+        top_layout.addWidget(self.loading_label)
         top_layout.addStretch()
 
-        search_bar = QLineEdit()
-        search_bar.setPlaceholderText("Поиск по названию...")
-        search_bar.setFixedWidth(250)
-        search_bar.textChanged.connect(self.filter_table)
-        top_layout.addWidget(search_bar)
+        top_layout.addWidget(self.create_search_bar("Поиск по названию, цели, описанию..."))
 
         add_btn = QPushButton("Добавить эксперимент")
         add_btn.setFixedSize(180, 35)
@@ -49,43 +57,35 @@ class ExperimentsPage(QWidget):
         line.setStyleSheet("background-color: #cccccc;")
         layout.addWidget(line)
 
-        self.table = QTableWidget(0, 6)
-        self.table.setHorizontalHeaderLabels(["ID", "Название", "Цель", "Статус", "Дата", "Исследователь"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table_model = RowTableModel(EXPERIMENT_COLUMNS, self)
+        self.table = RowTableView(self.table_model)
         self.table.doubleClicked.connect(self.open_details)
         layout.addWidget(self.table)
+        # Карточка строки под курсором/выделением грузится заранее
+        self.prefetcher = ExperimentPrefetcher(self.table, self.show_details, self)
 
-        self.search_bar = search_bar
         self.setLayout(layout)
-        self.load_data()
-
-    def load_data(self):
-        from database.crud import get_all_experiments_with_researchers
-        data = get_all_experiments_with_researchers() or []
-        self.table.setRowCount(len(data))
-        for row, exp in enumerate(data):
-            self.table.setItem(row, 0, QTableWidgetItem(str(exp['id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(exp['name']))
-            self.table.setItem(row, 2, QTableWidgetItem(exp['purpose']))
-            self.table.setItem(row, 3, QTableWidgetItem(exp['status']))
-            self.table.setItem(row, 4, QTableWidgetItem(exp['date']))
-            self.table.setItem(row, 5, QTableWidgetItem(exp['researcher']))
-
-    def filter_table(self, text):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 1)
-            if item:
-                self.table.setRowHidden(row, text.lower() not in item.text().lower())
+
+    @staticmethod
+    def read_list(researcher_id):
+        from database.crud import get_all_experiments_with_researchers, read_with_watermark
+        return read_with_watermark(get_all_experiments_with_researchers, list_only=True)
+
+    @staticmethod
+    def read_delta(researcher_id, watermark):
+        from database.crud import get_experiments_delta
+        return get_experiments_delta(watermark, list_only=True)
+
+    @staticmethod
+    def search(text, researcher_id):
+        from database.search import search_experiments
+        return search_experiments(text, page_size=None)
 
     def open_details(self, index):
-        row = index.row()
-        exp_id = int(self.table.item(row, 0).text())
-        from database.crud import get_experiment_with_relations
-        exp_data = get_experiment_with_relations(exp_id)
-        if exp_data:  # ← ВАЖНО: двоеточие есть!
+        self.prefetcher.open(self.table.row_at(index).id)
+
+    def show_details(self, exp_data):
+        if exp_data:
             from gui.dialogs.experiment_details_dialog import ExperimentDetailsDialog
             dialog = ExperimentDetailsDialog(exp_data, self)
             if dialog.exec():
@@ -99,6 +99,6 @@ class ExperimentsPage(QWidget):
         if dialog.exec():
             self.load_data()
 
-    def showEvent(self, event):
-        self.load_data()
-        super().showEvent(event)
+    def hideEvent(self, event):
+        self.prefetcher.cancel()
+        super().hideEvent(event)
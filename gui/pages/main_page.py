@@ -4,12 +4,14 @@ from PySide6.QtWidgets import (
     QScrollArea, QTableWidget, QTableWidgetItem, QHeaderView,
     QFrame, QMainWindow
 )
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtGui import QFont
-from datetime import datetime, timedelta
+from gui.pages.base_page import BasePage
 import traceback
 
-class MainPage(QWidget):
+class MainPage(BasePage):
+    stats_shown = Signal()  # данные загружены и показаны (для отчёта о старте)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #ffffff;")
@@ -21,6 +23,7 @@ class MainPage(QWidget):
         title.setFont(QFont("Arial", 18, QFont.Bold))
         title.setStyleSheet("color: #000000; margin: 10px;")
         top_layout.addWidget(title)
+        top_layout.addWidget(self.loading_label)
         top_layout.addStretch()
 
         # Кнопка "Мой профиль"
@@ -91,9 +94,6 @@ class MainPage(QWidget):
         self.profile_btn = profile_btn
         self.setLayout(layout)
 
-        # Загрузка данных с небольшой задержкой (чтобы GUI успел отобразиться)
-        QTimer.singleShot(100, self.load_data)
-
     def show_profile(self):
         from database.crud import get_researcher_by_id
         from gui.dialogs.researcher_profile_view_dialog import ResearcherProfileViewDialog
@@ -119,96 +119,41 @@ class MainPage(QWidget):
             QMessageBox.warning(self, "Ошибка", "Профиль не найден")
 
     def load_data(self):
-        try:
-            from database.crud import get_all_experiments_with_researchers, get_all_researchers
-            experiments = get_all_experiments_with_researchers() or []
-            researchers = get_all_researchers() or []
+        from database.crud import get_dashboard_stats
+        self.loader.request('stats', get_dashboard_stats, on_done=self.show_stats)
 
-            total_experiments = len(experiments)
-            total_researchers = len(researchers)
-            recent = sum(1 for e in experiments if e.get('date') and 
-                        datetime.strptime(e['date'], '%d.%m.%Y') > datetime.now() - timedelta(days=30))
+    def show_stats(self, stats):
+        try:
+            stats = stats or {}
 
             self.stats_table.setRowCount(3)
             for i, (name, val) in enumerate([
-                ("Эксперименты", str(total_experiments)),
-                ("Исследователи", str(total_researchers)),
-                ("Новые за месяц", str(recent))
+                ("Эксперименты", str(stats.get('experiments', 0))),
+                ("Исследователи", str(stats.get('researchers', 0))),
+                ("Новые за месяц", str(stats.get('last_30_days', 0)))
             ]):
                 self.stats_table.setItem(i, 0, QTableWidgetItem(name))
                 self.stats_table.setItem(i, 1, QTableWidgetItem(val))
 
-            # Последние 5 экспериментов
-            sorted_exp = sorted(
-                [e for e in experiments if e['date'] != 'Не указана'],
-                key=lambda x: datetime.strptime(x['date'], '%d.%m.%Y'),
-                reverse=True
-            )[:5]
-            self.experiments_table.setRowCount(len(sorted_exp))
-            for row, exp in enumerate(sorted_exp):
+            # Последние 5 экспериментов — уже отсортированы и ограничены в SQL
+            recent = stats.get('recent', [])
+            self.experiments_table.setRowCount(len(recent))
+            for row, exp in enumerate(recent):
                 self.experiments_table.setItem(row, 0, QTableWidgetItem(exp['name']))
                 self.experiments_table.setItem(row, 1, QTableWidgetItem(exp['status']))
                 self.experiments_table.setItem(row, 2, QTableWidgetItem(exp['date']))
 
-            self.update_chart()
+            self.update_chart(stats.get('monthly'))
 
         except Exception as e:
             print("❌ Ошибка загрузки данных:", e)
             traceback.print_exc()
+        self.stats_shown.emit()
 
-    def update_chart(self):
+    def update_chart(self, monthly=None):
         try:
-            from database.crud import get_all_experiments_with_researchers
-            from PySide6.QtCharts import QChart, QChartView, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
-            from PySide6.QtGui import QPainter, QColor
-
-            experiments = get_all_experiments_with_researchers() or []
-            monthly = {i: 0 for i in range(1, 13)}
-            for e in experiments:
-                if e['date'] != "Не указана":
-                    try:
-                        d = datetime.strptime(e['date'], "%d.%m.%Y")
-                        monthly[d.month] += 1
-                    except:
-                        pass
-
-            months = ["Янв", "Фев", "Март", "Апр", "Май", "Июнь",
-                      "Июль", "Авг", "Сен", "Окт", "Нояб", "Дек"]
-            values = [monthly[i] for i in range(1, 13)]
-
-            chart = QChart()
-            series = QBarSeries()
-            bar_set = QBarSet("Эксперименты")
-            for v in values:
-                bar_set.append(v)
-            bar_set.setColor(QColor("#000000"))
-            series.append(bar_set)
-            chart.addSeries(series)
-
-            axis_x = QBarCategoryAxis()
-            axis_x.append(months)
-            chart.addAxis(axis_x, Qt.AlignBottom)
-            series.attachAxis(axis_x)
-
-            axis_y = QValueAxis()
-            axis_y.setRange(0, max(values) + 1 if max(values) > 0 else 1)
-            chart.addAxis(axis_y, Qt.AlignLeft)
-            series.attachAxis(axis_y)
-
-            chart.legend().setVisible(False)
-            chart.setBackgroundBrush(Qt.white)
-
-            while self.chart_widget.layout().count():
-                child = self.chart_widget.layout().takeAt(0)
-                if child.widget():
-                    child.widget().deleteLater()
-
-            chart_view = QChartView(chart)
-            chart_view.setRenderHint(QPainter.Antialiasing)
-            chart_view.setFixedHeight(300)
-            chart_view.setStyleSheet("border: 1px solid #cccccc; border-radius: 8px;")
-            self.chart_widget.layout().addWidget(chart_view)
-
+            # График постоянный: меняются только значения столбцов
+            self.chart_widget.set_counts(monthly)
         except Exception as e:
             print("❌ Ошибка обновления графика:", e)
             traceback.print_exc()
@@ -270,8 +215,5 @@ class MainPage(QWidget):
         return table
 
     def create_chart(self):
-        from PySide6.QtWidgets import QWidget, QHBoxLayout
-        chart_container = QWidget()
-        chart_layout = QHBoxLayout(chart_container)
-        chart_layout.setContentsMargins(0, 0, 0, 0)
-        return chart_container
+        from gui.month_chart import MonthlyChart
+        return MonthlyChart()
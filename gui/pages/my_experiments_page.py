@@ -1,13 +1,28 @@
 # lis_project/gui/pages/my_experiments_page.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
-    QFrame, QMessageBox
+    QFrame, QMessageBox, QAbstractItemView
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
+from gui.pages.base_page import ListPage
+from gui.experiment_prefetch import ExperimentPrefetcher
+from gui.table_model import (RowTableModel, RowTableView, text_column, number_column, date_column,
+                             mapped_column)
+
+STATUS_LABELS = {'planned': 'Планирование', 'in_progress': 'В работе', 'completed': 'Завершен'}
+
+MY_EXPERIMENT_COLUMNS = (
+    number_column("ID", 'id'),
+    text_column("Название", 'name'),
+    text_column("Цель", 'purpose'),
+    mapped_column("Статус", 'status', STATUS_LABELS),
+    date_column("Дата", 'date_of_event'),
+)
+
+class MyExperimentsPage(ListPage):
+    personal = True
 
-class MyExperimentsPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #ffffff;")
@@ -19,13 +34,10 @@ class MyExperimentsPage(QWidget):
         title.setFont(QFont("Arial", 18, QFont.Bold))
         title.setStyleSheet("color: #000000; margin: 10px;")
         top_layout.addWidget(title)
+        top_layout.addWidget(self.loading_label)
         top_layout.addStretch()
 
-        search_bar = QLineEdit()
-        search_bar.setPlaceholderText("Поиск по названию...")
-        search_bar.setFixedWidth(250)
-        search_bar.textChanged.connect(self.filter_table)
-        top_layout.addWidget(search_bar)
+        top_layout.addWidget(self.create_search_bar("Поиск по названию, цели, описанию..."))
 
         # Кнопки действий
         add_btn = QPushButton("➕ Добавить")
@@ -66,46 +78,37 @@ class MyExperimentsPage(QWidget):
         layout.addWidget(line)
 
         # === Таблица ===
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "Название", "Цель", "Статус", "Дата"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table_model = RowTableModel(MY_EXPERIMENT_COLUMNS, self)
+        self.table = RowTableView(self.table_model)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         self.table.doubleClicked.connect(self.open_details) 
         layout.addWidget(self.table)
+        # Карточка строки под курсором/выделением грузится заранее
+        self.prefetcher = ExperimentPrefetcher(self.table, self.show_details, self)
 
-        self.search_bar = search_bar
         self.setLayout(layout)
 
-    def load_data(self):
-        from database.crud import get_my_experiments, get_current_researcher_id
-        researcher_id = get_current_researcher_id()
-        data = get_my_experiments(researcher_id) if researcher_id else []
-        self.table.setRowCount(len(data))
-        status_map = {'planned': 'Планирование', 'in_progress': 'В работе', 'completed': 'Завершен'}
-        for row, exp in enumerate(data):
-            self.table.setItem(row, 0, QTableWidgetItem(str(exp['id'])))
-            self.table.setItem(row, 1, QTableWidgetItem(exp['name']))
-            self.table.setItem(row, 2, QTableWidgetItem(exp['purpose']))
-            status_text = status_map.get(exp['status'], exp['status'])
-            self.table.setItem(row, 3, QTableWidgetItem(status_text))
-            self.table.setItem(row, 4, QTableWidgetItem(exp['date']))  # уже строка
-
-    def filter_table(self, text):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 1)
-            if item:
-                self.table.setRowHidden(row, text.lower() not in item.text().lower())
+    @staticmethod
+    def read_list(researcher_id):
+        from database.crud import get_my_experiments, read_with_watermark
+        return read_with_watermark(get_my_experiments, researcher_id, list_only=True)
+
+    @staticmethod
+    def read_delta(researcher_id, watermark):
+        from database.crud import get_my_experiments_delta
+        return get_my_experiments_delta(researcher_id, watermark, list_only=True)
+
+    @staticmethod
+    def search(text, researcher_id):
+        from database.search import search_experiments
+        return search_experiments(text, researcher_id=researcher_id, page_size=None)
 
     def get_selected_experiment_id(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        selected = self.table.selected_row()
+        if selected is None:
             QMessageBox.warning(self, "Внимание", "Выберите эксперимент в таблице")
             return None
-        row = selected[0].row()
-        return int(self.table.item(row, 0).text())
+        return selected.id
 
     def open_create_dialog(self):
         from gui.dialogs.create_experiment_dialog import CreateExperimentDialog
@@ -145,7 +148,7 @@ class MyExperimentsPage(QWidget):
         if exp_id is None:
             return
 
-        exp_name = self.table.item(self.table.currentRow(), 1).text()
+        exp_name = self.table.selected_row().name
         reply = QMessageBox.question(
             self, "Подтверждение",
             f"Вы уверены, что хотите удалить эксперимент «{exp_name}»?\nЭто действие нельзя отменить.",
@@ -161,10 +164,9 @@ class MyExperimentsPage(QWidget):
                 QMessageBox.critical(self, "Ошибка", "Не удалось удалить эксперимент")
                 
     def open_details(self, index):
-        row = index.row()
-        exp_id = int(self.table.item(row, 0).text())
-        from database.crud import get_experiment_with_relations
-        exp_data = get_experiment_with_relations(exp_id)
+        self.prefetcher.open(self.table.row_at(index).id)
+
+    def show_details(self, exp_data):
         if exp_data:
             from gui.dialogs.experiment_details_dialog import ExperimentDetailsDialog
             dialog = ExperimentDetailsDialog(exp_data, self)
@@ -175,6 +177,6 @@ class MyExperimentsPage(QWidget):
         if parent and hasattr(parent, 'show_main'):
             parent.show_main()
 
-    def showEvent(self, event):
-        self.load_data()
-        super().showEvent(event)
+    def hideEvent(self, event):
+        self.prefetcher.cancel()
+        super().hideEvent(event)
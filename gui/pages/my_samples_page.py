@@ -1,13 +1,24 @@
 # lis_project/gui/pages/my_samples_page.py
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
-    QFrame, QMessageBox
+    QFrame, QMessageBox, QAbstractItemView
 )
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
+from gui.pages.base_page import ListPage
+from gui.table_model import RowTableModel, RowTableView, text_column, number_column
+
+MY_SAMPLE_COLUMNS = (
+    number_column("ID", 'id'),
+    text_column("Название", 'name'),
+    number_column("Масса", 'mass', blank_zero=True),
+    number_column("Объём", 'volume', blank_zero=True),
+    text_column("Хим. формула", 'chemical_formula'),
+)
+
+class MySamplesPage(ListPage):
+    personal = True
 
-class MySamplesPage(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #ffffff;")
@@ -18,13 +29,10 @@ class MySamplesPage(QWidget):
         title.setFont(QFont("Arial", 18, QFont.Bold))
         title.setStyleSheet("color: #000000; margin: 10px;")
         top_layout.addWidget(title)
+        top_layout.addWidget(self.loading_label)
         top_layout.addStretch()
 
-        search_bar = QLineEdit()
-        search_bar.setPlaceholderText("Поиск по названию...")
-        search_bar.setFixedWidth(250)
-        search_bar.textChanged.connect(self.filter_table)
-        top_layout.addWidget(search_bar)
+        top_layout.addWidget(self.create_search_bar("Поиск по названию, формуле, описанию..."))
 
         # Кнопки действий
         add_btn = QPushButton("➕ Добавить")
@@ -64,52 +72,42 @@ class MySamplesPage(QWidget):
         layout.addWidget(line)
 
         # СОЗДАЁМ ТАБЛИЦУ
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "Название", "Масса", "Объём", "Хим. формула"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table_model = RowTableModel(MY_SAMPLE_COLUMNS, self)
+        self.table = RowTableView(self.table_model)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
 
         # ПОДКЛЮЧАЕМ СИГНАЛ ПОСЛЕ СОЗДАНИЯ
         self.table.doubleClicked.connect(self.open_view)  # ← Теперь безопасно!
 
         layout.addWidget(self.table)
 
-        self.search_bar = search_bar
         self.setLayout(layout)
 
-    def load_data(self):
-        from database.crud import get_my_samples, get_current_researcher_id
-        researcher_id = get_current_researcher_id()
-        samples = get_my_samples(researcher_id) if researcher_id else []
-        self.table.setRowCount(len(samples))
-        for row, s in enumerate(samples):
-            self.table.setItem(row, 0, QTableWidgetItem(str(s.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(s.name))
-            self.table.setItem(row, 2, QTableWidgetItem(str(s.mass) if s.mass else ""))
-            self.table.setItem(row, 3, QTableWidgetItem(str(s.volume) if s.volume else ""))
-            self.table.setItem(row, 4, QTableWidgetItem(s.chemical_formula))
-
-    def filter_table(self, text):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 1)
-            if item:
-                self.table.setRowHidden(row, text.lower() not in item.text().lower())
+    @staticmethod
+    def read_list(researcher_id):
+        from database.crud import get_my_samples, read_with_watermark
+        return read_with_watermark(get_my_samples, researcher_id)
+
+    @staticmethod
+    def read_delta(researcher_id, watermark):
+        from database.crud import get_my_samples_delta
+        return get_my_samples_delta(researcher_id, watermark)
+
+    @staticmethod
+    def search(text, researcher_id):
+        from database.search import search_samples
+        return search_samples(text, researcher_id=researcher_id, page_size=None)
 
     def get_selected_sample_id(self):
-        selected = self.table.selectedItems()
-        if not selected:
+        selected = self.table.selected_row()
+        if selected is None:
             QMessageBox.warning(self, "Внимание", "Выберите образец в таблице")
             return None
-        row = selected[0].row()
-        return int(self.table.item(row, 0).text())
+        return selected.id
 
     def open_view(self, index):
         """Открывает окно ПРОСМОТРА при двойном клике"""
-        row = index.row()
-        sample_id = int(self.table.item(row, 0).text())
+        sample_id = self.table.row_at(index).id
         from database.crud import get_sample_by_id
         sample_obj = get_sample_by_id(sample_id)
         if not sample_obj:
@@ -168,7 +166,7 @@ class MySamplesPage(QWidget):
         if sample_id is None:
             return
 
-        sample_name = self.table.item(self.table.currentRow(), 1).text()
+        sample_name = self.table.selected_row().name
         reply = QMessageBox.question(
             self, "Подтверждение",
             f"Вы уверены, что хотите удалить образец «{sample_name}»?\nЭто действие нельзя отменить.",
@@ -187,7 +185,3 @@ class MySamplesPage(QWidget):
         parent = self.parent()
         if parent and hasattr(parent, 'show_main'):
             parent.show_main()
-
-    def showEvent(self, event):
-        self.load_data()
-        super().showEvent(event)
@@ -1,12 +1,20 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                               QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
                                QFrame, QMessageBox)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
+from gui.pages.base_page import ListPage
+from gui.table_model import RowTableModel, RowTableView, text_column, number_column
 from gui.dialogs.researcher_profile_dialog import ResearcherProfileDialog
 from database.crud import get_all_researchers, delete_researcher
 
-class ResearchersPage(QWidget):
+RESEARCHER_COLUMNS = (
+    number_column("ID", 'id'),
+    text_column("Фамилия", 'surname'),
+    text_column("Имя", 'name'),
+    text_column("Организация", 'organization'),
+)
+
+class ResearchersPage(ListPage):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #ffffff;")
@@ -17,13 +25,10 @@ class ResearchersPage(QWidget):
         title.setFont(QFont("Arial", 18, QFont.Bold))
         title.setStyleSheet("color: #000000; margin: 10px;")
         top_layout.addWidget(title)
+        top_layout.addWidget(self.loading_label)
         top_layout.addStretch()
 
-        search_bar = QLineEdit()
-        search_bar.setPlaceholderText("Поиск по фамилии...")
-        search_bar.setFixedWidth(250)
-        search_bar.textChanged.connect(self.filter_table)
-        top_layout.addWidget(search_bar)
+        top_layout.addWidget(self.create_search_bar("Поиск по фамилии, организации..."))
 
         layout.addLayout(top_layout)
 
@@ -33,37 +38,30 @@ class ResearchersPage(QWidget):
         line.setStyleSheet("background-color: #cccccc;")
         layout.addWidget(line)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["ID", "Фамилия", "Имя", "Организация"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table_model = RowTableModel(RESEARCHER_COLUMNS, self)
+        self.table = RowTableView(self.table_model)
         self.table.doubleClicked.connect(self.open_profile)
         layout.addWidget(self.table)
 
-        self.search_bar = search_bar
         self.setLayout(layout)
-        self.load_data()
 
-    def load_data(self):
-        from database.crud import get_all_researchers
-        researchers = get_all_researchers()
-        self.table.setRowCount(len(researchers))
-        for row, r in enumerate(researchers):
-            self.table.setItem(row, 0, QTableWidgetItem(str(r.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(r.surname))
-            self.table.setItem(row, 2, QTableWidgetItem(r.name))
-            self.table.setItem(row, 3, QTableWidgetItem(r.organization))
+    @staticmethod
+    def read_list(researcher_id):
+        from database.crud import get_all_researchers, read_with_watermark
+        return read_with_watermark(get_all_researchers)
+
+    @staticmethod
+    def read_delta(researcher_id, watermark):
+        from database.crud import get_researchers_delta
+        return get_researchers_delta(watermark)
 
-    def filter_table(self, text):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 1)
-            self.table.setRowHidden(row, text.lower() not in item.text().lower())
+    @staticmethod
+    def search(text, researcher_id):
+        from database.search import search_researchers
+        return search_researchers(text, page_size=None)
 
     def open_profile(self, index):
-        row = index.row()
-        researcher_id = int(self.table.item(row, 0).text())
+        researcher_id = self.table.row_at(index).id
         
         from database.crud import get_researcher_by_id
         researcher_obj = get_researcher_by_id(researcher_id)
@@ -89,7 +87,3 @@ class ResearchersPage(QWidget):
         from gui.dialogs.researcher_profile_view_dialog import ResearcherProfileViewDialog
         dialog = ResearcherProfileViewDialog(researcher_data, self)
         dialog.exec()
-
-    def showEvent(self, event):
-        self.load_data()
-        super().showEvent(event)
@@ -1,13 +1,22 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                               QTableWidget, QTableWidgetItem, QHeaderView, QLineEdit,
                                QFrame, QMessageBox)
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QFont
+from gui.pages.base_page import ListPage
+from gui.table_model import RowTableModel, RowTableView, text_column, number_column
 from gui.dialogs.sample_view_dialog import SampleViewDialog
 from gui.dialogs.create_sample_dialog import CreateSampleDialog
 from database.crud import get_all_samples, delete_sample
 
-class SamplesPage(QWidget):
+SAMPLE_COLUMNS = (
+    number_column("ID", 'id'),
+    text_column("Название", 'name'),
+    number_column("Масса", 'mass', blank_zero=True),
+    number_column("Объём", 'volume', blank_zero=True),
+    text_column("Хим. формула", 'chemical_formula'),
+)
+
+class SamplesPage(ListPage):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setStyleSheet("background-color: #ffffff;")
@@ -18,13 +27,10 @@ class SamplesPage(QWidget):
         title.setFont(QFont("Arial", 18, QFont.Bold))
         title.setStyleSheet("color: #000000; margin: 10px;")
         top_layout.addWidget(title)
+        top_layout.addWidget(self.loading_label)
         top_layout.addStretch()
 
-        search_bar = QLineEdit()
-        search_bar.setPlaceholderText("Поиск по названию...")
-        search_bar.setFixedWidth(250)
-        search_bar.textChanged.connect(self.filter_table)
-        top_layout.addWidget(search_bar)
+        top_layout.addWidget(self.create_search_bar("Поиск по названию, формуле, описанию..."))
 
         add_btn = QPushButton("Добавить образец")
         add_btn.setFixedSize(180, 35)
@@ -49,38 +55,30 @@ class SamplesPage(QWidget):
         line.setStyleSheet("background-color: #cccccc;")
         layout.addWidget(line)
 
-        self.table = QTableWidget(0, 5)
-        self.table.setHorizontalHeaderLabels(["ID", "Название", "Масса", "Объём", "Хим. формула"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table_model = RowTableModel(SAMPLE_COLUMNS, self)
+        self.table = RowTableView(self.table_model)
         self.table.doubleClicked.connect(self.open_view)
         layout.addWidget(self.table)
 
-        self.search_bar = search_bar
         self.setLayout(layout)
-        self.load_data()
 
-    def load_data(self):
-        from database.crud import get_all_samples
-        samples = get_all_samples()
-        self.table.setRowCount(len(samples))
-        for row, s in enumerate(samples):
-            self.table.setItem(row, 0, QTableWidgetItem(str(s.id)))
-            self.table.setItem(row, 1, QTableWidgetItem(s.name))
-            self.table.setItem(row, 2, QTableWidgetItem(str(s.mass) if s.mass else ""))
-            self.table.setItem(row, 3, QTableWidgetItem(str(s.volume) if s.volume else ""))
-            self.table.setItem(row, 4, QTableWidgetItem(s.chemical_formula))
+    @staticmethod
+    def read_list(researcher_id):
+        from database.crud import get_all_samples, read_with_watermark
+        return read_with_watermark(get_all_samples)
+
+    @staticmethod
+    def read_delta(researcher_id, watermark):
+        from database.crud import get_samples_delta
+        return get_samples_delta(watermark)
 
-    def filter_table(self, text):
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 1)
-            self.table.setRowHidden(row, text.lower() not in item.text().lower())
+    @staticmethod
+    def search(text, researcher_id):
+        from database.search import search_samples
+        return search_samples(text, page_size=None)
 
     def open_view(self, index):
-        row = index.row()
-        sample_id = int(self.table.item(row, 0).text())
+        sample_id = self.table.row_at(index).id
         from database.crud import get_sample_by_id
         sample_obj = get_sample_by_id(sample_id)
         if sample_obj:
@@ -105,7 +103,3 @@ class SamplesPage(QWidget):
         dialog = CreateSampleDialog(self)
         if dialog.exec():
             self.load_data()
-
-    def showEvent(self, event):
-        self.load_data()
-        super().showEvent(event)
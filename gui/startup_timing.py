@@ -0,0 +1,41 @@
+# lis_project/gui/startup_timing.py
+"""Замер холодного старта: сколько прошло от запуска до ключевых точек.
+
+main.py запоминает time.perf_counter() до импорта Qt и передаёт его в
+MainWindow. Точки отмечаются по одному разу; когда отмечены все из
+REPORT_AFTER, в консоль печатается одна строка отчёта.
+"""
+import time
+from PySide6.QtCore import QObject, QEvent
+
+FIRST_PAINT = "первая отрисовка"
+FIRST_DATA = "данные главной"
+REPORT_AFTER = (FIRST_PAINT, FIRST_DATA)
+
+
+class StartupTiming(QObject):
+    def __init__(self, window, started=None):
+        super().__init__(window)
+        self.started = time.perf_counter() if started is None else started
+        self.marks = {}  # точка -> мс от запуска, в порядке отметки
+        self.reported = False
+        # Первую отрисовку ловим по событию Paint окна
+        self._window = window
+        window.installEventFilter(self)
+
+    def mark(self, name):
+        if name in self.marks:
+            return
+        self.marks[name] = (time.perf_counter() - self.started) * 1000
+        if not self.reported and all(point in self.marks for point in REPORT_AFTER):
+            self.reported = True
+            print(self.report())
+
+    def report(self):
+        return "⏱️ Старт: " + ", ".join(f"{name} {ms:.0f} мс" for name, ms in self.marks.items())
+
+    def eventFilter(self, obj, event):
+        if obj is self._window and event.type() == QEvent.Paint:
+            self._window.removeEventFilter(self)
+            self.mark(FIRST_PAINT)
+        return False
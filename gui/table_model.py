@@ -0,0 +1,297 @@
+# lis_project/gui/table_model.py
+"""Модель/представление для списочных таблиц.
+
+QTableWidget создаёт по QTableWidgetItem на каждую ячейку: 100k строк ×
+6 колонок — 600k объектов Qt. RowTableModel хранит строки компактно
+(namedtuple только из показываемых полей) и форматирует текст ячейки по
+запросу представления, то есть только для видимых строк. Представлению строки
+выдаются пачками (canFetchMore/fetchMore); сортировка — по типизированным
+ключам колонок (числа и даты — массивом float), фильтр по результатам
+поиска — RowFilterProxyModel.
+"""
+from array import array
+from collections import namedtuple
+from operator import attrgetter, itemgetter
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+from PySide6.QtWidgets import QTableView, QHeaderView, QAbstractItemView
+
+FETCH_BATCH_SIZE = 500
+
+# field — поле строки из database.crud (через точку — поле связанной записи,
+# например 'sample.name'); text(значение) -> str;
+# sort_key(значение) -> ключ; numeric — ключ float (хранится в array('d'))
+Column = namedtuple('Column', ['title', 'field', 'text', 'sort_key', 'numeric'])
+
+_MISSING = float('-inf')  # пустые значения при сортировке — первыми, как NULL в MySQL
+
+
+def text_column(title, field, empty=''):
+    return Column(title, field, lambda value: empty if value is None else str(value),
+                  lambda value: '' if value is None else str(value).casefold(), False)
+
+def number_column(title, field, blank_zero=False, empty=''):
+    if blank_zero:
+        text = lambda value: str(value) if value else empty
+    else:
+        text = lambda value: empty if value is None else str(value)
+    return Column(title, field, text, lambda value: _MISSING if value is None else float(value), True)
+
+def date_column(title, field, empty='', fmt='%d.%m.%Y'):
+    return Column(title, field, lambda value: value.strftime(fmt) if value else empty,
+                  lambda value: value.toordinal() if value else _MISSING, True)
+
+def mapped_column(title, field, labels):
+    """Код (например, статус) показывается подписью из labels; сортировка — по подписи"""
+    text = lambda value: labels.get(value, value or '')
+    return Column(title, field, text, lambda value: text(value).casefold(), False)
+
+
+class RowTableModel(QAbstractTableModel):
+    """Строки списка для QTableView. Первая колонка — id строки."""
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = tuple(columns)
+        self.row_type = namedtuple('Row', [column.field.replace('.', '_') for column in self.columns])
+        self._rows = []
+        self._loaded = 0         # сколько строк уже отдано представлению
+        self._sort_keys = {}     # колонка -> ключи сортировки (сбрасываются при изменении данных)
+        self._positions = None   # id -> номер строки, строится по требованию
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def _compact(self, items):
+        if not items:
+            return []
+        if isinstance(items[0], self.row_type):
+            return list(items)
+        fields = [column.field for column in self.columns]
+        getter = itemgetter(*fields) if isinstance(items[0], dict) else attrgetter(*fields)
+        make = self.row_type._make
+        if len(fields) == 1:
+            return [make((getter(item),)) for item in items]
+        return [make(getter(item)) for item in items]
+
+    # === Данные ===
+    def set_rows(self, items):
+        """Заменяет все строки (элементы — namedtuple/модели или словари из database.crud)"""
+        self.beginResetModel()
+        self._rows = self._compact(items)
+        self._changed()
+        if self._sort_column >= 0:
+            self._sort_rows(self._sort_column, self._sort_order)
+        self._loaded = min(len(self._rows), FETCH_BATCH_SIZE)
+        self.endResetModel()
+
+    def apply_delta(self, delta):
+        """Применяет дельту database.crud.get_*_delta: заменяет изменённые строки,
+        добавляет новые, убирает удалённые. Перерисовываются только затронутые строки."""
+        positions = self._index()
+        last_column = len(self.columns) - 1
+        added = []
+        for item in self._compact(delta['rows']):
+            i = positions.get(item[0])
+            if i is None:
+                added.append(item)
+                continue
+            self._rows[i] = item
+            if i < self._loaded:
+                self.dataChanged.emit(self.index(i, 0), self.index(i, last_column))
+        # Удаляем снизу вверх, чтобы номера оставшихся строк не сдвигались
+        for i in sorted((positions[row_id] for row_id in delta['deleted'] if row_id in positions), reverse=True):
+            if i < self._loaded:
+                self.beginRemoveRows(QModelIndex(), i, i)
+                del self._rows[i]
+                self._loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self._rows[i]
+        if added:
+            if self._loaded == len(self._rows):
+                # Всё уже показано — новые строки сразу в конец; иначе придут с fetchMore
+                self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + len(added) - 1)
+                self._rows.extend(added)
+                self._loaded = len(self._rows)
+                self.endInsertRows()
+            else:
+                self._rows.extend(added)
+        self._changed()
+        if added and self._sort_column >= 0:
+            self.sort(self._sort_column, self._sort_order)
+
+    def sync_rows(self, items):
+        """Приводит строки к items, затрагивая только отличающиеся:
+        выделение и прокрутка представления сохраняются"""
+        fresh = self._compact(items)
+        current = {item[0]: item for item in self._rows}
+        fresh_ids = {item[0] for item in fresh}
+        changed = [item for item in fresh if current.get(item[0]) != item]
+        deleted = [row_id for row_id in current if row_id not in fresh_ids]
+        if changed or deleted:
+            self.apply_delta({'rows': changed, 'deleted': deleted})
+
+    def row(self, i):
+        return self._rows[i]
+
+    def row_id(self, i):
+        return self._rows[i][0]
+
+    def total_rows(self):
+        return len(self._rows)
+
+    def _changed(self):
+        self._sort_keys = {}
+        self._positions = None
+
+    def _index(self):
+        if self._positions is None:
+            self._positions = {item[0]: i for i, item in enumerate(self._rows)}
+        return self._positions
+
+    # === Порционная выдача строк представлению ===
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        self._fetch(FETCH_BATCH_SIZE)
+
+    def fetch_all(self):
+        self._fetch(len(self._rows))
+
+    def _fetch(self, count):
+        count = min(count, len(self._rows) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    # === QAbstractTableModel ===
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        column = index.column()
+        return self.columns[column].text(self._rows[index.row()][column])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.columns[section].title
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_keeping(column, order, [index.row() for index in self.persistentIndexList()])
+
+    def sort_keeping(self, column, order, keep_rows=()):
+        """Сортировка, после которой строки keep_rows (выделение в представлении) остаются загруженными"""
+        if column < 0 or column >= len(self.columns):
+            return
+        self._sort_column, self._sort_order = column, order
+        ordered, keys = self._sorted_order(column, order)
+        new_positions = array('l', bytes(array('l').itemsize * len(ordered)))
+        for new, old in enumerate(ordered):
+            new_positions[old] = new
+        # Строка могла уехать за загруженную часть — догружаем до неё заранее:
+        # число строк нельзя менять внутри layoutChanged
+        keep_rows = [row for row in keep_rows if 0 <= row < len(ordered)]
+        if keep_rows:
+            self._fetch(max(new_positions[row] for row in keep_rows) + 1 - self._loaded)
+        self.layoutAboutToBeChanged.emit()
+        self._apply_order(ordered, column, keys)
+        # Выделение и текущая строка следуют за своими строками
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistent, [self.index(new_positions[index.row()], index.column()) for index in persistent])
+        self.layoutChanged.emit()
+
+    def _sorted_order(self, column, order):
+        """Порядок строк по колонке: (старые номера в новом порядке, ключи колонки)"""
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            spec = self.columns[column]
+            values = (spec.sort_key(item[column]) for item in self._rows)
+            keys = array('d', values) if spec.numeric else list(values)
+        # sorted стабилен: при равных ключах сохраняется прежний порядок
+        return sorted(range(len(self._rows)), key=keys.__getitem__, reverse=order == Qt.DescendingOrder), keys
+
+    def _sort_rows(self, column, order):
+        ordered, keys = self._sorted_order(column, order)
+        self._apply_order(ordered, column, keys)
+
+    def _apply_order(self, ordered, column, keys):
+        self._rows = [self._rows[i] for i in ordered]
+        sorted_keys = (keys[i] for i in ordered)
+        self._sort_keys = {column: array('d', sorted_keys) if isinstance(keys, array) else list(sorted_keys)}
+        self._positions = None
+
+
+class RowFilterProxyModel(QSortFilterProxyModel):
+    """Фильтр строк RowTableModel по списку id (результаты поиска) в порядке этого списка.
+    Сортировку по колонке выполняет исходная модель."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rank = None
+
+    def set_ids(self, ids):
+        """Показывать только строки с id из ids (None — все строки)"""
+        if ids is None:
+            # Сначала снимаем сортировку по релевантности: lessThan без рангов не работает
+            QSortFilterProxyModel.sort(self, -1)
+            self._rank = None
+            self.invalidateFilter()
+            return
+        self._rank = {row_id: i for i, row_id in enumerate(ids)}
+        # Отфильтровать можно только загруженные строки — выдаём модели все
+        self.sourceModel().fetch_all()
+        self.invalidateFilter()
+        QSortFilterProxyModel.sort(self, 0)
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self._rank is None or self.sourceModel().row_id(source_row) in self._rank
+
+    def lessThan(self, left, right):
+        source = self.sourceModel()
+        if self._rank is None:
+            return left.row() < right.row()
+        return self._rank[source.row_id(left.row())] < self._rank[source.row_id(right.row())]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Клик по заголовку: порядок релевантности сменяется порядком колонки
+        keep_rows = [self.mapToSource(index).row() for index in self.persistentIndexList()]
+        QSortFilterProxyModel.sort(self, -1)
+        self.sourceModel().sort_keeping(column, order, keep_rows)
+
+
+class RowTableView(QTableView):
+    """Таблица списочной страницы: только чтение, выделение строк, сортировка по заголовку"""
+
+    def __init__(self, source_model, parent=None):
+        super().__init__(parent)
+        self.source_model = source_model
+        self.proxy = RowFilterProxyModel(self)
+        self.proxy.setSourceModel(source_model)
+        self.setModel(self.proxy)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setSelectionBehavior(QAbstractItemView.SelectRows)
+        # Без индикатора: до первого клика строки идут в порядке запроса
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+
+    def row_at(self, index):
+        """Строка модели (namedtuple) по индексу представления"""
+        return self.source_model.row(self.proxy.mapToSource(index).row())
+
+    def selected_row(self):
+        selected = self.selectionModel().selectedRows()
+        return self.row_at(selected[0]) if selected else None
+
+    def filter_ids(self, ids):
+        self.proxy.set_ids(ids)
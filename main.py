@@ -1,3 +1,6 @@
+import time
+STARTED = time.perf_counter()  # отсчёт для отчёта о старте — до импорта Qt
+
 import sys
 import os
 from PySide6.QtWidgets import QApplication
@@ -5,7 +8,7 @@ from gui.main_window import MainWindow
 
 def main():
     app = QApplication(sys.argv)
-    window = MainWindow()
+    window = MainWindow(started=STARTED)
     window.show()
     sys.exit(app.exec())
 
@@ -9,6 +9,35 @@ from reportlab.lib.units import inch
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 
+# Сколько строк данных попадает в одну таблицу reportlab
+TABLE_CHUNK_ROWS = 200
+
+class _StreamedStory(list):
+    """Список flowable'ов для doc.build(), который дочитывает элементы из генератора.
+
+    reportlab забирает элементы с начала списка (flowables[0], del flowables[0]),
+    поэтому достаточно держать в памяти только ещё не свёрстанную "голову".
+    """
+    def __init__(self, source):
+        super().__init__()
+        self._source = iter(source)
+
+    def _fill(self, index):
+        while self._source is not None and list.__len__(self) <= index:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill(0)
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self._fill(index)
+        return list.__getitem__(self, index)
+
 class DetailedPDFReport:
     def __init__(self):
         self.reports_dir = "./reports"
@@ -76,51 +105,54 @@ class DetailedPDFReport:
             story.append(Spacer(1, 5))
         story.append(PageBreak())
 
-        # === ЗАГРУЗКА ДАННЫХ ===
+        # === ГЕНЕРАЦИЯ ТАБЛИЦ ===
+        # Генераторы iter_* читают БД только когда до раздела дойдёт вёрстка,
+        # поэтому в памяти одновременно находятся лишь несколько таблиц
         from database.crud import (
-            get_all_researchers,
-            get_all_experiments_with_researchers,
-            get_all_samples,
-            get_all_equipment,
-            get_all_measurements,
-            get_all_methods,
-            get_all_results,
-            get_all_conditions
+            iter_researchers,
+            iter_experiments_with_researchers,
+            iter_samples,
+            iter_equipment,
+            iter_measurements,
+            iter_methods,
+            iter_results,
+            iter_conditions
         )
 
-        researchers = self._to_dict_list(get_all_researchers(), 'researcher')
-        experiments = get_all_experiments_with_researchers() or []
-        samples = self._to_dict_list(get_all_samples(), 'sample')
-        equipment = self._to_dict_list(get_all_equipment(), 'equipment')
-        measurements = get_all_measurements() or []
-        methods = get_all_methods() or []
-        results = get_all_results() or []
-        conditions = get_all_conditions() or []
-
-        # === ГЕНЕРАЦИЯ ТАБЛИЦ ===
         sections = [
-            ("1. Исследователи", researchers, self._get_researchers_table),
-            ("2. Эксперименты", experiments, self._get_experiments_table),
-            ("3. Образцы", samples, self._get_samples_table),
-            ("4. Оборудование", equipment, self._get_equipment_table),
-            ("5. Измерения", measurements, self._get_measurements_table),
-            ("6. Методы", methods, self._get_methods_table),
-            ("7. Результаты", results, self._get_results_table),
-            ("8. Условия экспериментов", conditions, self._get_conditions_table)
+            ("1. Исследователи", iter_researchers(), self._get_researchers_table),
+            ("2. Эксперименты", iter_experiments_with_researchers(list_only=True), self._get_experiments_table),
+            ("3. Образцы", iter_samples(), self._get_samples_table),
+            ("4. Оборудование", iter_equipment(), self._get_equipment_table),
+            ("5. Измерения", iter_measurements(), self._get_measurements_table),
+            ("6. Методы", iter_methods(), self._get_methods_table),
+            ("7. Результаты", iter_results(), self._get_results_table),
+            ("8. Условия экспериментов", iter_conditions(), self._get_conditions_table)
         ]
 
-        for title, data, table_func in sections:
-            story.append(Paragraph(title, styles['heading']))
-            if data:
-                table = table_func(data, styles)
-                story.append(table)
-            else:
-                story.append(Paragraph("Нет данных", styles['normal']))
-            story.append(PageBreak())
-
-        doc.build(story)
+        doc.build(_StreamedStory(self._stream_story(story, sections, styles)))
         return f"Детальный PDF-отчёт создан: {filepath}"
 
+    def _stream_story(self, head, sections, styles):
+        """Генератор flowable'ов: сначала титул и оглавление, затем разделы частями"""
+        yield from head
+        for title, rows, table_func in sections:
+            yield Paragraph(title, styles['heading'])
+            has_data = False
+            chunk = []
+            for row in rows:
+                chunk.append(row)
+                if len(chunk) == TABLE_CHUNK_ROWS:
+                    yield table_func(chunk, styles)
+                    chunk = []
+                    has_data = True
+            if chunk:
+                yield table_func(chunk, styles)
+                has_data = True
+            if not has_data:
+                yield Paragraph("Нет данных", styles['normal'])
+            yield PageBreak()
+
     def _create_styles(self):
         styles = getSampleStyleSheet()
         return {
@@ -159,24 +191,6 @@ class DetailedPDFReport:
             )
         }
 
-    def _to_dict_list(self, objects, obj_type):
-        """Преобразует объекты Peewee в словари"""
-        if not objects:
-            return []
-        result = []
-        for obj in objects:
-            if hasattr(obj, '__data__'):
-                result.append(obj.__data__)
-            elif hasattr(obj, '_data'):
-                result.append(obj._data)
-            else:
-                d = {}
-                for field in dir(obj):
-                    if not field.startswith('_') and not callable(getattr(obj, field)):
-                        d[field] = getattr(obj, field)
-                result.append(d)
-        return result
-
     def _get_researchers_table(self, data, styles):
         headers = ["ID", "Фамилия", "Имя", "Отчество", "Организация", "Email"]
         rows = []
@@ -271,7 +285,7 @@ class DetailedPDFReport:
             wrapped_row = [Paragraph(str(cell), cell_style) for cell in row]
             table_data.append(wrapped_row)
 
-        table = Table(table_data, colWidths=col_widths)
+        table = Table(table_data, colWidths=col_widths, repeatRows=1)
         table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -3,9 +3,9 @@ import os
 import xlsxwriter
 from datetime import datetime
 from database.crud import (
-    get_all_experiments_with_researchers,
-    get_all_samples,
-    get_all_measurements
+    iter_experiments_with_researchers,
+    iter_samples,
+    get_report_counts
 )
 
 class ExcelReportGenerator:
@@ -17,7 +17,9 @@ class ExcelReportGenerator:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filepath = os.path.join(self.reports_dir, f'лабораторный_отчет_{timestamp}.xlsx')
         try:
-            workbook = xlsxwriter.Workbook(filepath)
+            # constant_memory: строки сбрасываются на диск сразу после записи,
+            # поэтому каждый лист заполняется строго сверху вниз
+            workbook = xlsxwriter.Workbook(filepath, {'constant_memory': True})
             header_format = workbook.add_format({
                 'bold': True,
                 'font_size': 14,
@@ -67,9 +69,6 @@ class ExcelReportGenerator:
         worksheet.write('A4', f'Дата генерации: {datetime.now().strftime("%d.%m.%Y %H:%M")}', text_format)
         worksheet.write('A5', '', text_format)
 
-        experiments = get_all_experiments_with_researchers() or []
-        samples = get_all_samples() or []
-
         # Эксперименты
         start_row = 6
         worksheet.merge_range(f'A{start_row}:G{start_row}', 'ЭКСПЕРИМЕНТЫ', header_format)
@@ -77,39 +76,44 @@ class ExcelReportGenerator:
         for col, header in enumerate(headers):
             worksheet.write(start_row + 1, col, header, table_header_format)
         status_text_map = {'planned': 'Планирование', 'in_progress': 'В работе', 'completed': 'Завершен'}
-        for row, exp in enumerate(experiments, start_row + 2):
+        status_colors = {'completed': '#C6EFCE', 'in_progress': '#FFEB9C'}
+        status_formats = {}
+        experiments_count = 0
+        for row, exp in enumerate(iter_experiments_with_researchers(), start_row + 2):
             worksheet.write(row, 0, exp['id'], text_format)
             worksheet.write(row, 1, exp['name'], text_format)
             worksheet.write(row, 2, exp['purpose'], text_format)
             status_text = status_text_map.get(exp['status'], exp['status'])
-            status_format = workbook.add_format({'border': 1, 'align': 'center'})
-            if exp['status'] == 'completed':
-                status_format.set_bg_color('#C6EFCE')
-            elif exp['status'] == 'in_progress':
-                status_format.set_bg_color('#FFEB9C')
-            else:
-                status_format.set_bg_color('#FFC7CE')
+            # Один формат на статус, а не на каждую строку
+            status_format = status_formats.get(exp['status'])
+            if status_format is None:
+                status_format = workbook.add_format({'border': 1, 'align': 'center'})
+                status_format.set_bg_color(status_colors.get(exp['status'], '#FFC7CE'))
+                status_formats[exp['status']] = status_format
             worksheet.write(row, 3, status_text, status_format)
             worksheet.write(row, 4, exp['date'], text_format)
             worksheet.write(row, 5, exp['researcher'], text_format)
             worksheet.write(row, 6, exp['description'], text_format)
-        worksheet.autofilter(f'A{start_row + 1}:G{start_row + 2 + len(experiments)}')
+            experiments_count += 1
+        worksheet.autofilter(f'A{start_row + 1}:G{start_row + 2 + experiments_count}')
 
         # Образцы
-        samples_start = start_row + 4 + len(experiments)
+        samples_start = start_row + 4 + experiments_count
         worksheet.merge_range(f'A{samples_start}:G{samples_start}', 'ОБРАЗЦЫ', header_format)
         sample_headers = ['ID', 'Название', 'Хим. формула', 'Состояние', 'Масса (г)', 'Объем (мл)', 'Описание']
         for col, header in enumerate(sample_headers):
             worksheet.write(samples_start + 1, col, header, table_header_format)
-        for row, sample in enumerate(samples, samples_start + 2):
-            worksheet.write(row, 0, sample.id, text_format)
-            worksheet.write(row, 1, sample.name, text_format)
-            worksheet.write(row, 2, sample.chemical_formula, text_format)
-            worksheet.write(row, 3, sample.aggregate_state, text_format)
-            worksheet.write(row, 4, float(sample.mass) if sample.mass else 0, number_format)
-            worksheet.write(row, 5, float(sample.volume) if sample.volume else 0, number_format)
-            worksheet.write(row, 6, sample.description, text_format)
-        worksheet.autofilter(f'A{samples_start + 1}:G{samples_start + 2 + len(samples)}')
+        samples_count = 0
+        for row, sample in enumerate(iter_samples(), samples_start + 2):
+            worksheet.write(row, 0, sample['id'], text_format)
+            worksheet.write(row, 1, sample['name'], text_format)
+            worksheet.write(row, 2, sample['chemical_formula'], text_format)
+            worksheet.write(row, 3, sample['aggregate_state'], text_format)
+            worksheet.write(row, 4, float(sample['mass']) if sample['mass'] else 0, number_format)
+            worksheet.write(row, 5, float(sample['volume']) if sample['volume'] else 0, number_format)
+            worksheet.write(row, 6, sample['description'], text_format)
+            samples_count += 1
+        worksheet.autofilter(f'A{samples_start + 1}:G{samples_start + 2 + samples_count}')
         worksheet.freeze_panes(start_row + 1, 0)
 
     def create_analytics_sheet(self, workbook, header_format, title_format, table_header_format, number_format, text_format):
@@ -119,26 +123,25 @@ class ExcelReportGenerator:
 
         worksheet.merge_range('A1:E1', 'АНАЛИТИКА ДАННЫХ ЛАБОРАТОРИИ', title_format)
 
-        experiments = get_all_experiments_with_researchers() or []
-        samples = get_all_samples() or []
-        measurements = get_all_measurements() or []
+        counts = get_report_counts() or {'experiments': 0, 'samples': 0, 'measurements': 0, 'statuses': {}}
+        statuses = counts['statuses']
 
         # Метрики
         worksheet.merge_range('A3:E3', 'КЛЮЧЕВЫЕ МЕТРИКИ ПРОЕКТА', header_format)
         metrics = [
-            ['Общее количество экспериментов:', len(experiments)],
-            ['Общее количество образцов:', len(samples)],
-            ['Общее количество измерений:', len(measurements)],
-            ['Экспериментов завершено:', len([e for e in experiments if e['status'] == 'completed'])],
-            ['Экспериментов в работе:', len([e for e in experiments if e['status'] == 'in_progress'])],
-            ['Экспериментов планируется:', len([e for e in experiments if e['status'] == 'planned'])]
+            ['Общее количество экспериментов:', counts['experiments']],
+            ['Общее количество образцов:', counts['samples']],
+            ['Общее количество измерений:', counts['measurements']],
+            ['Экспериментов завершено:', statuses.get('completed', 0)],
+            ['Экспериментов в работе:', statuses.get('in_progress', 0)],
+            ['Экспериментов планируется:', statuses.get('planned', 0)]
         ]
         for row, (label, value) in enumerate(metrics, 4):
             worksheet.write(f'A{row}', label, text_format)
             worksheet.write(f'B{row}', value, number_format)
 
         # Активность по дням
-        activity_data = self._get_activity_by_date(experiments)
+        activity_data = self._get_activity_by_date(iter_experiments_with_researchers(list_only=True))
         if activity_data:
             dates, counts = zip(*activity_data)
             start_row = 12
@@ -165,12 +168,9 @@ class ExcelReportGenerator:
         worksheet.set_column('B:B', 15)
         worksheet.merge_range('A1:B1', 'ВИЗУАЛИЗАЦИЯ ДАННЫХ ЛАБОРАТОРИИ', title_format)
 
-        experiments = get_all_experiments_with_researchers() or []
-        samples = get_all_samples() or []
-
         # Распределение по исследователям
         researcher_exp_count = {}
-        for exp in experiments:
+        for exp in iter_experiments_with_researchers(list_only=True):
             r = exp['researcher']
             researcher_exp_count[r] = researcher_exp_count.get(r, 0) + 1
         row = 6
@@ -193,7 +193,8 @@ class ExcelReportGenerator:
         # Топ-5 исследователей
         top_researchers = sorted(researcher_exp_count.items(), key=lambda x: x[1], reverse=True)[:5]
         if top_researchers:
-            top_start = 20
+            # Ниже списка исследователей: в режиме constant_memory сброшенные на диск строки не перезаписать
+            top_start = max(20, row + 2)
             worksheet.write(f'A{top_start}', 'Топ-5 исследователей', header_format)
             for i, (r, c) in enumerate(top_researchers, top_start + 1):
                 worksheet.write(f'A{i}', r[:20])
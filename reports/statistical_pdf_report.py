@@ -174,49 +174,41 @@ class StatisticalPDFReport:
     def _get_statistical_data(self):
         """Получает все статистические данные через crud.py"""
         from database.crud import (
-            get_all_researchers,
-            get_all_experiments_with_researchers,
+            get_report_counts,
+            get_daily_experiment_counts,
             get_researcher_stats,
             get_monthly_experiment_counts
         )
         from datetime import datetime
 
-        researchers = get_all_researchers() or []
-        experiments = get_all_experiments_with_researchers() or []
+        counts = get_report_counts() or {'researchers': 0, 'experiments': 0, 'samples': 0, 'statuses': {}}
 
         # Общие метрики
-        total_researchers = len(researchers)
-        total_experiments = len(experiments)
-        total_samples = sum(len(e.get('samples', [])) for e in experiments)
+        total_researchers = counts['researchers']
+        total_experiments = counts['experiments']
+        total_samples = counts['samples']
 
-        # За последние 30 дней
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        last_30_days = sum(
-            1 for e in experiments
-            if e['date'] != 'Не указана' and self._parse_date(e['date']) >= thirty_days_ago.date()
-        )
+        # Число экспериментов по дням за 90 дней — один GROUP BY по индексу даты
+        thirty_days_ago = (datetime.now() - timedelta(days=30)).date()
+        daily = get_daily_experiment_counts(90) or {}
+        last_90_days = sum(daily.values())
+        last_30_days = 0
+        activity_by_date = {}
+        for d, count in daily.items():
+            if d >= thirty_days_ago:
+                # Активность по дням (последние 30 дней)
+                last_30_days += count
+                activity_by_date[d.strftime('%d.%m')] = activity_by_date.get(d.strftime('%d.%m'), 0) + count
 
         # Среднее в месяц (пример: за последние 90 дней → /3)
-        ninety_days_ago = datetime.now() - timedelta(days=90)
-        last_90_days = sum(
-            1 for e in experiments
-            if e['date'] != 'Не указана' and self._parse_date(e['date']) >= ninety_days_ago.date()
-        )
         avg_per_month = last_90_days / 3 if last_90_days > 0 else 0
 
-        # Активность по дням (последние 30 дней)
-        activity_by_date = {}
-        for e in experiments:
-            if e['date'] != 'Не указана':
-                d = self._parse_date(e['date'])
-                if d >= thirty_days_ago.date():
-                    activity_by_date[d.strftime('%d.%m')] = activity_by_date.get(d.strftime('%d.%m'), 0) + 1
-
         # Распределение по статусам
+        statuses = counts['statuses']
         status_distribution = {
-            'Завершено': len([e for e in experiments if e['status'] == 'completed']),
-            'В работе': len([e for e in experiments if e['status'] == 'in_progress']),
-            'Планируется': len([e for e in experiments if e['status'] == 'planned'])
+            'Завершено': statuses.get('completed', 0),
+            'В работе': statuses.get('in_progress', 0),
+            'Планируется': statuses.get('planned', 0)
         }
 
         # Топ-5 исследователей
@@ -0,0 +1,62 @@
+# lis_project/tests/conftest.py
+"""Общие фикстуры: временная база SQLite со всеми миграциями.
+
+Окружение задаётся до первого импорта database: соединение с базой
+создаётся при импорте database.connection.
+"""
+import os
+import shutil
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix='lis_tests_')
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['DB_PATH'] = os.path.join(_DB_DIR, 'lis_test.db')
+
+import pytest
+from database.connection import database, connection_scope
+from database.cache import query_cache, experiment_snapshots
+from database.migrations import run_migrations
+from database.models import ALL_MODELS, Researcher, Sample, Equipment
+from database.rollups import ROLLUP_MODELS
+from database.changes import ChangeLog
+
+
+@pytest.fixture(scope='session', autouse=True)
+def schema():
+    run_migrations()
+    yield
+    database.close_all()
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_db(schema):
+    """Каждый тест начинает с пустых таблиц и пустых кэшей"""
+    yield
+    with connection_scope():
+        with database.atomic():
+            # Связующие и зависимые таблицы — раньше тех, на которые они ссылаются
+            for model in reversed(ALL_MODELS + ROLLUP_MODELS + [ChangeLog]):
+                model.delete().execute()
+    query_cache.clear()
+    experiment_snapshots.clear()
+
+
+@pytest.fixture
+def researcher():
+    with connection_scope():
+        return Researcher.create(surname='Иванов', name='Александр', organization='Кафедра аналитической химии',
+                                 email='ivanov@example.org')
+
+
+def make_samples(count, name='Образец'):
+    """count образцов с именами '<name> N'; возвращает их id по возрастанию"""
+    with connection_scope():
+        with database.atomic():
+            return [Sample.create(name=f'{name} {i}', chemical_formula='NaCl', mass=1.0, volume=1.0).id
+                    for i in range(count)]
+
+
+def make_equipment(count):
+    with connection_scope():
+        return [Equipment.create(name=f'Прибор {i}', description='').id for i in range(count)]
@@ -0,0 +1,93 @@
+# lis_project/tests/test_analytics.py
+"""Колоночная загрузка измерений и статистика по группам"""
+import datetime
+import numpy as np
+from database import analytics, crud
+from database.connection import database, connection_scope
+from database.models import Measurement
+from tests.conftest import make_samples
+
+MOMENT = datetime.datetime(2024, 3, 1, 12, 0)
+
+
+def add_measurements(sample_id, prop, unit, values):
+    records = [{'sample_id': sample_id, 'method': 'Метод', 'property_name': prop, 'value': value,
+                'unit': unit, 'accuracy': None, 'time_of_event': MOMENT} for value in values]
+    assert crud.bulk_create_measurements(records)['inserted'] == len(values)
+
+def add_zero_date_measurement(sample_id, value):
+    # Нулевая дата MySQL ('0000-00-00 00:00:00') — мимо проверок ORM
+    with connection_scope():
+        database.execute_sql(
+            f'INSERT INTO {Measurement._meta.table_name} '
+            '(sample_id, method, property, value, unit, time_of_event) VALUES (?, ?, ?, ?, ?, ?)',
+            (sample_id, 'Метод', 'pH', value, '', '0000-00-00 00:00:00'))
+
+def stats_by(records, *keys):
+    return {tuple(row[k] for k in keys): row for row in records}
+
+
+def test_time_column_marks_invalid_dates():
+    times, bad = analytics._time_column((MOMENT, None, '0000-00-00 00:00:00', '2024-03-02 08:30:00'))
+    assert bad.tolist() == [False, False, True, False]
+    assert np.isnat(times).tolist() == [False, True, True, False]
+    assert times[3] == np.datetime64('2024-03-02T08:30:00')
+
+
+def test_time_column_fast_path():
+    times, bad = analytics._time_column((MOMENT, MOMENT))
+    assert times.dtype == np.dtype('datetime64[us]')
+    assert not bad.any()
+
+
+def test_group_stats_per_property_unit_and_sample():
+    first, second = make_samples(2)
+    add_measurements(first, 'pH', '', [6.0, 8.0])
+    add_measurements(first, 'Температура', '°C', [20.0])
+    add_measurements(second, 'pH', '', [7.0])
+    frame = analytics.load_measurements()
+    assert len(frame) == 4
+
+    stats = stats_by(analytics.stats_records(analytics.group_stats(frame)), 'property', 'sample_id')
+    assert stats[('pH', first)]['count'] == 2
+    assert stats[('pH', first)]['mean'] == 7.0
+    assert stats[('pH', first)]['std'] == 1.0
+    assert (stats[('pH', first)]['min'], stats[('pH', first)]['max']) == (6.0, 8.0)
+    assert stats[('Температура', first)]['unit'] == '°C'
+    assert stats[('pH', second)]['count'] == 1
+
+
+def test_group_stats_skips_rows_with_invalid_time():
+    sample_id = make_samples(1)[0]
+    add_measurements(sample_id, 'pH', '', [6.0, 8.0])
+    add_zero_date_measurement(sample_id, 100.0)
+    frame = analytics.load_measurements(chunk_size=2)
+    assert len(frame) == 3
+    assert frame.bad_time.sum() == 1
+
+    (row,) = analytics.stats_records(analytics.group_stats(frame, by=('property',)))
+    assert row['count'] == 2
+    assert row['max'] == 8.0
+
+
+def test_filters_and_unknown_group_key():
+    first, second = make_samples(2)
+    add_measurements(first, 'pH', '', [6.0])
+    add_measurements(second, 'pH', '', [7.0])
+    frame = analytics.load_measurements(sample_ids=(second,))
+    assert frame.sample_id.tolist() == [second]
+    assert analytics.get_measurement_stats(by=('colour',)) is None
+
+
+def test_group_stats_without_packed_key(monkeypatch):
+    first, second = make_samples(2)
+    add_measurements(first, 'pH', '', [6.0, 8.0])
+    add_measurements(first, 'Температура', '°C', [20.0])
+    add_measurements(second, 'pH', '', [7.0])
+    frame = analytics.load_measurements()
+    packed = analytics.stats_records(analytics.group_stats(frame))
+    # Словари так велики, что упакованный ключ переполнил бы int64
+    monkeypatch.setattr(analytics, 'PACKED_KEY_LIMIT', 1)
+    stacked = analytics.stats_records(analytics.group_stats(frame))
+    assert len(stacked) == 3
+    assert stats_by(stacked, 'property', 'unit', 'sample_id') == stats_by(packed, 'property', 'unit', 'sample_id')
@@ -0,0 +1,63 @@
+# lis_project/tests/test_bulk.py
+"""Массовая загрузка измерений: проверка записей и вставка"""
+import datetime
+from database import crud
+from database.connection import connection_scope
+from database.models import Measurement
+from tests.conftest import make_samples
+
+MOMENT = datetime.datetime(2024, 3, 1, 12, 0)
+
+
+def record(sample_id, **overrides):
+    values = {'sample_id': sample_id, 'method': 'Потенциометрия', 'property_name': 'pH', 'value': 7.0,
+              'unit': '', 'accuracy': 0.01, 'time_of_event': MOMENT}
+    values.update(overrides)
+    return values
+
+def stored_count():
+    with connection_scope():
+        return Measurement.select().count()
+
+
+def test_dimensionless_values_with_empty_unit_are_inserted():
+    sample_id = make_samples(1)[0]
+    result = crud.bulk_create_measurements([record(sample_id), record(sample_id, unit='  ', value=6.5)])
+    assert result == {'inserted': 2, 'rejected': []}
+    with connection_scope():
+        assert [m.unit for m in Measurement.select()] == ['', '']
+
+
+def test_invalid_records_are_rejected_with_reason():
+    sample_id = make_samples(1)[0]
+    records = [
+        record(sample_id, unit='мВ'),
+        record(sample_id, unit=None),
+        record(sample_id, unit='е' * (Measurement.unit.max_length + 1)),
+        record(sample_id, method=''),
+        record(sample_id, value=float('nan')),
+        record(sample_id + 1000),
+        record(sample_id, time_of_event='вчера'),
+        ('слишком', 'коротко'),
+    ]
+    result = crud.bulk_create_measurements(records)
+    assert result['inserted'] == 1
+    assert [index for index, _ in result['rejected']] == [1, 2, 3, 4, 5, 6, 7]
+    assert 'unit' in dict(result['rejected'])[1]
+    assert stored_count() == 1
+
+
+def test_tuples_and_optional_accuracy():
+    sample_id = make_samples(1)[0]
+    rows = [(sample_id, 'Термометрия', 'Температура', 25.0, '°C', None, '2024-03-01 12:00:00'),
+            (sample_id, 'Термометрия', 'Температура', 26.0, '°C', '', None)]
+    assert crud.bulk_create_measurements(rows, chunk_size=1) == {'inserted': 2, 'rejected': []}
+
+
+def test_all_or_nothing_rolls_back():
+    sample_id = make_samples(1)[0]
+    result = crud.bulk_create_measurements([record(sample_id), record(sample_id, unit=None)],
+                                           all_or_nothing=True)
+    assert result['inserted'] == 0
+    assert len(result['rejected']) == 1
+    assert stored_count() == 0
@@ -0,0 +1,86 @@
+# lis_project/tests/test_cache.py
+"""Кэш запросов и отложенная инвалидация"""
+import pytest
+from database import crud, cache
+from database.cache import QueryCache, query_cache, invalidates
+from database.connection import transaction_scope
+from database.models import Sample
+from tests.conftest import make_samples
+
+
+def sample_generation():
+    return query_cache.generations(('sample',))
+
+
+def test_read_is_cached_until_write(researcher):
+    make_samples(2)
+    first = crud.get_all_samples()
+    assert len(first) == 2
+    hits = query_cache.hits
+    assert crud.get_all_samples() == first
+    assert query_cache.hits == hits + 1
+
+    crud.create_sample_with_researcher('Новый', '', 'H2O', 'жидкое', 1.0, 1.0, researcher.id)
+    assert len(crud.get_all_samples()) == 3
+
+
+def test_cached_list_is_a_copy():
+    make_samples(2)
+    rows = crud.get_all_samples()
+    rows.clear()
+    assert len(crud.get_all_samples()) == 2
+
+
+def test_invalidation_waits_for_outermost_transaction():
+    sample_id = make_samples(1)[0]
+    before = sample_generation()
+    with transaction_scope():
+        crud.update_sample(sample_id, name='Внутри транзакции')
+        # Незакоммиченная правка ещё не сбросила кэш: другой поток не закэширует её
+        assert sample_generation() == before
+    assert sample_generation() > before
+
+
+def test_nested_writes_invalidate_once_after_outer():
+    sample_id = make_samples(1)[0]
+
+    @invalidates(Sample)
+    def outer():
+        crud.update_sample(sample_id, name='Вложенная правка')
+        assert sample_generation() == before
+
+    before = sample_generation()
+    outer()
+    assert sample_generation() > before
+    assert crud.get_all_samples()[0].name == 'Вложенная правка'
+
+
+def test_invalidation_runs_after_rollback():
+    sample_id = make_samples(1)[0]
+    before = sample_generation()
+    with pytest.raises(RuntimeError):
+        with transaction_scope():
+            crud.update_sample(sample_id, name='Откачено')
+            raise RuntimeError
+    assert sample_generation() > before
+    assert crud.get_all_samples()[0].name != 'Откачено'
+
+
+def test_put_after_concurrent_write_is_dropped():
+    c = QueryCache(max_entries=4, ttl=60)
+    generations = c.generations(('sample',))
+    c.invalidate('sample')  # запись, пока шло чтение
+    c.put('key', ('sample',), generations, 'stale')
+    assert c.get('key') == (False, None)
+
+
+def test_query_cache_ttl_and_lru(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    c = QueryCache(max_entries=2, ttl=10)
+    for key in ('a', 'b', 'c'):
+        c.put(key, (), (), key)
+    assert c.get('a') == (False, None)  # вытеснена
+    assert c.get('c') == (True, 'c')
+    now[0] += 11
+    assert c.get('c') == (False, None)
@@ -0,0 +1,94 @@
+# lis_project/tests/test_changes.py
+"""Журнал изменений: отметки и дельты списочных страниц"""
+import datetime
+from database import crud, changes
+from database.changes import ChangeLog
+from database.connection import connection_scope
+from database.models import Sample
+from tests.conftest import make_samples
+
+
+def test_full_read_returns_rows_and_watermark():
+    make_samples(3)
+    crud.update_sample(crud.get_all_samples()[0].id, name='Изменён')
+    watermark, rows = crud.read_with_watermark(crud.get_all_samples)
+    assert len(rows) == 3
+    assert watermark == crud.get_change_watermark()
+
+
+def test_full_read_bypasses_query_cache():
+    ids = make_samples(2)
+    crud.get_all_samples()
+    # Правка другого клиента: кэш этого процесса о ней не знает
+    with connection_scope():
+        Sample.update(name='Чужая правка').where(Sample.id == ids[0]).execute()
+    assert crud.get_all_samples()[0].name != 'Чужая правка'
+    _, rows = crud.read_with_watermark(crud.get_all_samples)
+    assert rows[0].name == 'Чужая правка'
+
+
+def test_delta_returns_changed_and_deleted_rows():
+    ids = make_samples(3)
+    watermark, _ = crud.read_with_watermark(crud.get_all_samples)
+    crud.update_sample(ids[0], name='Изменён')
+    crud.delete_sample(ids[1])
+
+    delta = crud.get_samples_delta(watermark)
+    assert not delta['full']
+    assert [row.name for row in delta['rows']] == ['Изменён']
+    assert delta['deleted'] == [ids[1]]
+
+    again = crud.get_samples_delta(delta['watermark'])
+    assert again['rows'] == [] and again['deleted'] == []
+    assert again['watermark'] == delta['watermark']
+
+
+def test_unknown_watermark_requests_full_reload():
+    make_samples(1)
+    delta = crud.get_samples_delta(None)
+    assert delta['full']
+
+
+def test_pruned_watermark_requests_full_reload():
+    ids = make_samples(1)
+    crud.update_sample(ids[0], name='Старая правка')
+    with connection_scope():
+        ChangeLog.update(changed_at=datetime.datetime.now() - datetime.timedelta(days=30)).execute()
+    crud.prune_change_log()
+    crud.update_sample(ids[0], name='Новая правка')
+    assert crud.get_samples_delta(0)['full']
+
+
+def test_watermark_stops_before_pending_gap():
+    ids = make_samples(3)
+    with connection_scope():
+        watermark = changes.current_watermark()
+        first = ChangeLog.create(table='sample', row_id=ids[0])
+        pending = ChangeLog.create(table='sample', row_id=ids[1])
+        last = ChangeLog.create(table='sample', row_id=ids[2])
+        # Номер, выданный ещё не закоммиченной транзакции: в журнале его пока нет
+        pending.delete_instance()
+        assert changes.current_watermark() == first.id
+
+    delta = crud.get_samples_delta(watermark)
+    assert sorted(row.id for row in delta['rows']) == [ids[0], ids[2]]
+    assert delta['watermark'] == first.id
+
+    # Транзакция закоммитилась: её запись приходит следующей дельтой
+    with connection_scope():
+        ChangeLog.insert(id=pending.id, table='sample', row_id=ids[1]).execute()
+    delta = crud.get_samples_delta(delta['watermark'])
+    assert sorted(row.id for row in delta['rows']) == [ids[1], ids[2]]
+    assert delta['watermark'] == last.id
+
+
+def test_old_gap_is_treated_as_rollback():
+    ids = make_samples(2)
+    with connection_scope():
+        first = ChangeLog.create(table='sample', row_id=ids[0])
+        rolled_back = ChangeLog.create(table='sample', row_id=ids[0])
+        last = ChangeLog.create(table='sample', row_id=ids[1])
+        rolled_back.delete_instance()
+        settled = datetime.datetime.now() - datetime.timedelta(seconds=changes.CHANGE_LOG_SETTLE_SECONDS + 1)
+        ChangeLog.update(changed_at=settled).where(ChangeLog.id.in_([first.id, last.id])).execute()
+        assert changes.current_watermark() == last.id
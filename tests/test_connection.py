@@ -0,0 +1,30 @@
+# lis_project/tests/test_connection.py
+"""Пул соединений и реентерабельная область connection_scope"""
+from database import connection
+from database.connection import database, connection_scope
+
+
+def connections_in_use():
+    return len(database._in_use)
+
+
+def test_nested_scopes_share_one_connection():
+    assert database.is_closed()
+    with connection_scope():
+        outer = database.connection()
+        with connection_scope():
+            assert database.connection() is outer
+        assert not database.is_closed()
+    assert database.is_closed()
+    assert connection._scope.depth == 0
+    assert connections_in_use() == 0
+
+
+def test_scope_inside_open_connection_keeps_it_open():
+    database.connect()
+    try:
+        with connection_scope():
+            pass
+        assert not database.is_closed()
+    finally:
+        database.close()
@@ -0,0 +1,74 @@
+# lis_project/tests/test_rollups.py
+"""Сводные таблицы: счётчики меняются вместе с экспериментами и совпадают с пересчётом"""
+import datetime
+from database import crud, rollups
+from database.connection import connection_scope
+from database.models import Experiment
+from database.rollups import ExperimentMonthRollup, ExperimentStatusRollup, ResearcherExperimentRollup
+
+
+def rollup_state():
+    """{таблица: {ключ: счётчик}} без нулевых счётчиков"""
+    with connection_scope():
+        return {model._meta.table_name: {key: count for key, count in
+                                         model.select(model._meta.primary_key, model.count).tuples() if count}
+                for model in rollups.ROLLUP_MODELS}
+
+def rebuilt_state():
+    with connection_scope():
+        rollups.rebuild_rollups()
+    return rollup_state()
+
+
+def test_counters_follow_experiment_changes(researcher):
+    march = datetime.date(2024, 3, 10)
+    first = crud.create_experiment('Первый', 'Цель', status='planned', date_of_event=march,
+                                   researcher_id=researcher.id)
+    second = crud.create_experiment('Второй', 'Цель', status='planned', date_of_event=march,
+                                    researcher_id=researcher.id)
+    third = crud.create_experiment('Третий', 'Цель', status='completed', date_of_event=datetime.date(2024, 4, 1))
+    state = rollup_state()
+    assert state['rollup_experiment_month'] == {'2024-03': 2, '2024-04': 1}
+    assert state['rollup_experiment_status'] == {'planned': 2, 'completed': 1}
+    assert state['rollup_researcher_experiment'] == {researcher.id: 2}
+
+    crud.update_experiment(first.id, status='in_progress', date_of_event='2024-05-02')
+    crud.update_many(Experiment, [second.id, third.id], status='completed')
+    crud.delete_experiment_completely(third.id)
+    state = rollup_state()
+    assert state['rollup_experiment_month'] == {'2024-03': 1, '2024-05': 1}
+    assert state['rollup_experiment_status'] == {'in_progress': 1, 'completed': 1}
+    assert state == rebuilt_state()
+
+
+def test_bump_creates_and_increments_counter():
+    with connection_scope():
+        rollups._bump(ExperimentStatusRollup, 'archived', 1)
+        rollups._bump(ExperimentStatusRollup, 'archived', 2)
+        rollups._bump(ExperimentMonthRollup, '2024-01', -1)
+        assert ExperimentStatusRollup.get_by_id('archived').count == 3
+        assert ExperimentMonthRollup.get_by_id('2024-01').count == -1
+        assert ExperimentStatusRollup.select().count() == 1
+
+
+def test_bump_ignores_empty_key_and_zero_delta():
+    with connection_scope():
+        rollups._bump(ExperimentStatusRollup, None, 1)
+        rollups._bump(ExperimentStatusRollup, 'planned', 0)
+        assert ExperimentStatusRollup.select().count() == 0
+
+
+def test_removed_researcher_counter_is_dropped(researcher):
+    crud.create_experiment('Эксперимент', 'Цель', researcher_id=researcher.id)
+    with connection_scope():
+        rollups.researcher_removed(researcher.id)
+        assert not ResearcherExperimentRollup.select().exists()
+
+
+def test_experiment_date_given_as_string(researcher):
+    # Так дату передаёт диалог создания эксперимента
+    experiment = crud.create_experiment(name='Из диалога', purpose='Цель', date_of_event='2024-06-15',
+                                        researcher_id=researcher.id)
+    assert experiment is not None
+    assert experiment.date_of_event == datetime.date(2024, 6, 15)
+    assert rollup_state()['rollup_experiment_month'] == {'2024-06': 1}
@@ -0,0 +1,40 @@
+# lis_project/tests/test_search.py
+"""Поиск (в SQLite — по LIKE)"""
+from database import search, crud
+from tests.conftest import make_samples
+
+
+def test_pages_and_full_result():
+    ids = make_samples(search.SEARCH_PAGE_SIZE + 50, name='Проба')
+    page = search.search_samples('Проба')
+    assert len(page['ids']) == search.SEARCH_PAGE_SIZE
+    assert page['has_more']
+
+    second = search.search_samples('Проба', page=2)
+    assert len(second['ids']) == 50 and not second['has_more']
+
+    everything = search.search_samples('Проба', page_size=None)
+    assert sorted(everything['ids']) == ids
+    assert not everything['has_more']
+
+
+def test_all_terms_must_match():
+    make_samples(2, name='Раствор')
+    ids = make_samples(1, name='Раствор соли')
+    assert search.search_samples('соли Раствор')['ids'] == ids
+    assert search.search_samples('  ')['ids'] == []
+
+
+def test_researcher_scope(researcher):
+    mine = crud.create_experiment('Синтез красителя', 'Цель', researcher_id=researcher.id)
+    crud.create_experiment('Синтез катализатора', 'Цель')
+    assert len(search.search_experiments('Синтез', page_size=None)['ids']) == 2
+    assert search.search_experiments('Синтез', researcher_id=researcher.id, page_size=None)['ids'] == [mine.id]
+
+
+def test_cyrillic_search_ignores_case():
+    make_samples(1, name='Проба воды')
+    experiment = crud.create_experiment('Синтез наночастиц', 'Цель')
+    assert search.search_experiments('синтез')['ids'] == [experiment.id]
+    assert search.search_experiments('НАНОЧАСТИЦ синТЕЗ')['ids'] == [experiment.id]
+    assert len(search.search_samples('ВОДЫ')['ids']) == 1
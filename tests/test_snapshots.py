@@ -0,0 +1,41 @@
+# lis_project/tests/test_snapshots.py
+"""LRU снимков экспериментов (experiment_snapshots)"""
+from database import crud, cache
+from database.cache import SnapshotCache
+
+
+def test_snapshot_expires_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    snapshots = SnapshotCache(max_entries=4, ttl=10)
+    snapshots.put(1, snapshots.epoch(1), 'снимок')
+    assert 1 in snapshots
+    assert snapshots.get(1) == (True, 'снимок')
+    now[0] += 11
+    assert 1 not in snapshots
+    assert snapshots.get(1) == (False, None)
+    assert len(snapshots) == 0
+
+
+def test_snapshot_invalidated_during_read_is_not_stored():
+    snapshots = SnapshotCache(max_entries=4, ttl=60)
+    epoch = snapshots.epoch(1)
+    snapshots.invalidate([1])
+    snapshots.put(1, epoch, 'устаревший')
+    assert 1 not in snapshots
+
+    epoch = snapshots.epoch(2)
+    snapshots.invalidate()
+    snapshots.put(2, epoch, 'устаревший')
+    assert 2 not in snapshots
+
+
+def test_write_drops_only_affected_snapshots(researcher):
+    first = crud.create_experiment('Первый', 'Цель', researcher_id=researcher.id)
+    second = crud.create_experiment('Второй', 'Цель', researcher_id=researcher.id)
+    assert crud.get_experiment_snapshot(first.id) is not None
+    assert crud.get_experiment_snapshot(second.id) is not None
+
+    crud.update_experiment(first.id, name='Первый (изм.)')
+    assert crud.peek_experiment_snapshot(first.id) is None
+    assert crud.peek_experiment_snapshot(second.id) is not None
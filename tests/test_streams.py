@@ -0,0 +1,55 @@
+# lis_project/tests/test_streams.py
+"""Потоковое чтение строк для отчётов (iter_*)"""
+import pytest
+from database import crud, connection
+from database.connection import database
+from tests.conftest import make_samples, make_equipment
+
+
+def connections_in_use():
+    return len(database._in_use)
+
+
+def test_interleaved_streams():
+    make_samples(3)
+    make_equipment(2)
+    samples, equipment = crud.iter_samples(), crud.iter_equipment()
+    rows = [next(samples), next(equipment), next(samples), next(equipment)]
+    assert [row['name'] for row in rows] == ['Образец 0', 'Прибор 0', 'Образец 1', 'Прибор 1']
+    # Обычный запрос, пока оба генератора не дочитаны
+    assert len(crud.get_all_samples()) == 3
+    assert len(list(samples)) == 1
+    assert list(equipment) == []
+    assert connection._scope.depth == 0
+    assert connections_in_use() == 0
+
+
+def test_abandoned_stream_returns_connection():
+    make_samples(3)
+    samples = crud.iter_samples()
+    next(samples)
+    assert connections_in_use() == 1
+    samples.close()
+    assert connections_in_use() == 0
+    assert connection._scope.depth == 0
+
+
+def test_stream_errors_propagate():
+    @crud.stream_db_operation
+    def broken():
+        yield 1
+        raise RuntimeError('обрыв чтения')
+
+    rows = broken()
+    assert next(rows) == 1
+    with pytest.raises(RuntimeError):
+        next(rows)
+    assert connection._scope.depth == 0
+
+
+def test_stream_converts_values():
+    sample_id = make_samples(1)[0]
+    crud.create_measurement(sample_id, 'Термометрия', 'Температура', 25.0, '°C', 0.1, '2024-03-01 12:00:00')
+    (row,) = crud.iter_measurements()
+    assert row['time_of_event'].year == 2024
+    assert row['sample_name'] == 'Образец 0'
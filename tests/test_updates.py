@@ -0,0 +1,50 @@
+# lis_project/tests/test_updates.py
+"""UPDATE только переданных полей и запись в журнал только найденных строк"""
+import pytest
+from database import crud
+from database.changes import ChangeLog
+from database.connection import connection_scope
+from database.models import Sample
+from tests.conftest import make_samples
+
+
+def log_entries():
+    with connection_scope():
+        return list(ChangeLog.select(ChangeLog.table, ChangeLog.row_id, ChangeLog.deleted)
+                    .order_by(ChangeLog.id).tuples())
+
+
+def test_update_many_logs_only_existing_rows():
+    ids = make_samples(2)
+    missing = ids[-1] + 1000
+    with connection_scope():
+        ChangeLog.delete().execute()
+    assert crud.update_many(Sample, ids + [missing], aggregate_state='жидкое') == 2
+    assert log_entries() == [('sample', ids[0], False), ('sample', ids[1], False)]
+
+
+def test_update_of_missing_row_is_not_logged():
+    ids = make_samples(1)
+    with connection_scope():
+        ChangeLog.delete().execute()
+    assert crud.update_sample(ids[0] + 1000, name='Нет такого') == 0
+    assert log_entries() == []
+
+
+def test_only_passed_fields_are_written():
+    sample_id = make_samples(1)[0]
+    with connection_scope():
+        Sample.update(mass=5.0).where(Sample.id == sample_id).execute()  # правка другого клиента
+    assert crud.update_sample(sample_id, name='Переименован') == 1
+    with connection_scope():
+        sample = Sample.get_by_id(sample_id)
+    assert (sample.name, sample.mass) == ('Переименован', 5.0)
+
+
+def test_unknown_or_key_fields_are_refused():
+    with pytest.raises(ValueError):
+        crud._update_changes(Sample, {'colour': 'синий'})
+    with pytest.raises(ValueError):
+        crud._update_changes(Sample, {'id': 5})
+    sample_id = make_samples(1)[0]
+    assert crud.update_sample(sample_id, colour='синий') is None